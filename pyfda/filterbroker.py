@@ -38,6 +38,7 @@ More info on data persistence and storing / accessing global variables:
 """
 from collections import OrderedDict
 from pyfda.libs.frozendict import freeze_hierarchical
+from pyfda.libs.lazy_dict import LazyDict
 
 clipboard = None
 """ Handle to central clipboard instance """
@@ -304,7 +305,9 @@ fil = [None] * 10  # create empty list with length 10 for multiple filter design
 # factory that is called when a key is missing. Here, lambda simply returns a float.
 # When e.g. list is given as the default_factory, an empty list is returned.
 # fil[0] = defaultdict(lambda: 0.123)
-fil[0] = {}
+# fil[0] is a LazyDict where filter formats derived by `fil_convert()` are only
+# calculated when they are accessed
+fil[0] = LazyDict()
 # Now, copy each key-value pair into the defaultdict
 for k in fil_init:
     fil[0].update({k: fil_init[k]})
@@ -11,6 +11,7 @@ Fixpoint class for calculating direct-form DF1 FIR filter using pyfixp routines
 """
 import numpy as np
 from numpy.lib.function_base import iterable
+from numpy.lib.stride_tricks import sliding_window_view
 import pyfda.libs.pyfda_fix_lib as fx
 
 import logging
@@ -18,6 +19,10 @@ import logging
 # from pyfda.libs.pyfda_lib import pprint_log
 logger = logging.getLogger(__name__)
 
+# max. number of partial products (= block length * number of taps) that are
+# calculated and quantized at once in `_fxfilter_block()`
+BLK_SIZE = 1 << 16
+
 
 # =============================================================================
 class FIR_DF_pyfixp(object):
@@ -82,6 +87,7 @@ class FIR_DF_pyfixp(object):
         self.Q_acc = fx.Fixed(self.p['QA'])  # accumulator
         self.Q_O = fx.Fixed(self.p['QO'])  # output
         self.N_over_filt = 0  # initialize overflow counter TODO: not used yet?
+        self._init_int_mode()
 
         # Initialize vectors (also speeds up calculation for large arrays)
         self.xbq = np.zeros(len(self.b))  # partial products
@@ -96,6 +102,56 @@ class FIR_DF_pyfixp(object):
             else:
                 self.zi = zi[:self.L - 1]
 
+    # ---------------------------------------------------------
+    def _init_int_mode(self) -> None:
+        """
+        Check whether the sums of partial products are too wide to be represented
+        exactly by the 53 bit mantissa of np.float64. In this case, use bit-true
+        integer arithmetic (`int_mode = True`) for partial products and accumulator.
+
+        Integer arithmetic requires the fractional wordlengths of input and
+        coefficients, i.e. quantizer dicts 'QI' and 'QCB', scale factors of 1 and
+        quantization modes supported by `Fixed.fixp_int()`. Partial products may
+        also be left unquantized (settings 'none' for both 'quant' and 'ovfl').
+        """
+        self.int_mode = False
+        int_quant = {'floor', 'round', 'fix', 'ceil', 'rint'}
+
+        if 'QI' not in self.p or 'QCB' not in self.p\
+                or self.Q_mul.scale != 1 or self.Q_acc.scale != 1\
+                or self.Q_acc.quant not in int_quant:
+            return
+        if self.Q_mul.quant == 'none' and self.Q_mul.ovfl == 'none':
+            self.WF_sum = None  # partial products are not requantized
+        elif self.Q_mul.quant in int_quant:
+            self.WF_sum = self.Q_mul.WF
+        else:
+            return
+
+        # integer and fractional bits of input and coefficients
+        Q_I = fx.Fixed(self.p['QI'])
+        Q_C = fx.Fixed(self.p['QCB'])
+        self.WF_I = Q_I.WF
+        WF_C = Q_C.WF
+        self.WF_prod = self.WF_I + WF_C  # fractional bits of partial products
+        if self.WF_sum is None:
+            self.WF_sum = self.WF_prod
+        # required wordlength for the sum of partial products
+        W_sum = max(self.Q_acc.WI + 1 + self.WF_sum, self.Q_acc.W)
+        if W_sum <= 53:
+            return
+
+        self.int_mode = True
+        self.b_int = np.round(np.asarray(self.b) * (1 << WF_C)).astype(np.int64)
+        # Use Python integers when products or sums could overflow int64. The
+        # unquantized sums are bounded by the ranges of input and coefficients
+        # and the number of taps, not by the accumulator range: it only limits
+        # the sums *after* saturation / wrap-around by `Q_acc.fixp_int()`.
+        W_sum = Q_I.WI + Q_C.WI + max(self.WF_prod, self.WF_sum) + 1\
+            + int(np.ceil(np.log2(self.L)))
+        if W_sum > 62:
+            self.b_int = self.b_int.astype(object)
+
     # ---------------------------------------------------------
     def reset(self):
         """ reset overflow counters of quantizers """
@@ -158,28 +214,122 @@ class FIR_DF_pyfixp(object):
         # else:  # don't change x, it is integer anyway
         #    x = x
 
-        # initialize quantized partial products and output arrays
-        y_q = xb_q = np.zeros(len(x))
-
         # Calculate response by:
         # - append new stimuli `x` to register state `self.zi`
         # - slide a window with length `len(b)` over `self.zi`, starting at position `k`
         #   and multiply it with the coefficients `b`, yielding the partial products x*b
-        #   TODO: Doing this for the last len(x) terms should be enough
         # - quantize the partial products x*b, yielding xb_q
         # - accumulate the quantized partial products and quantize result, yielding y_q[k]
+        # This is done blockwise for many output samples at once, see `_fxfilter_block()`
 
         self.zi = np.concatenate((self.zi, x))
 
-        for k in range(len(x)):
+        if self.int_mode:
+            y_q = self._fxfilter_block_int(len(x))
+        else:
+            y_q = self._fxfilter_block(len(x))
+
+        self.zi = self.zi[-(self.L-1):]  # store last L-1 inputs (i.e. the L-1 registers)
+        self.N_over_filt = self.Q_acc.N_over + self.Q_mul.N_over
+        return self.Q_O.fixp_into(y_q[:len(x)]), self.zi
+
+    # ---------------------------------------------------------
+    def _fxfilter_block(self, N: int) -> np.ndarray:
+        """
+        Calculate `N` accumulator output samples from the extended register state
+        `self.zi` (L - 1 old registers followed by `N` new input samples).
+
+        A strided (zero-copy) view of sliding windows with length `L` over `self.zi`
+        is processed in blocks of `N_blk` rows: All partial products of a block are
+        quantized with a single call of `Q_mul.fixp_into()`, the accumulator sums are
+        quantized with a single call of `Q_acc.fixp_into()`. The number of rows per block
+        is selected to limit the temporary memory to approx. `BLK_SIZE` elements.
+
+        Results and overflow counters are bit-identical to the sample-by-sample
+        calculation in `_fxfilter_loop()`. This also holds for delta-sigma
+        quantizers (`'quant': 'dsm'`) which keep their modulator states between
+        calls and blocks: They are fed with the same sequence of partial products
+        and sums as in the loop.
+
+        Parameters
+        ----------
+        N : int
+            number of output samples
+
+        Returns
+        -------
+        y_q : ndarray of np.float64
+            quantized accumulator values
+        """
+        y_q = np.zeros(N)
+        if N == 0:
+            return y_q
+        # view with shape (N, L), row `k` is the window `zi[k:k + L]`
+        zi_win = sliding_window_view(self.zi[:N + self.L - 1], self.L)
+        N_blk = max(BLK_SIZE // self.L, 1)  # number of rows per block
+
+        if self.zi.dtype != np.float64:  # e.g. complex, use general quantization
+            for k in range(0, N, N_blk):
+                xb_q = self.Q_mul.fixp(zi_win[k:k + N_blk] * self.b)
+                y_q[k:k + N_blk] = self.Q_acc.fixp(np.sum(xb_q, axis=1))
+            return y_q
+
+        for k in range(0, N, N_blk):
+            # partial products x*b for all windows of the current block,
+            # quantized in place
+            xb_q = self.Q_mul.fixp_into(zi_win[k:k + N_blk] * self.b)
+            # sum up each row of xb_q and quantize the accumulator contents
+            self.Q_acc.fixp_into(np.sum(xb_q, axis=1), out=y_q[k:k + N_blk])
+
+        return y_q
+
+    # ---------------------------------------------------------
+    def _fxfilter_block_int(self, N: int) -> np.ndarray:
+        """
+        Integer arithmetic version of `_fxfilter_block()` for wide accumulators:
+        Inputs and coefficients are converted to integers, partial products and
+        sums are calculated and quantized bit-true in the integer domain.
+        Only the quantized accumulator values are converted back to float.
+
+        Inputs are assumed to be quantized with `WF_I` fractional bits already,
+        other inputs are rounded to this grid.
+        """
+        y_q = np.zeros(N)
+        if N == 0:
+            return y_q
+        x_int = np.round(self.zi[:N + self.L - 1] * (1 << self.WF_I)).astype(np.int64)
+        if self.b_int.dtype == object:
+            x_int = x_int.astype(object)
+        zi_win = sliding_window_view(x_int, self.L)
+        N_blk = max(BLK_SIZE // self.L, 1)  # number of rows per block
+
+        for k in range(0, N, N_blk):
+            xb = zi_win[k:k + N_blk] * self.b_int
+            if self.Q_mul.quant == 'none':  # no requantization of partial products
+                xb_q = xb
+                self.Q_mul.N += xb.size
+            else:
+                xb_q = self.Q_mul.fixp_int(xb, WF_in=self.WF_prod)
+            acc = self.Q_acc.fixp_int(np.sum(xb_q, axis=1), WF_in=self.WF_sum)
+            y_q[k:k + N_blk] = self.Q_acc.int2float(acc)
+
+        return y_q
+
+    # ---------------------------------------------------------
+    def _fxfilter_loop(self, N: int) -> np.ndarray:
+        """
+        Reference implementation of `_fxfilter_block()`, calculating the
+        accumulator output sample by sample. This is very slow for long stimuli,
+        it is only kept for verification and benchmarking.
+        """
+        y_q = np.zeros(N)
+        for k in range(N):
             # weighted state-vector x at time k:
-            xb_q = self.Q_mul.fixp(self.zi[k:k + len(self.b)] * self.b)
+            xb_q = self.Q_mul.fixp(self.zi[k:k + self.L] * self.b)
             # sum up x_bq to get accu[k]
             y_q[k] = self.Q_acc.fixp(np.sum(xb_q))
 
-        self.zi = self.zi[-(self.L-1):]  # store last L-1 inputs (i.e. the L-1 registers)
-        self.N_over_filt = self.Q_acc.N_over + self.Q_mul.N_over
-        return self.Q_O.fixp(y_q[:len(x)]), self.zi
+        return y_q
 
 
 # ------------------------------------------------------------------------------
@@ -54,6 +54,8 @@ class ItemDelegate(QStyledItemDelegate):
 
     - `displayText()` displays the data stored in the table in various number formats
 
+    - `fill_cache()` converts all coefficients in bulk for `displayText()`
+
     - `createEditor()` creates a line edit instance for editing table entries
 
     - `setEditorData()` pass data with full precision and in selected format to editor
@@ -71,6 +73,8 @@ class ItemDelegate(QStyledItemDelegate):
         """
         super(ItemDelegate, self).__init__(parent)
         self.parent = parent  # instance of the parent (not the base) class
+        self.cache = {}  # item text -> (displayed text, overflow flag)
+        self.cache_key = None  # settings the cached texts have been created with
 
 # ==============================================================================
 #     def paint(self, painter, option, index):
@@ -143,6 +147,41 @@ class ItemDelegate(QStyledItemDelegate):
 #
 # ==============================================================================
 
+    def _cache_key(self):
+        """
+        Return a tuple with all settings that influence the displayed text
+        """
+        myQ = self.parent.myQ
+        return (myQ.frmt, myQ.WI, myQ.WF, myQ.ovfl, myQ.quant, myQ.scale,
+                myQ.places, params['FMT_ba'])
+
+    def fill_cache(self, ba):
+        """
+        Convert all coefficients in `ba` (list of arrays) to the selected fixpoint
+        format in one `float2frmt()` call per array and cache the displayed texts
+        and the overflow flags per item text. This way, `displayText()` only
+        needs a lookup instead of converting one table item at a time.
+        """
+        myQ = self.parent.myQ
+        self.cache = {}
+        self.cache_key = self._cache_key()
+        if myQ.frmt == 'float':
+            return
+
+        for coeffs in ba:
+            coeffs = np.asarray(coeffs)
+            if coeffs.ndim != 1 or coeffs.size == 0 or coeffs.dtype.kind not in 'iuf':
+                continue  # complex or invalid data, convert element-wise
+            y_frmt = myQ.float2frmt(coeffs)
+            ovr_flag = np.broadcast_to(myQ.ovr_flag, coeffs.shape).tolist()
+            if myQ.frmt == 'dec' and myQ.WF > 0:
+                disp = ["{0:.{1}g}".format(y, params['FMT_ba']) for y in y_frmt]
+            else:
+                disp = ["{0:>{1}}".format(y, myQ.places) for y in y_frmt]
+            # same item texts as created by `Input_Coeffs._refresh_table_item()`
+            items = [str(c).strip('()') for c in coeffs]
+            self.cache.update(zip(items, zip(disp, ovr_flag)))
+
     def text(self, item):
         """
         Return item text as string transformed by self.displayText()
@@ -162,6 +201,11 @@ class ItemDelegate(QStyledItemDelegate):
         """
         data_str = qstr(text)  # convert to "normal" string
 
+        if data_str in self.cache and self.cache_key == self._cache_key():
+            # text has been converted in bulk by `fill_cache()`
+            disp, self.parent.myQ.ovr_flag = self.cache[data_str]
+            return disp
+
         if self.parent.myQ.frmt == 'float':
             data = safe_eval(data_str, return_type='auto')  # convert to float
             return "{0:.{1}g}".format(data, params['FMT_ba'])
@@ -547,6 +591,9 @@ class Input_Coeffs(QWidget):
             idx_str = [str(n) for n in range(self.num_rows)]
             self.tblCoeff.setVerticalHeaderLabels(idx_str)
 
+            # convert all coefficients in bulk for `ItemDelegate.displayText()`
+            self.tblCoeff.itemDelegate().fill_cache(self.ba[:self.num_cols])
+
             self.tblCoeff.blockSignals(True)
             for col in range(self.num_cols):
                 for row in range(self.num_rows):
@@ -622,9 +669,22 @@ class Input_Coeffs(QWidget):
             "importing data: dim - shape = {0} - {1} - {2}\n{3}"
             .format(type(data_str), np.ndim(data_str), np.shape(data_str), data_str))
 
-        conv = self.myQ.frmt2float  # frmt2float_vec?
         frmt = self.myQ.frmt
 
+        def conv(data_str, frmt):
+            """
+            Convert a list of strings in bulk; invalid entries in 'float' format
+            are returned as `None` like the element-wise `frmt2float()` does.
+            """
+            ba = self.myQ.frmt2float_vec(data_str, frmt)
+            if frmt == 'float':
+                idx = np.flatnonzero(np.isnan(ba))
+                vals = [self.myQ.frmt2float(data_str[i], frmt) for i in idx]
+                if None in vals:
+                    ba = ba.astype(object)
+                    ba[idx] = vals
+            return ba
+
         if np.ndim(data_str) > 1:
             num_cols, num_rows = np.shape(data_str)
             orientation_horiz = num_cols > num_rows  # need to transpose data
@@ -637,19 +697,17 @@ class Input_Coeffs(QWidget):
             return None
         logger.info("_copy_to_table: c x r = {0} x {1}".format(num_cols, num_rows))
         if orientation_horiz:
-            self.ba = [[], []]
-            for c in range(num_cols):
-                self.ba[0].append(conv(data_str[c][0], frmt))
-                if num_rows > 1:
-                    self.ba[1].append(conv(data_str[c][1], frmt))
+            self.ba = [conv([row[0] for row in data_str], frmt), []]
+            if num_rows > 1:
+                self.ba[1] = conv([row[1] for row in data_str], frmt)
             if num_rows > 1:
                 self._filter_type(ftype='IIR')
             else:
                 self._filter_type(ftype='FIR')
         else:
-            self.ba[0] = [conv(s, frmt) for s in data_str[0]]
+            self.ba[0] = conv([s for s in data_str[0]], frmt)
             if num_cols > 1:
-                self.ba[1] = [conv(s, frmt) for s in data_str[1]]
+                self.ba[1] = conv([s for s in data_str[1]], frmt)
                 self._filter_type(ftype='IIR')
             else:
                 self.ba[1] = [1]
@@ -24,7 +24,7 @@ import scipy.signal as sig
 
 import pyfda.filterbroker as fb  # importing filterbroker initializes all its globals
 import pyfda.filter_factory as ff  # importing filterbroker initializes all its globals
-from pyfda.libs.pyfda_lib import lin2unit, mod_version, to_html, safe_eval
+from pyfda.libs.pyfda_lib import lin2unit, mod_version, to_html, safe_eval, calc_Hcomplex
 from pyfda.input_widgets.input_info_about import AboutWindow
 from pyfda.pyfda_rc import params
 
@@ -150,9 +150,18 @@ class Input_Info(QWidget):
         self.led_settings_NFFT.setToolTip("<span>Number of FFT points for frequency "
                                           "domain widgets.</span>")
 
+        lbl_settings_H_tol = QLabel(to_html("H_tol =", frmt='bi'), self)
+        self.led_settings_H_tol = QLineEdit(self)
+        self.led_settings_H_tol.setText(str(params['H_tol']))
+        self.led_settings_H_tol.setToolTip(
+            "<span>Tolerance in dB for adaptively refining the frequency grid near "
+            "notches and extrema of |H(f)|, 0 turns refinement off.</span>")
+
         layGSettings = QGridLayout()
         layGSettings.addWidget(lbl_settings_NFFT, 1, 0)
         layGSettings.addWidget(self.led_settings_NFFT, 1, 1)
+        layGSettings.addWidget(lbl_settings_H_tol, 2, 0)
+        layGSettings.addWidget(self.led_settings_H_tol, 2, 1)
 
         self.frmSettings = QFrame(self)
         self.frmSettings.setLayout(layGSettings)
@@ -210,6 +219,7 @@ class Input_Info(QWidget):
         self.butAbout.clicked.connect(self._about_window)
         self.butSettings.clicked.connect(self._show_settings)
         self.led_settings_NFFT.editingFinished.connect(self._update_settings_nfft)
+        self.led_settings_H_tol.editingFinished.connect(self._update_settings_H_tol)
         self.butDebug.clicked.connect(self._show_debug)
 
         self.butFiltDict.clicked.connect(self._show_filt_dict)
@@ -243,6 +253,13 @@ class Input_Info(QWidget):
         self.led_settings_NFFT.setText(str(params['N_FFT']))
         self.emit({'data_changed': 'n_fft'})
 
+    def _update_settings_H_tol(self):
+        """ Update tolerance for adaptive frequency grid from QLineEdit Widget"""
+        params['H_tol'] = safe_eval(self.led_settings_H_tol.text(), params['H_tol'],
+                                    sign='poszero', return_type='float')
+        self.led_settings_H_tol.setText(str(params['H_tol']))
+        self.emit({'data_changed': 'h_tol'})
+
 # ------------------------------------------------------------------------------
     def load_dict(self):
         """
@@ -309,23 +326,14 @@ class Input_Info(QWidget):
             for the filter defined in the filter dict in a given frequency band
             [f_start, f_stop].
             """
-            w = np.linspace(f_start, f_stop, params['N_FFT'])*2*np.pi
-            [w, H] = sig.freqz(bb, aa, worN=w)
-
-            # add antiCausals if we have them
-            if (antiC):
-               #
-               # Evaluate transfer function of anticausal half on the same freq grid.
-               #
-               wa, ha = sig.freqz(bbA, aaA, worN=w)
-               ha = ha.conjugate()
-               #
-               # Total transfer function is the product
-               #
-               H = H*ha
+            # use the (cached) response along the whole unit circle, including
+            # antiCausal parts, with a frequency grid refined near the extrema
+            [w, H] = calc_Hcomplex(fb.fil[0], params['N_FFT'], True, tol=params['H_tol'])
 
             f = w / (2.0 * pi)  # frequency normalized to f_S
-            H_abs = abs(H)
+            band = (f >= f_start) & (f <= f_stop)
+            f = f[band]
+            H_abs = abs(H[band])
             H_max = max(H_abs)
             H_min = min(H_abs)
             F_max = f[np.argmax(H_abs)]  # find the frequency where H_abs
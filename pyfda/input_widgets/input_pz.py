@@ -22,10 +22,10 @@ from pyfda.libs.pyfda_qt_lib import qget_cmb_box, qstyle_widget
 from pyfda.libs.pyfda_io_lib import qtable2text, qtext2table
 
 import numpy as np
-from scipy.signal import freqz, zpk2tf
+from scipy.signal import freqz
 
 import pyfda.filterbroker as fb  # importing filterbroker initializes all its globals
-from pyfda.libs.pyfda_lib import qstr, fil_save, safe_eval, pprint_log
+from pyfda.libs.pyfda_lib import qstr, fil_save, safe_eval, pprint_log, zpk2tf_inc
 from pyfda.pyfda_rc import params
 from pyfda.input_widgets.input_pz_ui import Input_PZ_UI
 
@@ -373,7 +373,7 @@ class Input_PZ(QWidget):
             self.zpk[2] = np.abs(self.zpk[2])
 
         if norm != "None":
-            b, a = zpk2tf(self.zpk[0], self.zpk[1], self.zpk[2])
+            b, a = zpk2tf_inc(self.zpk[0], self.zpk[1], self.zpk[2])
             [w, H] = freqz(b, a, whole=True)
             Hmax = max(abs(H))
             if not np.isfinite(Hmax) or Hmax > 1e4 or Hmax < 1e-4:
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of the pyFDA project hosted at https://github.com/chipmuenk/pyfda
+#
+# Copyright © pyFDA Project Contributors
+# Licensed under the terms of the MIT License
+# (see file LICENSE in root directory for details)
+
+"""
+Dictionary with values that are only calculated when they are accessed for the
+first time. Used for the filter dict ``fb.fil[0]`` where the conversion of a
+filter design to other formats (e.g. finding the roots of a long polynomial)
+is deferred until a consumer actually needs it.
+"""
+import threading
+
+
+class LazyDict(dict):
+    """
+    Dictionary where the value of a key can be set to a function with
+    `set_lazy()`. The function is called with the dict as its argument on the
+    first access to the key, its result replaces the function. Assigning a new
+    value to the key discards a pending function.
+
+    All ways of reading values (indexing, `get()`, `items()`, `values()`,
+    `copy()`, `dict(d)`, `**d`, pickling) return calculated values. The key
+    is listed by `keys()` and `in` even while its value is pending.
+
+    Pending values are calculated while holding a (reentrant) lock, readers in
+    other threads (e.g. the transient simulation in `Impz_Worker`) wait for
+    the result instead of reading the placeholder.
+    """
+    def __init__(self, *args, **kwargs):
+        self._lazy = {}
+        self._lock = threading.RLock()
+        super().__init__(*args, **kwargs)
+
+    def set_lazy(self, key, func) -> None:
+        """
+        Calculate the value of `key` by calling `func(self)` on first access
+        """
+        with self._lock:
+            super().__setitem__(key, None)
+            self._lazy[key] = func
+
+    def is_lazy(self, key) -> bool:
+        """
+        Return True when the value of `key` hasn't been calculated yet
+        """
+        return key in self._lazy
+
+    def __getitem__(self, key):
+        if key in self._lazy:
+            with self._lock:
+                # the function stays registered until its value has been stored,
+                # errors are raised again on the next access
+                func = self._lazy.get(key)
+                if func is not None:  # not calculated by another thread meanwhile
+                    super().__setitem__(key, func(self))
+                    del self._lazy[key]
+        return super().__getitem__(key)
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._lazy.pop(key, None)
+            super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        with self._lock:
+            self._lazy.pop(key, None)
+            super().__delitem__(key)
+
+    def __iter__(self):
+        # overriding __iter__ makes `dict(d)` and `**d` read values via
+        # __getitem__ instead of accessing the internal storage
+        return super().__iter__()
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def pop(self, key, *args):
+        if key in self:
+            value = self[key]
+            del self[key]
+            return value
+        return super().pop(key, *args)
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def items(self):
+        return [(key, self[key]) for key in self]
+
+    def values(self):
+        return [self[key] for key in self]
+
+    def copy(self):
+        """
+        Shallow copy, pending values are calculated independently for the copy
+        """
+        d = LazyDict()
+        with self._lock:
+            for key, value in super().items():
+                dict.__setitem__(d, key, value)
+            d._lazy = self._lazy.copy()
+        return d
+
+    def clear(self):
+        with self._lock:
+            self._lazy.clear()
+            super().clear()
+
+    def __reduce__(self):
+        return (self.__class__, (dict(self.items()),))
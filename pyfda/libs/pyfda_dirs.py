@@ -112,6 +112,23 @@ def get_log_dir():
     return None
 
 
+# ------------------------------------------------------------------------------
+def get_scratch_dir():
+    """
+    Return the directory `SCRATCH_DIR` for temporary files (e.g. memory mapped
+    data of long transient simulations), create it when it doesn't exist yet.
+    Return `TEMP_DIR` when it cannot be created.
+    """
+    if valid(SCRATCH_DIR) and os.access(SCRATCH_DIR, os.W_OK):
+        return SCRATCH_DIR
+    try:
+        os.makedirs(SCRATCH_DIR, exist_ok=True)
+        return SCRATCH_DIR
+    except (IOError, OSError) as e:
+        print("ERROR creating {0}:\n{1}\nUsing '{2}'".format(SCRATCH_DIR, e, TEMP_DIR))
+        return TEMP_DIR
+
+
 # ------------------------------------------------------------------------------
 def get_yosys_dir():
     """
@@ -261,6 +278,8 @@ THIS_DIR = os.path.dirname(os.path.abspath(__file__))  # dir of this file
 INSTALL_DIR = os.path.normpath(os.path.join(THIS_DIR, '..'))
 
 TEMP_DIR = tempfile.gettempdir()  #: Temp directory for constructing logging dir
+#: Directory for memory mapped simulation data, can be changed e.g. to a larger disk
+SCRATCH_DIR = os.path.join(TEMP_DIR, 'pyfda_scratch')
 USER_DIRS = []  #: Placeholder for user widgets directory list, set by treebuilder
 
 HOME_DIR, USER_NAME = get_home_dir()  #: Home dir and user name
@@ -301,6 +320,7 @@ if 'i' in ARGV:
     print("USER_CONF_DIR_FILE:     {0}".format(USER_CONF_DIR_FILE))
     print("USER_LOG_CONF_DIR_FILE: {0}".format(USER_LOG_CONF_DIR_FILE))
     print("LOG_DIR_FILE:           {0}".format(LOG_DIR_FILE))
+    print("SCRATCH_DIR:            {0}".format(SCRATCH_DIR))
     sys.exit()
 
 # print help infos and quit
@@ -12,6 +12,7 @@ numpy values and formatting reals in various formats
 """
 # ===========================================================================
 import re
+from functools import lru_cache
 
 import numpy as np
 try:
@@ -31,6 +32,20 @@ logger = logging.getLogger(__name__)
 
 __version__ = 0.6
 
+# max. wordlength for the bulk conversion of bin, hex and csd strings in
+# `Fixed.frmt2float_vec()`: sign and two guard bits for the two's complement and
+# wrap-around arithmetic have to fit into the 53 bit mantissa of np.float64
+W_VEC_MAX = 50
+
+
+@lru_cache(maxsize=16)
+def _synthesize_ntf(order, osr, opt):
+    """
+    Synthesize the noise transfer function (NTF) of a delta-sigma modulator,
+    the result is cached for each combination of `order`, `osr` and `opt`.
+    """
+    return synthesizeNTF(order=order, osr=osr, opt=opt)
+
 
 def qstr(text):
     """ carefully replace qstr() function - only needed for Py2 compatibility """
@@ -282,6 +297,139 @@ def csd2dec(csd_str):
 csd2dec_vec = np.vectorize(csd2dec)  # safer than np.frompyfunc()
 
 
+# ==============================================================================
+# Array-level conversion routines: Instead of converting strings character by
+# character, these functions operate on matrices of ASCII codes (one row per
+# number) using bit operations. A matrix with `w` columns is turned into an
+# array of strings in one step by viewing it as `uint32` (UCS4) dtype `U<w>`.
+# ==============================================================================
+HEX_CHARS = np.frombuffer(b'0123456789ABCDEF', dtype=np.uint8)
+CSD_CHARS = np.frombuffer(b'-0+', dtype=np.uint8)  # digits -1, 0, +1
+
+
+def _chars2str(chars):
+    """
+    Convert a matrix `chars` of ASCII codes with shape (N, w) to an array of N
+    strings with length w
+    """
+    chars = np.ascontiguousarray(chars, dtype=np.uint32)
+    return chars.view('U{0}'.format(chars.shape[1])).ravel()
+
+
+def _int2digits(y_int, bits, N_digits):
+    """
+    Split (non-negative) integer array `y_int` into `N_digits` digits with `bits`
+    bits each, MSB first. Returns an integer matrix with shape (len(y_int), N_digits).
+    """
+    shifts = bits * np.arange(N_digits - 1, -1, -1)
+    return (y_int[:, None] >> shifts) & ((1 << bits) - 1)
+
+
+# ------------------------------------------------------------------------------
+def int2bin_arr(y_int, WI, WF):
+    """
+    Convert integer array `y_int` in the range -2**(WI+WF) ... 2**(WI+WF)-1 to
+    an array of binary strings in two's complement format with W = WI + WF + 1
+    bits and a radix point after WI + 1 bits (when WF > 0), identical to
+    `binary_repr()` followed by insertion of the radix point.
+    """
+    W = WI + WF + 1
+    # unpack the bits of the big-endian 64 bit representation, keep the W LSBs
+    y_be = np.ravel(y_int).astype('>i8')
+    chars = np.unpackbits(y_be.view(np.uint8).reshape(-1, 8), axis=1)[:, 64 - W:]
+    chars += ord('0')
+    if WF > 0:
+        chars = np.insert(chars, WI + 1, ord('.'), axis=1)
+    return _chars2str(chars).reshape(np.shape(y_int))
+
+
+# ------------------------------------------------------------------------------
+def int2hex_arr(y_int, WI, WF):
+    """
+    Convert integer array `y_int` in the range -2**(WI+WF) ... 2**(WI+WF)-1 to
+    an array of hex strings, identical to converting the binary two's complement
+    representation with `bin2hex()`: Integer and fractional bits are zero-padded
+    separately to a multiple of 4 bits.
+    """
+    W = WI + WF + 1
+    y_uint = np.ravel(y_int) & ((1 << W) - 1)
+    N_i = (WI + 4) // 4  # number of hex digits for WI + 1 integer bits
+    chars = HEX_CHARS[_int2digits(y_uint >> WF, 4, N_i)]
+    if WF > 0:
+        N_f = (WF + 3) // 4  # number of hex digits for WF fractional bits
+        y_frac = (y_uint & ((1 << WF) - 1)) << (4 * N_f - WF)  # zero-pad LSBs
+        chars = np.hstack((chars, np.full((len(y_uint), 1), ord('.'), dtype=np.uint8),
+                           HEX_CHARS[_int2digits(y_frac, 4, N_f)]))
+    return _chars2str(chars).reshape(np.shape(y_int))
+
+
+# ------------------------------------------------------------------------------
+def dec2csd_arr(dec_val, WF=0):
+    """
+    Convert array `dec_val` to an array of strings in CSD format with `WF`
+    fractional places, identical to `dec2csd()`.
+
+    The same digit selection as in `dec2csd()` is performed for all numbers in
+    parallel, processing one digit position per step (MSB first). Rows of the
+    resulting character matrix have different lengths, depending on the exponent
+    of the most significant digit. They are converted to strings in groups of
+    equal length.
+    """
+    shape = np.shape(dec_val)
+    dec_val = np.ravel(dec_val).astype(np.float64)
+    N = len(dec_val)
+    # exponent of the most significant digit + 1 (same calculation as in `dec2csd()`)
+    with np.errstate(divide='ignore'):
+        k = np.where(np.abs(dec_val) < 1, 0,
+                     np.ceil(np.log2(np.abs(dec_val) * 1.5))).astype(int)
+    k_max = max(int(k.max()), 1) if N > 0 else 1
+    # Row j of the digit matrix (transposed for contiguous rows) contains the
+    # digits -1, 0, +1 with exponent k_max - 1 - j, the row for exponent 0 contains
+    # the '+.', '-.' or '0.' prefix for numbers with a magnitude < 1. Digits are
+    # calculated arithmetically from the comparison results instead of masked
+    # assignments. The radix point is inserted afterwards.
+    digits = np.zeros((k_max + WF, N), dtype=np.int8)
+    remainder = dec_val.copy()
+    prev_non_zero = np.zeros(N, dtype=bool)
+
+    def digit(val, limit, sel):
+        """ digit +1 / -1 / 0 for `val` above `limit` / below `-limit` / else """
+        return ((val > limit).view(np.int8) - (val < -limit).view(np.int8)) * sel
+
+    for j, e in enumerate(range(k_max - 1, -WF - 1, -1)):
+        limit = pow(2.0, e + 1) / 3.0
+        if e == -1:  # prefix for numbers without integer digits
+            no_int = k == 0
+            d = digit(dec_val, limit, no_int)
+            digits[j - 1] += d
+            remainder -= d
+            prev_non_zero = np.where(no_int, d != 0, prev_non_zero)
+        if e < 0:  # all numbers have fractional digits
+            d = digit(remainder, limit, ~prev_non_zero)
+            prev_non_zero = d != 0
+        else:
+            active = e < k  # numbers with digits at exponent e
+            d = digit(remainder, limit, active & ~prev_non_zero)
+            prev_non_zero = np.where(active, d != 0, prev_non_zero)
+        digits[j] = d
+        remainder -= d * pow(2.0, e)
+
+    chars = CSD_CHARS[digits.T + 1]
+    if WF > 0:  # insert radix point before the first fractional digit
+        chars = np.insert(chars, k_max, ord('.'), axis=1)
+
+    csd_str = np.empty(N, dtype='U{0}'.format(chars.shape[1]))
+    # number of leading characters to be skipped, depending on the MSB exponent
+    skip = k_max - np.maximum(k, 1)
+    for s in np.unique(skip):
+        idx = skip == s
+        csd_str[idx] = _chars2str(chars[idx, s:])
+    if WF == 0:  # no digits are generated for numbers with a magnitude < 1
+        csd_str[k == 0] = ''
+    csd_str[dec_val == 0] = '0'
+    return csd_str.reshape(shape)
+
+
 # ------------------------------------------------------------------------
 class Fixed(object):
     """
@@ -323,8 +471,17 @@ class Fixed(object):
       - 'fix': round to nearest integer towards zero ('Betragsschneiden')
       - 'ceil': smallest integer `I`, such that :math:`I \\ge x`
       - 'rint': round towards nearest int
+      - 'dsm': delta-sigma modulation, requires the `deltasigma` module
       - 'none': no quantization
 
+    * **'dsm_order'**, **'dsm_osr'**, **'dsm_opt'** : Order, oversampling ratio
+      and zero optimization of the noise transfer function for delta-sigma
+      modulation; default = 3, 64, 1. The NTF is only synthesized once for each
+      combination, the modulator states are kept between calls of `fixp()`
+      until `resetN()` is called or the NTF settings are changed. Framewise
+      modulation hence yields the same result as modulating the whole signal
+      at once; call `resetN()` to start each call from zero states instead.
+
     * **'ovfl'** : Overflow method, optional; default = 'wrap'
 
       - 'wrap': do a two's complement wrap-around
@@ -453,7 +610,8 @@ class Fixed(object):
         Check the docstring of class `Fixed()` for  details.
         """
         for key in q_obj.keys():
-            if key not in ['Q', 'WF', 'WI', 'W', 'quant', 'ovfl', 'frmt', 'scale']:
+            if key not in ['Q', 'WF', 'WI', 'W', 'quant', 'ovfl', 'frmt', 'scale',
+                           'dsm_order', 'dsm_osr', 'dsm_opt']:
                 raise Exception(u'Unknown Key "{0:s}"!'.format(key))
 
         q_obj_default = {'WI': 0, 'WF': 15, 'quant': 'round', 'ovfl': 'sat',
@@ -485,6 +643,15 @@ class Fixed(object):
         self.ovfl  = str(q_obj['ovfl']).lower()
         self.frmt  = str(q_obj['frmt']).lower()
 
+        # DSM settings are taken from the passed dict, the instance attributes or
+        # the defaults without adding them to the passed dict
+        dsm_params = tuple(int(q_obj.get(k, getattr(self, k, v)))
+                           for k, v in (('dsm_order', 3), ('dsm_osr', 64), ('dsm_opt', 1)))
+        if dsm_params != (getattr(self, 'dsm_order', None), getattr(self, 'dsm_osr', None),
+                          getattr(self, 'dsm_opt', None)):
+            self.dsm_state = None  # modulator states are invalid for new NTF
+        self.dsm_order, self.dsm_osr, self.dsm_opt = dsm_params
+
         q_obj['W'] = int(self.WF + self.WI + 1)
         self.W     = q_obj['W']
         q_obj['Q'] = str(self.WI) + '.' + str(self.WF)
@@ -530,6 +697,73 @@ class Fixed(object):
 
         self.ovr_flag = 0  # initialize to allow reading when freshly initialized
 
+        self._compile_kernel()
+
+    # --------------------------------------------------------------------------
+    def _compile_kernel(self):
+        """
+        Create a specialized quantization and overflow kernel `self._kernel` for
+        the current settings. It is used by `fixp_into()` without any type sniffing
+        or dispatching on the quantizer settings at runtime.
+        """
+        # use ufuncs that can operate in place (np.fix can't, np.trunc can)
+        quant_funcs = {'floor': np.floor, 'round': np.rint, 'fix': np.trunc,
+                       'ceil': np.ceil, 'rint': np.rint, 'none': None}
+        if self.quant not in quant_funcs or self.ovfl not in {'none', 'sat', 'wrap'}:
+            # no specialized kernel ('dsm' etc.), use general `fixp()` routine
+            def kernel(y, out, scaling):
+                out[...] = self.fixp(y, scaling=scaling)
+            self._kernel = kernel
+            return
+
+        quant_func = quant_funcs[self.quant]
+        ovfl = self.ovfl
+        LSB, MSB, MIN, MAX, scale = self.LSB, self.MSB, self.MIN, self.MAX, self.scale
+        # Multiplying by `scale / LSB` yields the same result as multiplying by
+        # `scale` and dividing by LSB afterwards as LSB is a power of two
+        mult = {'mult': scale / LSB, 'multdiv': scale / LSB}
+
+        def kernel(y, out, scaling):
+            # --- scale and quantize ---
+            np.multiply(y, mult.get(scaling, 1. / LSB), out=out)
+            if quant_func is not None:
+                quant_func(out, out=out)
+            np.multiply(out, LSB, out=out)
+            # --- overflow handling ---
+            if ovfl != 'none':
+                buf = self._get_ovfl_buf(out.shape)
+                np.greater(out, MAX, out=buf[0])
+                np.less(out, MIN, out=buf[1])
+                N_over_pos = np.count_nonzero(buf[0])
+                N_over_neg = np.count_nonzero(buf[1])
+                self.N_over_pos += N_over_pos
+                self.N_over_neg += N_over_neg
+                self.N_over = self.N_over_neg + self.N_over_pos
+                if N_over_pos + N_over_neg > 0:
+                    if ovfl == 'sat':
+                        np.minimum(out, MAX, out=out)
+                        np.maximum(out, MIN, out=out)
+                    else:  # wrap, only calculated for the overflows
+                        over = np.logical_or(buf[0], buf[1], out=buf[0])
+                        yq = out[over]
+                        out[over] = yq - 4. * MSB*np.fix((np.sign(yq) * 2 * MSB + yq)
+                                                         / (4*MSB))
+            if scaling in {'div', 'multdiv'}:
+                np.divide(out, scale, out=out)
+            self.N += out.size
+
+        self._kernel = kernel
+
+    # --------------------------------------------------------------------------
+    def _get_ovfl_buf(self, shape):
+        """
+        Return a boolean work buffer with shape `(2,) + shape` for positive and
+        negative overflows, it is only reallocated when `shape` changes.
+        """
+        if getattr(self, '_ovfl_buf', None) is None or self._ovfl_buf.shape[1:] != shape:
+            self._ovfl_buf = np.empty((2,) + shape, dtype=bool)
+        return self._ovfl_buf
+
 # ------------------------------------------------------------------------------
     def fixp(self, y, scaling='mult'):
         """
@@ -681,17 +915,22 @@ class Fixed(object):
             yq = np.rint(y)  # round towards nearest int
         elif self.quant == 'dsm':
             if DS:
-                # Synthesize DSM loop filter,
-                # TODO: parameters should be adjustable via quantizer dict
-                H = synthesizeNTF(order=3, osr=64, opt=1)
-                # Calculate DSM stream and shift/scale it from -1 ... +1 to
-                # 0 ... 1 sequence
-                yq = (simulateDSM(y*self.LSB, H)[0]+1)/(2*self.LSB)
+                # Get (cached) DSM loop filter
+                H = _synthesize_ntf(self.dsm_order, self.dsm_osr, self.dsm_opt)
+                # Calculate DSM stream, starting with the states at the end of
+                # the previous call, and shift/scale it from -1 ... +1 to
+                # 0 ... 1 sequence. Multi-dimensional arrays are modulated in
+                # row-major order, i.e. a block of rows yields the same stream
+                # as passing the rows one by one.
+                x0 = 0. if self.dsm_state is None else self.dsm_state
+                v, xn = simulateDSM(np.ravel(y*self.LSB), H, x0=x0)[:2]
+                yq = np.reshape((v + 1)/(2*self.LSB), np.shape(y))
                 # returns four ndarrays:
                 # v: quantizer output (-1 or 1)
-                # xn: modulator states.
+                # xn: modulator states for each step, keep the last one
                 # xmax: maximum value that each state reached during simulation
                 # y: The quantizer input (ie the modulator output).
+                self.dsm_state = np.reshape(xn, (self.dsm_order, -1))[:, -1]
             else:
                 raise Exception('"deltasigma" Toolbox not found.\n'
                                 'Try installing it with "pip install deltasigma".')
@@ -748,9 +987,224 @@ class Fixed(object):
 
         return yq
 
+    # --------------------------------------------------------------------------
+    def fixp_into(self, y, out=None, scaling='mult'):
+        """
+        Fast path of `fixp()` for hot simulation loops: Quantize and saturate / wrap
+        the real-valued float array `y` using the kernel precompiled by `setQobj()`
+        and write the result to `out` without allocating temporary arrays
+        (except for the values that overflow with 'wrap' behaviour).
+
+        No input validation or type conversion is performed, the overflow counters
+        and `N` are updated but not the flag array `ovr_flag`. Results are identical
+        to those of `fixp()`.
+
+        Parameters
+        ----------
+        y: ndarray of np.float64
+            input values
+
+        out: ndarray of np.float64 or None
+            output array with the same shape as `y`. When `out` is None, `y` is
+            quantized in place.
+
+        scaling: String
+            Determine the scaling before and after quantizing / saturation, see
+            `fixp()` (lower case only).
+
+        Returns
+        -------
+        out : ndarray of np.float64
+        """
+        if out is None:
+            out = y
+        self._kernel(y, out, scaling)
+        return out
+
+    # --------------------------------------------------------------------------
+    def fixp_int(self, y, WF_in=None):
+        """
+        Integer domain counterpart of `fixp()`: Return the quantized and saturated /
+        wrapped fixpoint representation of `y` as integer (array) in units of LSB,
+        i.e. in the range `-2**(W-1)` ... `2**(W-1) - 1`.
+
+        Requantization is done with arithmetic shifts, overflows are handled with
+        bit masks (wrap) or clipping (sat). In contrast to `fixp()`, results are
+        bit-true for any wordlength. Results are returned with `dtype=np.int64` when
+        they fit into 63 bits (+ sign), otherwise as arrays with `dtype=object`
+        containing Python integers of arbitrary length.
+
+        Parameters
+        ----------
+        y: scalar or array-like
+            - When `WF_in is None`, `y` is a (float) number that is multiplied by
+              `self.scale` and quantized to an integer multiple of `LSB`. This
+              is the boundary from the float to the integer domain.
+
+            - Otherwise, `y` is an integer (array) with `WF_in` fractional bits, i.e.
+              it represents the value `y * 2**(-WF_in)`. It is requantized to `WF`
+              fractional bits without leaving the integer domain.
+
+        WF_in: int or None
+            number of fractional bits of integer input `y`
+
+        Returns
+        -------
+        integer scalar or ndarray
+            with the same shape as `y`
+
+        Examples
+        --------
+
+        >>> myQ = Fixed({'WI': 0, 'WF': 3, 'ovfl': 'wrap', 'quant': 'floor'})
+        >>> myQ.fixp_int([0.3, -1.5])
+        array([2, 4])
+        >>> myQ.fixp_int([5, -13], WF_in=4)  # 5/16, -13/16
+        array([ 2, -7])
+        >>> myQ.int2float(np.array([2, -7]))
+        array([ 0.25 , -0.875])
+        """
+        SCALAR = not np.shape(y)
+        if WF_in is None:
+            y = self._quant_float2int(y)
+        else:
+            y = self._requant_int(y, int(WF_in))
+        self.N += y.size
+
+        y = self._ovfl_int(y)
+
+        if SCALAR:
+            y = np.asarray(y).item()  # convert singleton array to scalar
+        return y
+
+    # --------------------------------------------------------------------------
+    def int2float(self, y, scaling='div'):
+        """
+        Convert integer fixpoint values `y` in units of LSB (e.g. returned by
+        `fixp_int()`) to float. This is the boundary from the integer to the float
+        domain.
+
+        Parameters
+        ----------
+        y: integer scalar or array-like
+
+        scaling: String
+            When `scaling` is 'div' (default) or 'multdiv', the result is divided
+            by `self.scale`, mirroring `fixp()`
+
+        Returns
+        -------
+        float scalar or ndarray
+            with the same shape as `y`
+        """
+        yf = np.asarray(y).astype(np.float64) * self.LSB
+        if scaling in {'div', 'multdiv'}:
+            yf = yf / self.scale
+        if not np.shape(y):
+            yf = yf.item()
+        return yf
+
+    # --------------------------------------------------------------------------
+    def _quant_float2int(self, y):
+        """
+        Multiply float (array) `y` by `scale`, quantize it to multiples of LSB
+        and return the result as integer ndarray in units of LSB.
+        """
+        y = np.asarray(y, dtype=np.float64) * self.scale / self.LSB
+
+        if self.quant == 'floor':
+            yq = np.floor(y)
+        elif self.quant in {'round', 'rint'}:
+            yq = np.rint(y)  # identical to np.round() for zero decimals
+        elif self.quant == 'fix':
+            yq = np.fix(y)
+        elif self.quant == 'ceil':
+            yq = np.ceil(y)
+        else:
+            raise Exception(f'Requantization type "{self.quant:s}" '
+                            'is not supported in integer mode!')
+
+        # replace NaNs by zero and +/- inf by values just outside the valid range,
+        # triggering a positive / negative overflow
+        yq = np.nan_to_num(yq, nan=0., posinf=2.**self.W, neginf=-2.**self.W)
+
+        if self.W > 63 or (yq.size > 0 and np.max(np.abs(yq)) >= 2.**63):
+            # Python integers with arbitrary length
+            return np.asarray(np.frompyfunc(int, 1, 1)(yq), dtype=object)
+        else:
+            return yq.astype(np.int64)
+
+    # --------------------------------------------------------------------------
+    def _requant_int(self, y, WF_in):
+        """
+        Requantize integer (array) `y` with `WF_in` fractional bits to `WF`
+        fractional bits using arithmetic shifts.
+        """
+        y = np.asarray(y)
+        if y.dtype != object:
+            if not np.issubdtype(y.dtype, np.integer):
+                raise TypeError(f'Integer input required, got "{y.dtype}"!')
+            y = y.astype(np.int64)
+
+        s = WF_in - self.WF  # number of bits to be removed (s > 0) or appended
+        if s <= 0:
+            if y.dtype != object and y.size > 0\
+                    and int(np.max(np.abs(y))).bit_length() - s > 62:
+                y = y.astype(object)  # result wouldn't fit into int64
+            return y << -s
+
+        if self.W > 63 or s > 62:
+            y = y.astype(object)
+
+        if self.quant == 'floor':
+            yq = y >> s
+        elif self.quant == 'ceil':
+            yq = -((-y) >> s)
+        elif self.quant == 'fix':
+            yq = np.where(y < 0, -((-y) >> s), y >> s)
+        elif self.quant in {'round', 'rint'}:
+            # round half to even like np.round() / np.rint() in `fixp()`
+            half = 1 << (s - 1)
+            yq = (y + half) >> s
+            tie = (y & ((1 << s) - 1)) == half
+            yq = np.where(tie & ((yq & 1) == 1), yq - 1, yq)
+        else:
+            raise Exception(f'Requantization type "{self.quant:s}" '
+                            'is not supported in integer mode!')
+        return yq
+
+    # --------------------------------------------------------------------------
+    def _ovfl_int(self, y):
+        """
+        Handle overflows of integer (array) `y` in units of LSB: Update overflow
+        flags and counters, saturate or wrap around using bit masks.
+        """
+        if self.ovfl == 'none':
+            self.ovr_flag = np.zeros(y.shape, dtype=int)
+            return y
+
+        MAX_int = (1 << (self.W - 1)) - 1
+        MIN_int = -(1 << (self.W - 1))
+        over_pos = np.asarray(y > MAX_int, dtype=bool)
+        over_neg = np.asarray(y < MIN_int, dtype=bool)
+        self.ovr_flag = over_pos.astype(int) - over_neg.astype(int)
+        self.N_over_neg += np.sum(over_neg)
+        self.N_over_pos += np.sum(over_pos)
+        self.N_over = self.N_over_neg + self.N_over_pos
+
+        if self.ovfl == 'sat':
+            y = np.where(over_pos, MAX_int, np.where(over_neg, MIN_int, y))
+        elif self.ovfl == 'wrap':
+            # keep the W LSBs and sign-extend the result: ((y & mask) ^ sign) - sign
+            y = ((y & ((1 << self.W) - 1)) ^ (1 << (self.W - 1))) - (1 << (self.W - 1))
+        else:
+            raise Exception(f'Unknown overflow type "{self.ovfl:s}"!')
+        return y
+
     # --------------------------------------------------------------------------
     def resetN(self):
-        """ Reset counter and overflow-counters of Fixed object"""
+        """ Reset counter, overflow-counters and DSM states of Fixed object"""
+        self.dsm_state = None
         self.N = 0
         self.N_points = 0
         self.N_over = 0
@@ -929,13 +1383,147 @@ class Fixed(object):
         else:
             return 0.0
 
+    # --------------------------------------------------------------------------
+    def frmt2float_vec(self, y, frmt=None):
+        """
+        Array version of `frmt2float()`: Return floating point representation for
+        the array-like `y` of fixpoint strings given in format `frmt`, yielding
+        the same results as converting each element with `frmt2float()`.
+
+        Regular strings (only valid digits of the selected format, at most one
+        radix point, an optional leading minus sign) are parsed in bulk: The array
+        of strings is converted to a matrix of ASCII codes, digit values and their
+        weights are calculated via lookup tables and cumulative sums, the
+        integer values are accumulated and quantized with a single call of `fixp()`.
+        All other strings (e.g. containing whitespace or illegal characters) are
+        converted element by element with `frmt2float()`, as are all strings in
+        bin, hex and csd format for wordlengths `W > W_VEC_MAX`.
+
+        Parameters
+        ----------
+        y: array-like of strings
+            to be quantized with the numeric base specified by `frmt`.
+
+        frmt: string (optional)
+            any of the formats `float`, `dec`, `bin`, `hex`, `csd`)
+            When `frmt` is unspecified, the instance parameter `self.frmt` is used
+
+        Returns
+        -------
+        ndarray of np.float64 with the same shape as `y`, invalid entries are
+        returned as 0 (NaN for format `float`).
+        """
+        if frmt is None:
+            frmt = self.frmt
+        frmt = frmt.lower()
+        y = np.asarray(y)
+        shape = y.shape
+        y = y.ravel()
+        y_float = np.zeros(len(y))
+
+        def convert_elementwise(idx):
+            for i in np.flatnonzero(idx):
+                y_f = self.frmt2float(y[i], frmt)
+                y_float[i] = np.nan if y_f is None else y_f
+
+        if len(y) == 0:
+            return y_float.reshape(shape)
+        if frmt == 'float':
+            try:
+                y_float = y.astype(np.float64)
+            except (TypeError, ValueError):
+                convert_elementwise(np.ones(len(y), dtype=bool))
+            return y_float.reshape(shape)
+        elif frmt not in {'dec', 'bin', 'hex', 'csd'} or self.WI < 0\
+                or (frmt != 'dec' and self.W > W_VEC_MAX):
+            convert_elementwise(np.ones(len(y), dtype=bool))
+            return y_float.reshape(shape)
+
+        try:  # matrix of ASCII codes (one row per string, padded with zeros)
+            chars = np.atleast_2d(y.astype(str).astype('S').view(np.uint8)
+                                  .reshape(len(y), -1))
+        except UnicodeEncodeError:  # non-ASCII characters
+            convert_elementwise(np.ones(len(y), dtype=bool))
+            return y_float.reshape(shape)
+
+        # digit values for all valid digit characters, -128 for other characters
+        digit_val = np.full(256, -128, dtype=np.int64)
+        if frmt == 'csd':
+            base_bits = 1
+            digit_val[np.frombuffer(b'-0+', dtype=np.uint8)] = [-1, 0, 1]
+        else:
+            base_bits = {'dec': 0, 'bin': 1, 'hex': 4}[frmt]
+            valid = {'dec': b'0123456789', 'bin': b'01', 'hex': b'0123456789ABCDEF'}[frmt]
+            digit_val[np.frombuffer(valid, dtype=np.uint8)] = np.arange(len(valid))
+            if frmt == 'hex':
+                digit_val[np.frombuffer(b'abcdef', dtype=np.uint8)] = np.arange(10, 16)
+        d = digit_val[chars]
+        is_digit = d >= 0 if frmt != 'csd' else d > -128
+        is_radix = (chars == ord('.')) | (chars == ord(','))
+        is_sign = np.zeros_like(is_digit)
+        if frmt != 'csd':  # leading minus sign
+            is_sign[:, 0] = chars[:, 0] == ord('-')
+        N_digits = np.sum(is_digit, axis=1)
+
+        regular = np.all(is_digit | is_radix | is_sign | (chars == 0), axis=1)\
+            & (np.sum(is_radix, axis=1) <= 1) & (N_digits > 0)
+        if frmt == 'bin':  # leading zeros after the sign are not stripped
+            regular &= ~(is_sign[:, 0] & (chars[:, min(1, chars.shape[1] - 1)] == ord('0')))
+        if frmt != 'dec':  # limit to 52 bits for exact float representation
+            regular &= N_digits * base_bits <= 52
+        # rows without non-zero digits (e.g. '', '0', '00') are converted to zero
+        zero = regular & ~np.any(is_digit & (d != 0), axis=1)
+        convert_elementwise(~regular)
+        regular &= ~zero
+
+        if frmt == 'dec':
+            chars_dec = np.where(is_radix, ord('.'), chars).astype(np.uint8)[regular]
+            y_dec = np.ascontiguousarray(chars_dec).view('S{0}'.format(chars.shape[1]))\
+                .ravel().astype(np.float64)
+            y_float[regular] = self.fixp(y_dec, scaling='div')
+            return y_float.reshape(shape)
+
+        d = np.where(is_digit, d, 0)[regular]
+        is_digit = is_digit[regular]
+        # exponent of each digit = number of digits to its right
+        exp = np.cumsum(is_digit[:, ::-1], axis=1)[:, ::-1] - is_digit
+        # number of fractional places = number of digits right of the radix point
+        has_radix = np.any(is_radix[regular], axis=1)
+        radix_pos = np.argmax(is_radix[regular], axis=1)
+        frc_places = np.where(has_radix, exp[np.arange(len(exp)), radix_pos], 0)
+
+        if frmt == 'csd':
+            y_dec = np.sum(d << exp, axis=1) / 2.**frc_places
+            y_float[regular] = self.fixp(y_dec, scaling='div')
+            return y_float.reshape(shape)
+
+        # bin and hex: calculate the absolute value, strip MSBs outside the
+        # fixpoint range, calculate the two's complement and restore the sign
+        frc_bits = base_bits * frc_places
+        raw_int = np.sum(d << (base_bits * exp), axis=1)
+        y_dec = raw_int / 2.**frc_bits
+        int_bits = np.maximum(np.floor(np.log2(y_dec)) + 1, 0).astype(np.int64)
+        trunc = int_bits > self.WI + 1
+        raw_int[trunc] &= (np.int64(1) << (self.WI + 1 + frc_bits[trunc])) - 1
+        y_dec = raw_int / 2.**frc_bits
+        nonzero = y_dec != 0
+        with np.errstate(divide='ignore'):
+            int_bits = np.maximum(np.floor(np.log2(y_dec)) + 1, 0).astype(np.int64)
+        y_dec = np.where(int_bits == self.WI + 1, y_dec - 2.**int_bits, y_dec)
+        y_dec = np.where(is_sign[regular, 0], -y_dec, y_dec)
+
+        idx = np.flatnonzero(regular)[nonzero]
+        y_float[idx] = self.fixp(y_dec[nonzero], scaling='div')
+        return y_float.reshape(shape)
+
     # --------------------------------------------------------------------------
     def float2frmt(self, y):
         """
         Called a.o. by `itemDelegate.displayText()` for on-the-fly number
         conversion. Returns fixpoint representation for `y` (scalar or array-like)
         with numeric format `self.frmt` and `self.W` bits. The result has the
-        same shape as `y`.
+        same shape as `y`. Arrays are converted to csd, hex or bin format using
+        array-level routines (`dec2csd_arr()`, `int2hex_arr()`, `int2bin_arr()`).
 
         The float is multiplied by `self.scale` and quantized / saturated
         using fixp() for all formats before it is converted to different number
@@ -955,22 +1543,6 @@ class Fixed(object):
         digits is returned.
         """
 
-        """
-        Define vectorized functions using numpys automatic type casting:
-        Vectorized functions for inserting binary point in string `bin_str`
-        after position `pos`.
-
-        Usage:  insert_binary_point(bin_str, pos)
-
-        Parameters: bin_str : string
-                    pos     : integer
-        """
-        insert_binary_point = np.vectorize(lambda bin_str, pos: (
-                                    bin_str[:pos+1] + "." + bin_str[pos+1:]))
-
-        binary_repr_vec = np.frompyfunc(np.binary_repr, 2, 1)
-        # ======================================================================
-
         if self.frmt == 'float':  # return float input value unchanged (no string)
             return y
         elif self.frmt == 'float32':
@@ -991,24 +1563,26 @@ class Fixed(object):
                 else:
                     # y_str = np.char.mod('%f',y_fix)
                     y_str = y_fix
-            elif self.frmt == 'csd':
-                y_str = dec2csd_vec(y_fix, self.WF)  # convert with WF fractional bits
-
-            else:  # bin or hex
-                # represent fixpoint number as integer in the range -2**(W-1) ... 2**(W-1)
-                y_fix_int = np.int64(np.round(y_fix / self.LSB))
-                # convert to (array of) string with 2's complement binary
-                y_bin_str = binary_repr_vec(y_fix_int, self.W)
-
-                if self.frmt == 'hex':
-                    y_str = bin2hex_vec(y_bin_str, self.WI)
-
-                else:  # self.frmt == 'bin':
-                    # insert radix point if required
-                    if self.WF > 0:
-                        y_str = insert_binary_point(y_bin_str, self.WI)
+            elif np.ndim(y_fix) > 0 and np.all(np.isfinite(y_fix))\
+                    and self.frmt == 'csd':
+                y_str = dec2csd_arr(y_fix, self.WF)  # convert with WF fractional bits
+
+            elif np.ndim(y_fix) > 0 and self.W <= 62 and self.WI >= 0\
+                    and np.all(np.abs(y_fix) <= self.MSB * 2)\
+                    and self.frmt in {'bin', 'hex'}:
+                # convert the whole array using bit operations on the integer
+                # representation in the range -2**(W-1) ... 2**(W-1) - 1
+                y_fix_int = np.round(y_fix / self.LSB).astype(np.int64)
+                if np.all(y_fix_int < 1 << (self.W - 1)):
+                    if self.frmt == 'bin':
+                        y_str = int2bin_arr(y_fix_int, self.WI, self.WF)
                     else:
-                        y_str = y_bin_str
+                        y_str = int2hex_arr(y_fix_int, self.WI, self.WF)
+                else:  # overflow
+                    y_str = self._float2frmt_elementwise(y_fix)
+
+            else:  # scalars and special cases
+                y_str = self._float2frmt_elementwise(y_fix)
 
             if isinstance(y_str, np.ndarray) and np.ndim(y_str) < 1:
                 y_str = y_str.item()  # convert singleton array to scalar
@@ -1017,6 +1591,43 @@ class Fixed(object):
         else:
             raise Exception(f'Unknown output format "{self.frmt}"!')
 
+    # --------------------------------------------------------------------------
+    def _float2frmt_elementwise(self, y_fix):
+        """
+        Convert quantized fixpoint value(s) `y_fix` to csd, hex or bin format
+        element by element. This is used for scalars and for arrays that cannot
+        be converted by the array-level routines (e.g. for W > 62 bits or
+        for overflows with `ovfl == 'none'`).
+        """
+        # Define vectorized functions using numpys automatic type casting:
+        # Vectorized function for inserting binary point in string `bin_str`
+        # after position `pos`, usage:  insert_binary_point(bin_str, pos)
+        insert_binary_point = np.vectorize(lambda bin_str, pos: (
+                                    bin_str[:pos+1] + "." + bin_str[pos+1:]))
+
+        binary_repr_vec = np.frompyfunc(np.binary_repr, 2, 1)
+        # ======================================================================
+        if self.frmt == 'csd':
+            y_str = dec2csd_vec(y_fix, self.WF)  # convert with WF fractional bits
+
+        else:  # bin or hex
+            # represent fixpoint number as integer in the range -2**(W-1) ... 2**(W-1)
+            y_fix_int = np.int64(np.round(y_fix / self.LSB))
+            # convert to (array of) string with 2's complement binary
+            y_bin_str = binary_repr_vec(y_fix_int, self.W)
+
+            if self.frmt == 'hex':
+                y_str = bin2hex_vec(y_bin_str, self.WI)
+
+            else:  # self.frmt == 'bin':
+                # insert radix point if required
+                if self.WF > 0:
+                    y_str = insert_binary_point(y_bin_str, self.WI)
+                else:
+                    y_str = y_bin_str
+
+        return y_str
+
 
 ########################################
 if __name__ == '__main__':
@@ -24,6 +24,7 @@ import numpy as np
 from scipy.io import loadmat, savemat
 
 from .pyfda_lib import safe_eval, lin2unit, pprint_log
+from .lazy_dict import LazyDict
 from .pyfda_qt_lib import qget_selected, qget_cmb_box, qset_cmb_box, qwindow_stay_on_top
 
 import pyfda.libs.pyfda_fix_lib as fx
@@ -1386,7 +1387,8 @@ def load_filter(self):
                             fb.fil[0][key] = a[key].tolist()
                 elif file_type == '.pkl':
                     # this only works for python >= 3.3
-                    fb.fil[0] = pickle.load(f, fix_imports=True, encoding='bytes')
+                    fb.fil[0] = LazyDict(
+                        pickle.load(f, fix_imports=True, encoding='bytes'))
                 else:
                     logger.error('Unknown file type "{0}"'.format(file_type))
                     file_type_err = True
@@ -1441,8 +1443,9 @@ def save_filter(self):
                 if file_type == '.npz':
                     np.savez(f, **fb.fil[0])
                 elif file_type == '.pkl':
-                    # save in default pickle version
-                    pickle.dump(fb.fil[0], f)
+                    # save in default pickle version, as a plain dict with all
+                    # lazily converted formats calculated
+                    pickle.dump(dict(fb.fil[0]), f)
                 else:
                     file_type_err = True
                     logger.error('Unknown file type "{0}"'.format(file_type))
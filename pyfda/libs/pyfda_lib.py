@@ -12,7 +12,10 @@ Library with various general functions and variables needed by the pyfda routine
 
 import os, re, io
 import sys, time
+import threading
 import struct
+import hashlib
+from collections import OrderedDict, Counter
 from contextlib import redirect_stdout
 import numpy as np
 from numpy import ndarray, pi, log10, sin, cos
@@ -20,9 +23,12 @@ import numexpr
 import markdown
 
 import scipy.signal as sig
+import scipy.fft
+from scipy.spatial import cKDTree
 
 from distutils.version import LooseVersion
 import pyfda.libs.pyfda_dirs as dirs
+from pyfda.libs.lazy_dict import LazyDict
 
 # ###### VERSIONS and related stuff ############################################
 # ================ Required Modules ============================
@@ -57,10 +63,13 @@ else:
 __all__ = ['cmp_version', 'mod_version',
            'set_dict_defaults', 'clean_ascii', 'qstr', 'safe_eval',
            'dB', 'lin2unit', 'unit2lin',
-           'cround', 'H_mag', 'cmplx_sort', 'unique_roots',
+           'cround', 'H_mag', 'H_mag_scale', 'H_abs_grid', 'H_abs_polar',
+           'cmplx_sort', 'unique_roots', 'poly_roots',
            'expand_lim', 'format_ticks', 'fil_save', 'fil_convert', 'sos2zpk',
+           'Roots2Poly', 'zpk2tf_inc',
            'round_odd', 'round_even', 'ceil_odd', 'floor_odd', 'ceil_even', 'floor_even',
-           'to_html', 'calc_Hcomplex']
+           'to_html', 'sos_freqz', 'zoom_freqz', 'adaptive_freqz', 'select_freq_range',
+           'calc_Hcomplex', 'clear_H_cache', 'fast_fft', 'rfft2fft', 'calc_fft_power']
 
 PY32_64 = struct.calcsize("P") * 8  # yields 32 or 64, depending on 32 or 64 bit Python
 
@@ -856,12 +865,15 @@ def cround(x, n_dig=0):
 
 
 # ------------------------------------------------------------------------------
-def sawtooth_bl(t):
+def sawtooth_bl(t, w=None):
     """
     Bandlimited sawtooth function as a direct replacement for
     `scipy.signal.sawtooth`. It is calculated by Fourier synthesis, i.e.
     by summing up all sine wave components up to the Nyquist frequency.
 
+    The phase increment per sample `w` is derived from `t` when it is not
+    specified.
+
     By Endolith, https://gist.github.com/endolith/407991
     """
     if t.dtype.char in ['fFdD']:
@@ -870,7 +882,9 @@ def sawtooth_bl(t):
         ytype = 'd'
     y = np.zeros(t.shape, ytype)
     # Get sampling frequency from timebase
-    fs = 1 / (t[1] - t[0])
+    if w is None:
+        w = t[1] - t[0]
+    fs = 1 / w
     # Sum all multiple sine waves up to the Nyquist frequency:
     for h in range(1, int(fs*pi)+1):
         y += 2 / pi * -sin(h * t) / h
@@ -900,12 +914,15 @@ def triang_bl(t):
 
 
 # ------------------------------------------------------------------------------
-def rect_bl(t, duty=0.5):
+def rect_bl(t, duty=0.5, w=None):
     """
     Bandlimited rectangular function as a direct replacement for
     `scipy.signal.square`. It is calculated by Fourier synthesis, i.e.
     by summing up all sine wave components up to the Nyquist frequency.
 
+    The phase increment per sample `w` is derived from `t` when it is not
+    specified, pass it for a time-varying `duty`.
+
     By Endolith, https://gist.github.com/endolith/407991
     """
     if t.dtype.char in ['fFdD']:
@@ -915,7 +932,9 @@ def rect_bl(t, duty=0.5):
     y = np.zeros(t.shape, ytype)
     # Get sampling frequency from timebase
     # Sum all multiple sine waves up to the Nyquist frequency:
-    y = sawtooth_bl(t - duty*2*pi) - sawtooth_bl(t) + 2*duty-1
+    if w is None:
+        w = t[1] - t[0]
+    y = sawtooth_bl(t - duty*2*pi, w) - sawtooth_bl(t, w) + 2*duty-1
     return y
 
 
@@ -970,33 +989,39 @@ def H_mag(num, den, z, H_max, H_min=None, log=False, div_by_0='ignore'):
     div_by_0 : string, optional
         What to do when division by zero occurs during calculation (default:
         'ignore'). As the denomintor of H(z) becomes 0 at each pole, warnings
-        are suppressed by default. This parameter is passed to numpy.seterr(),
-        hence other valid options are 'warn', 'raise' and 'print'.
+        are suppressed by default. This parameter is passed to numpy.errstate()
+        for the division at the poles, hence other valid options are 'warn',
+        'raise', 'call' and 'print'. It also applies to cached results.
 
     Returns
     -------
     H_mag : float or ndarray
         The magnitude `\|H(z)\|` for each value of `z`.
+
+    `\|H(z)\|` is calculated and cached by `H_abs_grid()`, use `H_abs_polar()`
+    and `H_mag_scale()` for polar grids.
     """
+    H_abs = H_abs_grid(num, den, z)
+    bad = ~np.isfinite(H_abs)
+    if div_by_0 != 'ignore' and np.any(bad):
+        # the (cached) grid is calculated silently, repeat the division at the
+        # poles with the requested floating point error handling
+        z_bad = np.asarray(z)[bad]
+        with np.errstate(divide=div_by_0, invalid=div_by_0):
+            np.polyval(num, z_bad) / np.polyval(den, z_bad)
+    return H_mag_scale(H_abs, H_max, H_min=H_min, log=log)
 
-    try:
-        len(num)
-    except TypeError:
-        num_val = abs(num)  # numerator is a scalar
-    else:
-        num_val = abs(np.polyval(num, z))  # evaluate numerator at z
-    try:
-        len(den)
-    except TypeError:
-        den_val = abs(den)  # denominator is a scalar
-    else:
-        den_val = abs(np.polyval(den, z))  # evaluate denominator at z
 
+def H_mag_scale(H_abs, H_max, H_min=None, log=False):
+    """
+    Replace nan and inf in the magnitude `H_abs`, optionally convert it to dB
+    (``log == True``) and clip it to `H_min` ... `H_max` like `H_mag()`.
+    """
     olderr = np.geterr()  # store current floating point error behaviour
     # turn off divide by zero warnings, just return 'inf':
     np.seterr(divide='ignore')
 
-    H_val = np.nan_to_num(num_val / den_val)  # remove nan and inf
+    H_val = np.nan_to_num(H_abs)  # remove nan and inf
     if log:
         H_val = 20 * np.log10(H_val)
 
@@ -1021,7 +1046,6 @@ def cmplx_sort(p):
 # ------------------------------------------------------------------------------
 # adapted from scipy.signal.signaltools.py:
 # TODO:  comparison of real values has several problems (5 * tol ???)
-# TODO: speed improvements
 def unique_roots(p, tol: float = 1e-3, magsort: bool = False,
                  rtype: str = 'min', rdist: str = 'euclidian'):
     """
@@ -1063,6 +1087,11 @@ def unique_roots(p, tol: float = 1e-3, magsort: bool = False,
     sequence of values for which uniqueness and multiplicity has to be
     determined. For a more general routine, see `numpy.unique`.
 
+    Complex roots are clustered in the order of the input list: The first root
+    that hasn't been assigned yet collects all remaining roots within `tol`.
+    Neighbours are found with a k-d tree (`scipy.spatial.cKDTree`), requiring
+    O(N log N) operations instead of comparing each root against all others.
+
     Examples
     --------
     >>> vals = [0, 1.3, 1.31, 2.8, 1.25, 2.2, 10.3]
@@ -1079,18 +1108,6 @@ def unique_roots(p, tol: float = 1e-3, magsort: bool = False,
 
     """
 
-    def manhattan(a, b):
-        """
-        Manhattan distance between a and b
-        """
-        return np.abs(a.real - b.real) + np.abs(a.imag - b.imag)
-
-    def euclid(a, b):
-        """
-        Euclidian distance between a and b
-        """
-        return np.abs(a - b)
-
     if rtype in ['max', 'maximum']:
         comproot = np.max
     elif rtype in ['min', 'minimum']:
@@ -1103,9 +1120,9 @@ def unique_roots(p, tol: float = 1e-3, magsort: bool = False,
         raise TypeError(rtype)
 
     if rdist in ['euclid', 'euclidian']:
-        dist_roots = euclid
+        p_norm = 2  # order of the Minkowski norm used for the distance
     elif rdist in ['rect', 'manhattan']:
-        dist_roots = manhattan
+        p_norm = 1
     else:
         raise TypeError(rdist)
 
@@ -1131,14 +1148,12 @@ def unique_roots(p, tol: float = 1e-3, magsort: bool = False,
             pass
 
         elif (np.iscomplexobj(p) and not magsort):
-            while len(p):
-                # calculate distance of first root against all others and itself
-                # -> multiplicity is at least 1, first root is always deleted
-                tolarr = np.less(dist_roots(p[0], p), tol)
-                mult.append(np.sum(tolarr))  # multiplicity = number of "hits"
-                pout.append(comproot(p[tolarr]))  # pick the roots within the tolerance
-
-                p = p[~tolarr]  # and delete them
+            seeds, mult_c, idx, bounds = _cluster_roots(p, tol, p_norm)
+            pout_c = p[seeds]
+            for k in np.flatnonzero(mult_c > 1):  # combine multiple roots
+                pout_c[k] = comproot(p[idx[bounds[k]:bounds[k + 1]]])
+            pout.extend(pout_c)
+            mult.extend(mult_c)
         else:
             sameroots = []  # temporary list for roots within the tolerance
             p, indx = cmplx_sort(p)
@@ -1161,6 +1176,51 @@ def unique_roots(p, tol: float = 1e-3, magsort: bool = False,
 
         return np.array(pout), np.array(mult)
 
+
+
+def _cluster_roots(p, tol: float, p_norm: int):
+    """
+    Cluster the complex values `p` for `unique_roots()`: Going through `p` in
+    order, each value that hasn't been assigned to a cluster yet becomes the
+    seed of a new cluster with all unassigned values at a distance `< tol`.
+    The distance is measured with the Minkowski `p_norm` (1: manhattan,
+    2: euclidian).
+
+    Returns the indices `seeds` of the cluster seeds in ascending order, the
+    number of values `mult` per cluster and the value indices `idx` sorted by
+    cluster, cluster `k` contains `p[idx[bounds[k]:bounds[k+1]]]`.
+    """
+    N = len(p)
+    labels = np.arange(N)  # index of the seed for each value
+    xy = np.column_stack((p.real, p.imag))
+    pairs = cKDTree(xy).query_pairs(tol, p=p_norm, output_type='ndarray')
+    if len(pairs):  # query_pairs() returns distances <= tol
+        d = p[pairs[:, 0]] - p[pairs[:, 1]]
+        d = np.abs(d) if p_norm == 2 else np.abs(d.real) + np.abs(d.imag)
+        pairs = pairs[d < tol]
+    if len(pairs):
+        # neighbours of each value in both directions, sorted by index
+        i = np.concatenate((pairs[:, 0], pairs[:, 1]))
+        j = np.concatenate((pairs[:, 1], pairs[:, 0]))
+        order = np.lexsort((j, i))
+        i, j = i[order], j[order]
+        nodes, first = np.unique(i, return_index=True)
+        last = np.append(first[1:], len(i))
+        assigned = np.zeros(N, dtype=bool)
+        # only values with neighbours need to be visited in the order of `p`
+        for n, k1, k2 in zip(nodes, first, last):
+            if assigned[n]:
+                continue
+            nb = j[k1:k2]
+            nb = nb[~assigned[nb]]
+            labels[nb] = n
+            assigned[nb] = True
+            assigned[n] = True
+
+    idx = np.argsort(labels, kind='stable')  # keeps order within clusters
+    seeds, bounds, mult = np.unique(labels[idx], return_index=True, return_counts=True)
+    return seeds, mult, idx, np.append(bounds, N)
+
 # #### original code ####
 #    p = asarray(p) * 1.0
 #    tol = abs(tol)
@@ -1187,7 +1247,290 @@ def unique_roots(p, tol: float = 1e-3, magsort: bool = False,
 
 
 # ------------------------------------------------------------------------------
-def calc_ssb_spectrum(A: ndarray) -> ndarray:
+def poly_roots(p, polish: bool = True, sym_tol: float = 1e-10):
+    """
+    Calculate the roots of the polynomial with the coefficients `p` (highest
+    power first) like `np.roots()`, optimized for long linear-phase FIR filters.
+
+    Parameters
+    ----------
+    p : array_like
+        Polynomial coefficients, e.g. the coefficients `b` of an FIR filter
+
+    polish : bool, default True
+        Refine the roots with Newton / Aberth iterations on `p`
+
+    sym_tol : float, default 1e-10
+        Relative tolerance for detecting (anti-)symmetric coefficients
+
+    Returns
+    -------
+    z : ndarray
+        Complex roots of `p`
+
+    Notes
+    -----
+    The roots of polynomials with real, symmetric or antisymmetric coefficients
+    (linear-phase FIR filters) come in reciprocal pairs `z`, `1/z`. Roots at
+    `z = 1` and `z = -1` are split off by deflation, the remaining symmetric
+    polynomial of degree `2m` is a polynomial of degree `m` in
+    `y = (z + 1/z) / 2`. Its `m` roots are found simultaneously with the Aberth
+    iteration which needs O(N^2) instead of O(N^3) operations for the
+    eigenvalues of the companion matrix in `np.roots()`. The polynomial is
+    always evaluated at `|z| >= 1` with the reversed coefficients, this avoids
+    overflow for high degrees. All other polynomials are solved with
+    `np.roots()`.
+
+    The roots are polished with simultaneous Newton / Aberth steps on the
+    undeflated polynomial, a step is only accepted when it reduces the Newton
+    correction `|p(z) / p'(z)|`.
+    """
+    p = np.trim_zeros(np.atleast_1d(p), 'f')
+    if np.iscomplexobj(p) and not np.any(p.imag):
+        p = p.real
+    if len(p) == 0:
+        return np.array([], dtype=complex)
+    N_0 = len(p) - len(np.trim_zeros(p, 'b'))  # trailing zeros = roots at origin
+    p = p[:len(p) - N_0] / p[0]
+    z_0 = np.zeros(N_0, dtype=complex)
+    if len(p) < 2:
+        return z_0
+
+    q = p
+    z_pm = []  # roots at +1 / -1 split off by deflation
+    atol = sym_tol * np.max(np.abs(p))
+    if np.isrealobj(p):
+        while len(q) > 1:
+            if np.allclose(q, q[::-1], rtol=0, atol=atol):
+                if len(q) % 2:  # even degree
+                    break
+                # symmetric polynomial with odd degree has a root at z = -1
+                sgn = (-1.)**np.arange(len(q))
+                q = sgn[:-1] * np.cumsum(sgn * q)[:-1]
+                z_pm.append(-1.)
+            elif np.allclose(q, -q[::-1], rtol=0, atol=atol):
+                # antisymmetric polynomial has a root at z = 1
+                q = np.cumsum(q)[:-1]
+                z_pm.append(1.)
+            else:
+                q = None  # no linear-phase polynomial
+                break
+            q = (q + q[::-1]) / 2  # enforce symmetry of deflated polynomial
+    else:
+        q = None
+
+    if q is None:
+        z = np.roots(p).astype(complex)
+        N_polish = len(z)
+    else:
+        if len(q) < 2:  # all roots have been found by deflation
+            z_1 = np.array([], dtype=complex)
+        else:
+            z_1 = _y2z(_aberth_sym(q))
+        z = np.concatenate((z_1, 1 / z_1, z_pm))
+        N_polish = 2 * len(z_1)  # keep roots found by deflation
+    if polish and N_polish > 0:
+        z = _polish_roots(p, z, N_polish)
+    return np.concatenate((z, z_0))
+
+
+ROOTS_CHUNK = 2**16  #: max. number of elements of temporary arrays in `poly_roots()`
+
+
+def _newton_step(p, z):
+    """
+    Newton correction `p(z) / p'(z)` for all roots `z`, evaluated with the
+    reversed polynomial for `|z| > 1` to avoid overflow for high degrees
+    """
+    n = len(p) - 1
+    w = np.empty_like(z)
+    outside = np.abs(z) > 1
+    for mask, coeffs in ((~outside, p), (outside, p[::-1])):
+        if not np.any(mask):
+            continue
+        x = z[mask] if coeffs is p else 1 / z[mask]
+        f = np.full_like(x, coeffs[0])
+        df = np.zeros_like(x)
+        for c in coeffs[1:]:  # Horner scheme for function and derivative
+            df = df * x + f
+            f = f * x + c
+        if coeffs is p:
+            w[mask] = f / df
+        else:  # p(z) / p'(z) = z q(x) / (n q(x) - x q'(x)) with x = 1 / z
+            w[mask] = z[mask] * f / (n * f - x * df)
+    return w
+
+
+def _aberth_sums(z, idx):
+    """
+    Return sum_{j != k} 1 / (z_k - z_j) for the roots `z[idx]`, calculated in
+    chunks of `ROOTS_CHUNK` elements
+    """
+    S = np.zeros(len(idx), dtype=complex)
+    N_rows = max(1, ROOTS_CHUNK // max(len(z), 1))
+    for i in range(0, len(idx), N_rows):
+        d = z[idx[i:i + N_rows], np.newaxis] - z
+        d[d == 0] = np.inf  # exclude the root itself
+        S[i:i + N_rows] = np.sum(1 / d, axis=1)
+    return S
+
+
+def _y2z(y):
+    """
+    Root `z` of z^2 - 2 y z + 1 = 0 with `|z| >= 1`, the other root is `1/z`
+    """
+    s = np.sqrt(y * y - 1)
+    s[(y.conj() * s).real < 0] *= -1  # avoid cancellation
+    return y + s
+
+
+def _aberth_sym(q, N_iter: int = 200):
+    """
+    Find the `m` roots `y = (z + 1/z) / 2` of the symmetric polynomial `q` of
+    degree `2m` with the Aberth iteration, `z^-m q(z)` is a polynomial in `y`.
+    """
+    m = (len(q) - 1) // 2
+    # initial values on an ellipse around [-1, 1] (circle |z| = 1.01),
+    # asymmetric to the real axis
+    z = 1.01 * np.exp(2j * pi * (np.arange(m) + 0.25) / m)
+    y = (z + 1 / z) / 2
+    active = np.arange(m)
+    corr_prev = np.full(m, np.inf)
+    eps = np.finfo(float).eps
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        for _ in range(N_iter):
+            z = _y2z(y[active])
+            N_z = _newton_step(q, z)
+            # A(y) / A'(y) with A(y) = z^-m q(z) and dy/dz = (1 - z^-2) / 2
+            N_y = (1 - z**-2) / 2 / (1 / N_z - m / z)
+            corr = N_y / (1 - N_y * _aberth_sums(y, active))
+            ok = np.isfinite(corr)
+            y[active[ok]] -= corr[ok]
+            # stop iterating for converged roots: correction at machine precision
+            # or not decreasing anymore (limited by rounding errors)
+            c_abs = np.abs(corr)
+            y_abs = np.maximum(1, np.abs(y[active]))
+            conv = (c_abs <= 4 * eps * y_abs)\
+                | ((c_abs > corr_prev[active] / 2) & (c_abs < 1e-8 * y_abs))
+            corr_prev[active] = c_abs
+            active = active[ok & ~conv]
+            if len(active) == 0:
+                break
+    return y
+
+
+def _polish_roots(p, z, N_polish: int, N_iter: int = 5):
+    """
+    Refine the first `N_polish` roots in `z` of the polynomial `p` with
+    simultaneous Newton / Aberth steps, steps that don't decrease the Newton
+    correction are rejected.
+    """
+    z = np.array(z, dtype=complex)
+    idx = np.arange(N_polish)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        w = np.abs(_newton_step(p, z[idx]))
+        for _ in range(N_iter):
+            N = _newton_step(p, z[idx])
+            z_new = z[idx] - N / (1 - N * _aberth_sums(z, idx))
+            w_new = np.abs(_newton_step(p, z_new))
+            better = w_new < w
+            if not np.any(better):
+                break
+            z[idx[better]] = z_new[better]
+            w[better] = w_new[better]
+    return z
+
+
+# ------------------------------------------------------------------------------
+FFT_WORKERS = -1  #: default number of threads for `fast_fft()`, -1: all CPU cores
+
+
+def fast_fft(x, N: int = None, sides: str = 'two', workers: int = None,
+             fast_len: bool = False, axis: int = -1) -> ndarray:
+    """
+    Calculate the FFT of `x` along `axis` with `scipy.fft`, using the real-valued
+    FFT (which needs about half the time and memory) for real `x`.
+
+    Parameters
+    ----------
+    x : array-like
+        real or complex signal
+
+    N : int, optional
+        number of FFT points (zero-padding or truncation), default: `x.shape[axis]`
+
+    sides : str, optional
+        'one': return bins 0 ... N//2 (0 <= f <= f_S/2). For real `x`, this is the
+        result of the real-valued FFT, for complex `x` a view of the full FFT.
+
+        'two' (default): return all `N` bins. For real `x`, the negative
+        frequencies are filled in from the conjugate complex positive frequencies.
+
+    workers : int, optional
+        maximum number of threads for calculating multiple FFTs along `axis`,
+        default: `FFT_WORKERS`
+
+    fast_len : bool, optional
+        When True, `N` is increased to the next length with small prime factors
+        which can be calculated much faster (additional zero-padding). This
+        changes the frequency grid, use only where allowed.
+
+    Returns
+    -------
+    X : ndarray
+        complex spectrum with `N` (`sides='two'`) or `N//2 + 1` (`sides='one'`)
+        points along `axis`
+    """
+    x = np.asarray(x)
+    if N is None:
+        N = x.shape[axis]
+    if fast_len:
+        N = scipy.fft.next_fast_len(N, real=not np.iscomplexobj(x))
+    if workers is None:
+        workers = FFT_WORKERS
+
+    if np.iscomplexobj(x):
+        X = scipy.fft.fft(x, N, axis=axis, workers=workers)
+        if sides == 'one':
+            X = np.moveaxis(np.moveaxis(X, axis, -1)[..., :N//2 + 1], -1, axis)
+        return X
+
+    X = scipy.fft.rfft(x, N, axis=axis, workers=workers)
+    if sides == 'two':
+        X = rfft2fft(X, N, axis=axis)
+    return X
+
+
+# ------------------------------------------------------------------------------
+def rfft2fft(R: ndarray, N: int, axis: int = -1) -> ndarray:
+    """
+    Return the full spectrum with `N` bins of a real signal from its real-valued
+    FFT `R` (bins 0 ... N//2) along `axis` by using the conjugate symmetry.
+    """
+    R = np.moveaxis(R, axis, -1)
+    X = np.empty(R.shape[:-1] + (N,), dtype=R.dtype)
+    M = N//2 + 1
+    X[..., :M] = R
+    X[..., M:] = np.conj(R[..., N - M:0:-1])
+    return np.moveaxis(X, -1, axis)
+
+
+# ------------------------------------------------------------------------------
+def calc_fft_power(X: ndarray, N: int = None) -> float:
+    """
+    Return the total power `sum(|X|^2)` of the double-sided spectrum with `N`
+    points. `X` is either the double-sided spectrum or the single-sided spectrum
+    of a real signal with bins 0 ... N//2 as returned by `fast_fft(..., sides='one')`.
+    """
+    P = np.square(np.abs(X))
+    if N is None or len(X) == N:
+        return np.sum(P)
+    # double the power of all bins except DC and (for even N) f_S/2
+    return P[0] + 2 * np.sum(P[1:(N + 1)//2]) + (P[N//2] if N % 2 == 0 else 0)
+
+
+# ------------------------------------------------------------------------------
+def calc_ssb_spectrum(A: ndarray, N: int = None) -> ndarray:
     """
     Calculate the single-sideband spectrum from a double-sideband
     spectrum by doubling the spectrum below fS/2 (leaving the DC-value
@@ -1207,13 +1550,20 @@ def calc_ssb_spectrum(A: ndarray) -> ndarray:
 
             [0, 1, 2, ..., 4, -5, -4, ... , -1] for len(A) = 10
 
+        Only the bins 0 ... N//2 are used, i.e. `A` can also be a
+        single-sided spectrum as returned by `fast_fft(..., sides='one')`.
+
+    N : int, optional
+        number of points of the double-sided spectrum, default: `len(A)`
+
     Returns
     -------
     A_SSB : array-like
         single-sided spectrum with half the number of input values
 
     """
-    N = len(A)
+    if N is None:
+        N = len(A)
 
     A_SSB = np.insert(A[1:N//2] * 2, 0, A[0])
     # A_SSB = np.insert(A[1:N//2] + A[-1:-(N//2):-1].conj(),0, A[0]) # doesn't work
@@ -1442,6 +1792,7 @@ def fil_save(fil_dict: dict, arg, format_in: str, sender: str,
 
     fil_dict['creator'] = (format_in, sender)
     fil_dict['timestamp'] = time.time()
+    clear_H_cache()  # cached frequency responses are outdated
 
     # Remove any antiCausal zero/poles
     if 'zpkA' in fil_dict:
@@ -1486,7 +1837,20 @@ def fil_convert(fil_dict: dict, format_in) -> None:
     Exceptions
     ----------
     ValueError for Nan / Inf elements or other unsuitable parameters
+
+    Notes
+    -----
+    When ``fil_dict`` is a `LazyDict` like ``fb.fil[0]``, the derived formats
+    are only converted when they are accessed for the first time. The cost of
+    e.g. finding the roots of a long FIR filter is only paid when the P/Z
+    plot or the P/Z input widget need them. Errors of deferred conversions
+    are raised as ValueError on access.
     """
+    if 'ba' in format_in:
+        # eliminate complex coefficients created by numerical inaccuracies
+        # `tol` is specified in multiples of machine eps
+        fil_dict['ba'] = np.real_if_close(fil_dict['ba'], tol=100)
+
     if 'sos' in format_in:
         # check for bad coeffs before converting IIR filt
         # this is the same defn used by scipy (tolerance of 1e-14)
@@ -1502,36 +1866,13 @@ def fil_convert(fil_dict: dict, format_in) -> None:
                         "\t'fil_convert()': Bad coefficients, Order N is too high!")
 
         if 'zpk' not in format_in:
-            try:
-                fil_dict['zpk'] = list(sig.sos2zpk(fil_dict['sos']))
-            except Exception as e:
-                raise ValueError(e)
-            # check whether sos conversion has created a additional (superfluous)
-            # pole and zero at the origin and delete them:
-            z_0 = np.where(fil_dict['zpk'][0] == 0)[0]
-            p_0 = np.where(fil_dict['zpk'][1] == 0)[0]
-            if p_0 and z_0:  # eliminate z = 0 and p = 0 from list:
-                fil_dict['zpk'][0] = np.delete(fil_dict['zpk'][0], z_0)
-                fil_dict['zpk'][1] = np.delete(fil_dict['zpk'][1], p_0)
-
+            _set_converted(fil_dict, 'zpk', _sos2zpk)
         if 'ba' not in format_in:
-            try:
-                fil_dict['ba'] = list(sig.sos2tf(fil_dict['sos']))
-            except Exception as e:
-                raise ValueError(e)
-            # check whether sos conversion has created additional (superfluous)
-            # highest order polynomial with coefficient 0 and delete them
-            if fil_dict['ba'][0][-1] == 0 and fil_dict['ba'][1][-1] == 0:
-                fil_dict['ba'][0] = np.delete(fil_dict['ba'][0], -1)
-                fil_dict['ba'][1] = np.delete(fil_dict['ba'][1], -1)
+            _set_converted(fil_dict, 'ba', _sos2ba)
 
     elif 'zpk' in format_in:  # z, p, k have been generated,convert to other formats
-        zpk = fil_dict['zpk']
         if 'ba' not in format_in:
-            try:
-                fil_dict['ba'] = sig.zpk2tf(zpk[0], zpk[1], zpk[2])
-            except Exception as e:
-                raise ValueError(e)
+            _set_converted(fil_dict, 'ba', _zpk2ba)
         if 'sos' not in format_in:
             fil_dict['sos'] = []  # don't convert zpk -> SOS due to numerical inaccuracies
 #            try:
@@ -1543,16 +1884,11 @@ def fil_convert(fil_dict: dict, format_in) -> None:
     elif 'ba' in format_in:  # arg = [b,a]
         b, a = fil_dict['ba'][0], fil_dict['ba'][1]
         if np.all(np.isfinite([b, a])):
-            zpk = sig.tf2zpk(b, a)
-            fil_dict['zpk'] = [np.nan_to_num(zpk[0]).astype(complex),
-                               np.nan_to_num(zpk[1]).astype(complex),
-                               np.nan_to_num(zpk[2])
-                               ]
+            _set_converted(fil_dict, 'zpk', _ba2zpk)
         else:
             raise ValueError(
                 "\t'fil_convert()': Cannot convert coefficients with NaN or Inf elements "
                 "to zpk format!")
-            zpk = None
         fil_dict['sos'] = []  # don't convert ba -> SOS due to numerical inaccuracies
 #        if SOS_AVAIL:
 #            try:
@@ -1564,9 +1900,195 @@ def fil_convert(fil_dict: dict, format_in) -> None:
     else:
         raise ValueError(f"\t'fil_convert()': Unknown input format {format_in:s}")
 
-    # eliminate complex coefficients created by numerical inaccuracies
-    # `tol` is specified in multiples of machine eps
-    fil_dict['ba'] = np.real_if_close(fil_dict['ba'], tol=100)
+
+def _set_converted(fil_dict: dict, key: str, func) -> None:
+    """
+    Store the format `key` converted by `func(fil_dict)` in `fil_dict`. For a
+    `LazyDict` like `fb.fil[0]`, the conversion is deferred until the format
+    is accessed for the first time.
+    """
+    if isinstance(fil_dict, LazyDict):
+        fil_dict.set_lazy(key, func)
+    else:
+        fil_dict[key] = func(fil_dict)
+
+
+def _sos2zpk(fil_dict: dict) -> list:
+    """ Convert second-order sections in `fil_dict` to [z, p, k] """
+    try:
+        zpk = list(sig.sos2zpk(fil_dict['sos']))
+    except Exception as e:
+        raise ValueError(e)
+    # check whether sos conversion has created a additional (superfluous)
+    # pole and zero at the origin and delete them:
+    z_0 = np.where(zpk[0] == 0)[0]
+    p_0 = np.where(zpk[1] == 0)[0]
+    if p_0 and z_0:  # eliminate z = 0 and p = 0 from list:
+        zpk[0] = np.delete(zpk[0], z_0)
+        zpk[1] = np.delete(zpk[1], p_0)
+    return zpk
+
+
+def _sos2ba(fil_dict: dict):
+    """ Convert second-order sections in `fil_dict` to [b, a] """
+    try:
+        ba = list(sig.sos2tf(fil_dict['sos']))
+    except Exception as e:
+        raise ValueError(e)
+    # check whether sos conversion has created additional (superfluous)
+    # highest order polynomial with coefficient 0 and delete them
+    if ba[0][-1] == 0 and ba[1][-1] == 0:
+        ba[0] = np.delete(ba[0], -1)
+        ba[1] = np.delete(ba[1], -1)
+    return np.real_if_close(ba, tol=100)
+
+
+def _zpk2ba(fil_dict: dict):
+    """ Convert [z, p, k] in `fil_dict` to [b, a] """
+    zpk = fil_dict['zpk']
+    try:
+        ba = zpk2tf_inc(zpk[0], zpk[1], zpk[2])
+    except Exception as e:
+        raise ValueError(e)
+    return np.real_if_close(ba, tol=100)
+
+
+def _ba2zpk(fil_dict: dict) -> list:
+    """ Convert [b, a] in `fil_dict` to [z, p, k] """
+    b, a = fil_dict['ba'][0], fil_dict['ba'][1]
+    b_t = np.trim_zeros(np.atleast_1d(b), 'f')
+    if len(b_t) > 1 and not np.any(a[1:]):
+        # FIR filter: all poles are at the origin, find zeros with `poly_roots()`
+        # which is faster and more accurate for long linear-phase filters
+        zpk = (poly_roots(b_t), np.zeros(len(a) - 1), b_t[0] / a[0])
+    else:
+        zpk = sig.tf2zpk(b, a)
+    return [np.nan_to_num(zpk[0]).astype(complex),
+            np.nan_to_num(zpk[1]).astype(complex),
+            np.nan_to_num(zpk[2])]
+
+
+# ------------------------------------------------------------------------------
+class Roots2Poly:
+    """
+    Coefficients of the monic polynomial with the roots `r`, updated from the
+    previous call of `poly()` when only a few roots have been added, removed
+    or moved: Each removed root is deflated (synthetic division by `(x - r)`)
+    and each added root is multiplied in (convolution with `[1, -r]`), both
+    with O(N) operations instead of O(N^2) for `np.poly()`.
+
+    The error of an update is checked by evaluating the polynomial at
+    `N_check` equidistant points on the unit circle and at the angles of the
+    added roots (where the magnitude is smallest for roots close to the unit
+    circle, e.g. high-Q poles) and comparing it to the product of the linear
+    factors. The error is measured relative to the magnitude at each point
+    unless it is below the rounding error of the coefficients (where the
+    polynomial is ill-conditioned, `np.poly()` can't do better either). The
+    polynomial is recalculated with `np.poly()` when this error exceeds `tol`
+    or four times the error of the last recalculation, after `N_max`
+    successive updates or when more than `N_edit` roots have changed.
+    """
+    def __init__(self, N_edit: int = 8, N_max: int = 100, tol: float = 1e-12,
+                 N_check: int = 32):
+        self.N_edit = N_edit
+        self.N_max = N_max
+        self.tol = tol
+        self.phi_check = 2 * np.pi * (np.arange(N_check) + 0.37) / N_check
+        self.r = None  # roots of the last call
+        self.c = None  # corresponding polynomial coefficients
+        self.err_max = tol  # max. error of updates
+        self.N_inc = 0  # number of successive incremental updates
+
+    def poly(self, r) -> np.ndarray:
+        """
+        Return the coefficients of the polynomial with the roots `r`, the same
+        as `np.poly(r)` up to rounding errors.
+        """
+        r = np.atleast_1d(np.asarray(r, dtype=complex)).ravel()
+        if self.r is None or not np.array_equal(r, self.r):
+            c = self._update(r)
+            if c is None:
+                c = np.atleast_1d(np.poly(r))
+                err = self._error(c, r)
+                self.err_max = max(self.tol, 4 * err) if np.isfinite(err) else self.tol
+                self.N_inc = 0
+            else:
+                self.N_inc += 1
+            self.r, self.c = r.copy(), c
+        return self.c.copy()
+
+    def _update(self, r):
+        """
+        Return the polynomial for the roots `r` derived from the previous one
+        or None when it has to be recalculated
+        """
+        if self.r is None or self.N_inc >= self.N_max:
+            return None
+        r_add = Counter(r.tolist())
+        r_rem = Counter(self.r.tolist())
+        r_add, r_rem = r_add - r_rem, r_rem - r_add
+        if sum(r_add.values()) + sum(r_rem.values()) > self.N_edit:
+            return None
+        c = self.c
+        for r_o in r_rem.elements():
+            c = _deflate(c, r_o)
+        r_add = list(r_add.elements())
+        for r_n in r_add:
+            c = np.convolve(c, [1, -r_n])
+        # real coefficients for conjugate pairs of roots, the same test as np.poly()
+        pos = np.sort_complex(r[r.imag > 0])
+        neg = np.sort_complex(np.conjugate(r[r.imag < 0]))
+        if len(pos) == len(neg) and np.all(pos == neg):
+            c = c.real.copy()
+        if not self._error(c, r, np.angle(r_add)) <= self.err_max:  # also catches NaN
+            return None
+        return c
+
+    def _error(self, c, r, phi=()) -> float:
+        """
+        Max. error of the polynomial `c` compared to the product of the linear
+        factors at the check points on the unit circle and at the additional
+        angles `phi`, relative to the magnitude of the product at each point
+        plus the rounding error of the coefficients scaled by `1 / tol`
+        """
+        phi = np.concatenate((self.phi_check, phi))
+        c_x = np.exp(1j * np.outer(phi, np.arange(len(c) - 1, -1, -1))) @ c
+        # rounding error bound for evaluating c on the unit circle
+        c_round = len(c) * np.finfo(float).eps * np.sum(np.abs(c))
+        d = np.exp(1j * phi)[:, np.newaxis] - r
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            P = np.exp(np.sum(np.log(np.abs(d)), axis=1)
+                       + 1j * np.sum(np.angle(d), axis=1))
+            err = np.max(np.abs(c_x - P) / (np.abs(P) + c_round / self.tol))
+        return err if np.isfinite(c_round) else np.inf
+
+
+def _deflate(c, r):
+    """
+    Divide the polynomial `c` by `(x - r)` and return the quotient. For
+    `|r| > 1`, the reversed polynomial is divided by `(x - 1/r)` for
+    numerical stability.
+    """
+    if abs(r) <= 1:
+        return sig.lfilter([1], [1, -r], c)[:-1]  # Horner recursion q_i = c_i + r q_{i-1}
+    return -sig.lfilter([1], [1, -1 / r], c[::-1])[-2::-1] / r
+
+
+_zpk2tf_polys = (Roots2Poly(), Roots2Poly())  # zeros and poles for `zpk2tf_inc()`
+_zpk2tf_lock = threading.Lock()  # `_zpk2tf_polys` are shared by all threads
+
+
+def zpk2tf_inc(z, p, k):
+    """
+    Return polynomial transfer function representation `[b, a]` from zeros,
+    poles and gain like `scipy.signal.zpk2tf()`. The polynomials are updated
+    incrementally from the previous call when only a few poles or zeros have
+    been edited, e.g. in the P/Z input widget (see `Roots2Poly`).
+    """
+    with _zpk2tf_lock:
+        b = np.atleast_1d(k) * _zpk2tf_polys[0].poly(z)
+        a = _zpk2tf_polys[1].poly(p)
+    return b, a
 
 
 # ------------------------------------------------------------------------------
@@ -1658,49 +2180,338 @@ def floor_even(x) -> int:
 
 
 # ------------------------------------------------------------------------------
-def calc_Hcomplex(fil_dict, worN, wholeF, fs=2*np.pi):
+H_CACHE_SIZE = 16  #: max. number of frequency responses cached by `calc_Hcomplex()`
+_H_cache = OrderedDict()  # LRU cache {key: (W, H) or |H|} for `calc_Hcomplex()` etc.
+H_ZOOM_CACHE_SIZE = 4  #: max. number of cached responses in zoomed bands (`f_range`)
+# separate LRU cache for zoomed bands, panning and zooming create a new band
+# with each event and would evict the full range responses shared by the plots
+_H_zoom_cache = OrderedDict()
+
+H_INC_EDITS = 4  #: max. number of changed coefficients / roots for incremental updates
+H_INC_MAX = 32  #: max. number of successive incremental updates of a response
+# last response per frequency grid as base for incremental updates, not cleared
+# by `clear_H_cache()` as the base is compared by content
+_H_base = OrderedDict()
+
+
+def clear_H_cache() -> None:
     """
-    A wrapper around `signal.freqz()` for calculating the complex frequency
-    response H(f) for antiCausal systems as well. The filter coefficients are
-    are extracted from the filter dictionary.
+    Clear the cache of frequency responses calculated by `calc_Hcomplex()`,
+    `H_abs_grid()` and `H_abs_polar()`
+    """
+    _H_cache.clear()
+    _H_zoom_cache.clear()
+
+
+def _hash_arrays(*arrs) -> str:
+    """
+    Return a hash of the content (values, dtype and shape) of the arrays `arrs`
+    """
+    h = hashlib.sha1()
+    for arr in arrs:
+        arr = np.ascontiguousarray(arr)
+        h.update("{0}{1}".format(arr.dtype.str, arr.shape).encode())
+        h.update(arr.tobytes())
+    return h.hexdigest()
+
+
+def _cache_get(key, cache=None):
+    """
+    Return the result for `key` cached in `cache` (default: `_H_cache`) and mark
+    it as most recently used or return None
+    """
+    cache = _H_cache if cache is None else cache
+    if key in cache:
+        cache.move_to_end(key)
+        return cache[key]
+    return None
+
+
+def _cache_put(key, *arrs, cache=None, size=None):
+    """
+    Make the arrays `arrs` read-only and store them in the LRU cache `cache`
+    (default: `_H_cache` with `H_CACHE_SIZE` entries) with max. `size` entries
+    under `key`, return `arrs` (or the single array)
+    """
+    if cache is None:
+        cache, size = _H_cache, H_CACHE_SIZE
+    for arr in arrs:
+        arr.setflags(write=False)
+    cache[key] = arrs if len(arrs) > 1 else arrs[0]
+    if len(cache) > size:
+        cache.popitem(last=False)  # remove least recently used entry
+    return cache[key]
+
+
+# ------------------------------------------------------------------------------
+def sos_freqz(sos, worN=512, whole: bool = False, fs: float = 2*np.pi):
+    """
+    Calculate the complex frequency response of a cascade of second-order
+    sections like `scipy.signal.sosfreqz()`, but evaluating all sections at once.
+
+    Numerator and denominator of all sections are evaluated in one (FFT or matrix)
+    operation, the response is the product of the ratios of all sections. This
+    avoids the numerical problems of the expanded `ba` polynomials for high
+    filter orders.
 
     Parameters
     ----------
+    sos : array-like
+        second-order sections with shape `(n_sections, 6)`
 
-    fil_dict: dict
-        dictionary with filter data (coefficients etc.)
-
-    worN: {None, int or array-like}
-        number of points or frequencies where the frequency response is calculated
+    worN : {None, int or array-like}
+        number of points (default: 512) or frequencies in the units of `fs`
+        where the frequency response is calculated
 
-    wholeF: bool
-        when True, calculate frequency response from 0 ... f_S, otherwise
-        calculate between 0 ... f_S/2
+    whole : bool
+        when True, calculate frequency response from 0 ... fs, otherwise
+        between 0 ... fs/2
 
-    fs: float
-        sampling frequency, used for calculation of the frequency vector.
-        The default is 2*pi
+    fs : float
+        sampling frequency, default: 2 pi
 
     Returns
     -------
+    w : ndarray
+        The frequencies at which h was computed, in the same units as fs.
 
-    w: ndarray
+    h : ndarray
+        The frequency response, as complex numbers.
+    """
+    sos = np.atleast_2d(sos)
+    if worN is None:
+        worN = 512
+    if np.isscalar(worN):
+        N = int(worN)
+        w = np.linspace(0, fs if whole else fs / 2, N, endpoint=False)
+        N_fft = N if whole else 2 * N
+        if N_fft >= 3:
+            # Evaluate num. and den. polynomials of all sections at once. For real
+            # coefficients, only the positive frequencies need to be calculated.
+            real = not np.iscomplexobj(sos)
+            sides = 'two' if whole and not real else 'one'
+            B = fast_fft(sos[:, :3], N_fft, sides=sides)
+            A = fast_fft(sos[:, 3:], N_fft, sides=sides)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                h = np.prod(B / A, axis=0)
+            if whole and real:
+                return w, rfft2fft(h, N)
+            return w, h[:N]
+    w = np.atleast_1d(w if np.isscalar(worN) else worN)
+    # powers of z^-1 = exp(-j w) with shape (3, len(w))
+    Z = np.exp(-2j * np.pi * w / fs)[np.newaxis, :] ** np.arange(3)[:, np.newaxis]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        h = np.prod((sos[:, :3] @ Z) / (sos[:, 3:] @ Z), axis=0)
+    return w, h
+
+
+# ------------------------------------------------------------------------------
+def zoom_freqz(b, a=1, worN: int = 512, f_range=(0, np.pi), fs: float = 2*np.pi,
+               sos: bool = False):
+    """
+    Calculate the complex frequency response at `worN` equidistant frequencies
+    in the band `f_range` (including both limits) with the chirp-z transform
+    (`scipy.signal.ZoomFFT`).
+
+    This gives a dense frequency resolution in a narrow band (e.g. the pass band
+    ripple of a long FIR filter) at a fraction of the cost of a full range FFT
+    with the same resolution.
+
+    Parameters
+    ----------
+    b : array-like
+        numerator coefficients or second-order sections with shape
+        `(n_sections, 6)` when `sos = True`
+
+    a : array-like
+        denominator coefficients (ignored for `sos = True`)
+
+    worN : int
+        number of frequency points
+
+    f_range : tuple of float
+        lower and upper frequency of the band in the units of `fs`
+
+    fs : float
+        sampling frequency, default: 2 pi
+
+    sos : bool
+        when True, `b` contains second-order sections
+
+    Returns
+    -------
+    w : ndarray
         The frequencies at which h was computed, in the same units as fs.
-        By default, w is normalized to the range [0, pi) (radians/sample).
 
-    h: ndarray
+    h : ndarray
         The frequency response, as complex numbers.
+    """
+    N = max(int(worN), 1)
+    f_1, f_2 = f_range
+    w = np.linspace(f_1, f_2, N)
+    # numerator and denominator polynomes (of all sections) as rows of one array
+    if sos:
+        sos = np.atleast_2d(b)
+        C = np.vstack((sos[:, :3], sos[:, 3:]))
+    else:
+        b, a = map(np.atleast_1d, (b, a))
+        C = np.zeros((2, max(len(b), len(a))), dtype=np.result_type(b, a, float))
+        C[0, :len(b)] = b
+        C[1, :len(a)] = a
+    if N > 1 and f_1 != f_2:
+        X = sig.ZoomFFT(C.shape[-1], (f_1, f_2), N, fs=fs, endpoint=True)(C)
+    else:
+        X = C @ np.exp(-2j * np.pi * np.outer(np.arange(C.shape[-1]), w) / fs)
+    n_sec = len(C) // 2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        h = np.prod(X[:n_sec] / X[n_sec:], axis=0)
+    return w, h
 
-    Examples
-    --------
 
+# ------------------------------------------------------------------------------
+def adaptive_freqz(H_func, w, h, tol: float = 0.01, N_max: int = None,
+                   depth: int = 10):
+    """
+    Refine the frequency grid `w` with the complex frequency response `h`
+    adaptively around the local extrema of the magnitude response, i.e. near
+    notches, ripple maxima and minima, and where the magnitude bends, e.g. at
+    the knees of transition bands.
+
+    In each iteration, the magnitude in dB of every local extremum is compared
+    to the linear interpolation between its neighbours. When the difference
+    (i.e. the curvature) exceeds `tol`, both adjacent intervals are split in half
+    and the response is calculated at the new points. Intervals are halved at
+    most `depth` times, the total number of points is limited to `N_max` by
+    refining the intervals with the largest curvature first. Afterwards, the
+    same criterion is applied to all points with the remaining budget of
+    points, so the extrema are always refined first.
+
+    Parameters
+    ----------
+    H_func : callable
+        function returning the complex frequency response at an array of
+        frequencies (same units as `w`)
+
+    w : array-like
+        ascending (e.g. equidistant) initial frequency grid
+
+    h : array-like
+        complex frequency response at `w`
+
+    tol : float
+        tolerance in dB, default: 0.01
+
+    N_max : int
+        maximum number of frequency points, default: `2 * len(w)`
+
+    depth : int
+        maximum number of refinements, default: 10
+
+    Returns
+    -------
+    w : ndarray
+        The non-uniform frequency grid
+
+    h : ndarray
+        The frequency response at `w`, as complex numbers.
+    """
+    w = np.asarray(w, dtype=float)
+    h = np.asarray(h)
+    if N_max is None:
+        N_max = 2 * len(w)
+
+    # refine the extrema first, then the knees (e.g. band edges) with the
+    # remaining points
+    for knees in (False, True):
+        for _ in range(depth):
+            if len(w) < 3 or len(w) >= N_max:
+                break
+            m = 20 * np.log10(np.maximum(np.abs(h), 1e-15))  # floor at -300 dB
+            # deviation of inner points from the linear interpolation of the neighbours
+            d_l = w[1:-1] - w[:-2]
+            d_r = w[2:] - w[1:-1]
+            with np.errstate(invalid='ignore'):
+                err = np.abs(m[1:-1] - (m[:-2] * d_r + m[2:] * d_l) / (d_l + d_r))
+                extremum = (m[1:-1] - m[:-2]) * (m[2:] - m[1:-1]) <= 0
+            err = np.where(np.isfinite(err) & (extremum | knees), err, 0)
+            # error of each interval = max. error of its end points
+            err_int = np.zeros(len(w) - 1)
+            err_int[:-1] = err
+            err_int[1:] = np.maximum(err_int[1:], err)
+            idx = np.nonzero(err_int > tol)[0]
+            if len(idx) == 0:
+                break
+            if len(w) + len(idx) > N_max:  # refine intervals with the largest errors
+                idx = np.sort(idx[np.argsort(err_int[idx])[len(w) + len(idx) - N_max:]])
+            w_new = (w[idx] + w[idx + 1]) / 2
+            w = np.insert(w, idx + 1, w_new)
+            h = np.insert(h, idx + 1, H_func(w_new))
+    return w, h
+
+
+# ------------------------------------------------------------------------------
+def select_freq_range(W, H, range_type: str, f_max: float = 2*np.pi):
     """
-    # causal poles/zeros
-    bc = fil_dict['ba'][0]
-    ac = fil_dict['ba'][1]
+    Select and shift the frequency response `H`, calculated at (possibly
+    non-equidistant) frequencies `W` = 0 ... 2 pi, for the frequency range
+    `range_type` of the plots.
+
+    Parameters
+    ----------
+    W : array-like
+        ascending frequencies in the range 0 ... 2 pi
+
+    H : array-like
+        frequency response (or any other data) at `W`
 
-    # standard call to signal freqz
-    W, H = sig.freqz(bc, ac, worN=worN, whole=wholeF, fs=fs)
+    range_type : str
+        'sym': -f_max/2 ... f_max/2, 'half': 0 ... f_max/2, otherwise ('whole')
+        0 ... f_max
+
+    f_max : float
+        frequency scale, corresponding to W = 2 pi
+
+    Returns
+    -------
+    F : ndarray
+        frequencies in units of `f_max`
+
+    H : ndarray
+        selected and shifted frequency response
+    """
+    W = np.asarray(W)
+    idx = np.searchsorted(W, np.pi)  # first frequency >= f_max / 2
+    F = W * f_max / (2 * np.pi)
+    if range_type == 'sym':
+        return np.concatenate((F[idx:] - f_max, F[:idx])), np.roll(H, -idx)
+    elif range_type == 'half':
+        return F[:idx], H[:idx]
+    else:
+        return F, H
+
+
+# ------------------------------------------------------------------------------
+def _calc_H(fil_dict, worN, wholeF, fs=2*np.pi, f_range=None):
+    """
+    Calculate the complex frequency response of the filter in `fil_dict` without
+    caching, see `calc_Hcomplex()` for the parameters.
+    """
+    sos = fil_dict.get('sos', [])
+    use_sos = len(sos) > 0
+    if f_range is not None:
+        if use_sos:
+            W, H = zoom_freqz(sos, worN=worN, f_range=f_range, fs=fs, sos=True)
+        else:
+            W, H = zoom_freqz(*fil_dict['ba'], worN=worN, f_range=f_range, fs=fs)
+    elif use_sos:
+        W, H = sos_freqz(sos, worN=worN, whole=wholeF, fs=fs)
+    else:
+        # causal poles/zeros
+        bc = fil_dict['ba'][0]
+        ac = fil_dict['ba'][1]
+
+        # standard call to signal freqz
+        W, H = sig.freqz(bc, ac, worN=worN, whole=wholeF, fs=fs)
 
     # test for NonCausal filter
     if ('rpk' in fil_dict):
@@ -1714,14 +2525,286 @@ def calc_Hcomplex(fil_dict, worN, wholeF, fs=2*np.pi):
         # This is done by conjugating a and b prior to the call, and conjugating
         # h after the call.
 
-        wa, ha = sig.freqz(ba, aa, worN=worN, whole=True, fs=fs)
+        if f_range is not None:
+            wa, ha = zoom_freqz(ba, aa, worN=worN, f_range=f_range, fs=fs)
+        else:
+            wa, ha = sig.freqz(ba, aa, worN=worN, whole=True, fs=fs)
         ha = ha.conjugate()
 
         # Total transfer function is the product of causal response and antiCausal
         # response
         H = H * ha
 
-    return (W, H)
+    return W, H
+
+
+# ------------------------------------------------------------------------------
+def calc_Hcomplex(fil_dict, worN, wholeF, fs=2*np.pi, f_range=None, tol=None):
+    """
+    A wrapper around `signal.freqz()` for calculating the complex frequency
+    response H(f) for antiCausal systems as well. The filter coefficients are
+    are extracted from the filter dictionary. When second-order sections are
+    available (`fil_dict['sos']` is not empty), the response is calculated from
+    the cascade of sections with `sos_freqz()` which is more accurate for high
+    filter orders.
+
+    Parameters
+    ----------
+
+    fil_dict: dict
+        dictionary with filter data (coefficients etc.)
+
+    worN: {None, int or array-like}
+        number of points or frequencies where the frequency response is calculated
+
+    wholeF: bool
+        when True, calculate frequency response from 0 ... f_S, otherwise
+        calculate between 0 ... f_S/2
+
+    fs: float
+        sampling frequency, used for calculation of the frequency vector.
+        The default is 2*pi
+
+    f_range: tuple of float or None
+        When not None, calculate the frequency response at `worN` (int)
+        equidistant frequencies from `f_range[0]` ... `f_range[1]` (in units
+        of `fs`) with the chirp-z transform (see `zoom_freqz()`), `wholeF` is
+        ignored then.
+
+    tol: float or None
+        When not None or zero, the frequency grid is refined adaptively near
+        notches, extrema and band edges with the tolerance `tol` in dB (see
+        `adaptive_freqz()`). The returned frequencies are not equidistant then.
+
+    Returns
+    -------
+
+    w: ndarray
+        The frequencies at which h was computed, in the same units as fs.
+        By default, w is normalized to the range [0, pi) (radians/sample).
+
+    h: ndarray
+        The frequency response, as complex numbers.
+
+    Results are cached with the content of the coefficients, `worN`, `wholeF`,
+    `fs`, `f_range` and `tol` as key, the `H_CACHE_SIZE` most recently used
+    responses are kept. Responses in zoomed bands (`f_range`) are kept in a
+    separate cache with `H_ZOOM_CACHE_SIZE` entries, so panning and zooming
+    don't evict the full range responses. The caches are cleared by
+    `fil_save()`. The returned arrays are shared between all callers and
+    hence read-only.
+
+    Without `tol` and `f_range`, a response calculated from `ba` is updated
+    incrementally from the last response on the same frequency grid when only
+    a few coefficients, poles or zeros have been edited (see `_calc_H_inc()`).
+
+    Examples
+    --------
+
+    """
+    sos = fil_dict.get('sos', [])
+    use_sos = len(sos) > 0
+    arrs = [sos] if use_sos else list(fil_dict['ba'])
+    if 'rpk' in fil_dict:
+        arrs += list(fil_dict['baA'])
+    key = (_hash_arrays(*arrs),
+           worN if worN is None or np.isscalar(worN) else _hash_arrays(worN),
+           bool(wholeF), float(fs),
+           None if f_range is None else tuple(float(f) for f in f_range),
+           float(tol) if tol else None)
+    if f_range is None:
+        cache, size = _H_cache, H_CACHE_SIZE
+    else:
+        cache, size = _H_zoom_cache, H_ZOOM_CACHE_SIZE
+    res = _cache_get(key, cache)
+    if res is not None:
+        return res
+
+    if tol:
+        W, H = _calc_H(fil_dict, worN, wholeF, fs, f_range)
+        W, H = adaptive_freqz(lambda w: _calc_H(fil_dict, w, wholeF, fs)[1], W, H,
+                              tol=tol)
+    elif use_sos or 'rpk' in fil_dict or f_range is not None:
+        W, H = _calc_H(fil_dict, worN, wholeF, fs, f_range)
+    else:
+        W, H = _calc_H_inc(key[1:], fil_dict, worN, wholeF, fs)
+
+    return _cache_put(key, W, H, cache=cache, size=size)
+
+
+def _calc_H_inc(grid_key, fil_dict, worN, wholeF, fs):
+    """
+    Calculate the frequency response of the filter in `fil_dict` from its `ba`
+    coefficients. When the last response calculated on the same frequency grid
+    (`grid_key`) belongs to a filter that differs in up to `H_INC_EDITS`
+    coefficients or - for filters designed in zpk format, e.g. by `Input_PZ` -
+    in up to `H_INC_EDITS` poles / zeros and the gain, the response is
+    updated incrementally with O(len(W)) operations per edit:
+
+    - coefficient `b_k` resp. `a_k` changed by `d`: `B += d exp(-j w k)` resp.
+      `A += d exp(-j w k)`, `H = B / A`
+    - zero `z_o` moved to `z_n`: `H *= (1 - z_n exp(-j w)) / (1 - z_o exp(-j w))`,
+      poles vice versa, gain `k_o` changed to `k_n`: `H *= k_n / k_o`
+
+    After `H_INC_MAX` successive updates or when an update would divide by
+    (almost) zero, the response is recalculated from scratch.
+    """
+    b, a = (np.asarray(x) for x in fil_dict['ba'])
+    zpk = None
+    if fil_dict.get('creator', ('',))[0] == 'zpk' and not (
+            isinstance(fil_dict, LazyDict) and fil_dict.is_lazy('zpk')):
+        zpk = tuple(np.array(x) for x in fil_dict['zpk'])  # ba is derived from zpk
+
+    base = _H_base.get(grid_key)
+    res = None
+    if base is not None and base['N_inc'] < H_INC_MAX:
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            res = _H_update_ba(base, b, a)
+            if res is None and zpk is not None:
+                res = _H_update_zpk(base, zpk)
+    if res is None:
+        W, H = _calc_H(fil_dict, worN, wholeF, fs)
+        BA, N_inc = None, 0
+    else:
+        W, H, BA = res
+        N_inc = base['N_inc'] + 1
+
+    _H_base[grid_key] = {'ba': (b.copy(), a.copy()), 'zpk': zpk, 'W': W, 'H': H,
+                         'w': 2 * np.pi * W / fs, 'BA': BA, 'N_inc': N_inc}
+    _H_base.move_to_end(grid_key)
+    if len(_H_base) > H_CACHE_SIZE:
+        _H_base.popitem(last=False)
+    return W, H
+
+
+def _H_update_ba(base, b, a):
+    """
+    Update the response in `base` for changed coefficients `b`, `a`, return
+    `(W, H, (B, A))` or None when an incremental update is not possible
+    """
+    b_o, a_o = base['ba']
+    if b.shape != b_o.shape or a.shape != a_o.shape:
+        return None
+    d_b = np.flatnonzero(b != b_o)
+    d_a = np.flatnonzero(a != a_o)
+    if len(d_b) + len(d_a) > H_INC_EDITS:
+        return None
+    w = base['w']
+    if base['BA'] is None:  # numerator and denominator of the base response
+        if np.any(a_o[1:]):
+            A = sig.freqz(a_o, 1, worN=w)[1]
+        else:
+            A = np.full(len(w), a_o[0], dtype=complex)
+        B = base['H'] * A
+        if not np.all(np.isfinite(B)):
+            return None
+    else:
+        B, A = base['BA']
+    B = B + sum((b[k] - b_o[k]) * np.exp(-1j * w * k) for k in d_b)
+    A = A + sum((a[k] - a_o[k]) * np.exp(-1j * w * k) for k in d_a)
+    if np.min(np.abs(A)) < 1e-10 * np.max(np.abs(A)):
+        return None
+    return base['W'], B / A, (B, A)
+
+
+def _H_update_zpk(base, zpk):
+    """
+    Update the response in `base` for moved poles / zeros and a changed gain,
+    return `(W, H, None)` or None when an incremental update is not possible
+    """
+    if base['zpk'] is None:
+        return None
+    (z, p, k), (z_o, p_o, k_o) = zpk, base['zpk']
+    z, p, z_o, p_o = (np.atleast_1d(x) for x in (z, p, z_o, p_o))
+    if z.shape != z_o.shape or p.shape != p_o.shape or k_o == 0:
+        return None
+    d_z = np.flatnonzero(z != z_o)
+    d_p = np.flatnonzero(p != p_o)
+    if len(d_z) + len(d_p) > H_INC_EDITS:
+        return None
+    e_jw = np.exp(-1j * base['w'])
+    num = np.prod([1 - r * e_jw for r in np.concatenate((z[d_z], p_o[d_p]))], axis=0)
+    den = np.prod([1 - r * e_jw for r in np.concatenate((z_o[d_z], p[d_p]))], axis=0)
+    if np.min(np.abs(den)) < 1e-10:  # old zero / new pole on the frequency grid
+        return None
+    return base['W'], base['H'] * (k / k_o) * num / den, None
+
+
+# ------------------------------------------------------------------------------
+H_GRID_CHUNK = 2**20  #: max. number of array elements per chunk for `H_abs_...()`
+
+
+def H_abs_grid(num, den, z):
+    """
+    Calculate `|polyval(num, z) / polyval(den, z)|` at the complex frequencies `z`
+    (scalar or array of any shape). The grid is evaluated in chunks of
+    `H_GRID_CHUNK` points to limit memory usage. The (read-only) result is cached
+    with the content of `num`, `den` and `z` as key until `clear_H_cache()` is
+    called (e.g. by `fil_save()`).
+    """
+    num, den = np.atleast_1d(num), np.atleast_1d(den)
+    z = np.asarray(z)
+    key = ('grid', _hash_arrays(num, den, z))
+    res = _cache_get(key)
+    if res is not None:
+        return res
+
+    z_flat = z.reshape(-1)
+    H = np.empty(z_flat.shape)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        for i in range(0, len(z_flat), H_GRID_CHUNK):
+            z_i = z_flat[i:i + H_GRID_CHUNK]
+            H[i:i + H_GRID_CHUNK] = np.abs(np.polyval(num, z_i) / np.polyval(den, z_i))
+    return _cache_put(key, H.reshape(z.shape))
+
+
+def _abs_polyval_polar(p, r, N_phi):
+    """
+    Return `|polyval(p, z)|` at z = r exp(j 2 pi k / N_phi), k = 0 ... N_phi - 1 for
+    each radius in the column vector `r` with one FFT per radius. For r > 1, the
+    result is divided by r^(len(p) - 1) to avoid overflows.
+    """
+    n = np.arange(len(p))
+    out = r > 1
+    r_inv = np.divide(1, r, out=np.zeros_like(r), where=out)
+    # coefficients of z^-n for r > 1 resp. z^n for r <= 1 with the radius included
+    C = np.where(out, p * r_inv**n, p[::-1] * np.where(out, 0, r)**n)
+    if C.shape[-1] > N_phi:  # fold coefficients onto N_phi points (aliasing)
+        C = np.pad(C, ((0, 0), (0, -C.shape[-1] % N_phi)))
+        C = C.reshape(len(r), -1, N_phi).sum(axis=1)
+    X = np.abs(fast_fft(C, N_phi))
+    # sum_n c_n exp(+j 2 pi k n / N_phi) = X[-k] for r <= 1
+    k_rev = -np.arange(N_phi) % N_phi
+    return np.where(out, X, X[:, k_rev])
+
+
+def H_abs_polar(num, den, r, N_phi: int):
+    """
+    Calculate `|polyval(num, z) / polyval(den, z)|` on the polar grid
+    z = r_i exp(j 2 pi k / N_phi), k = 0 ... N_phi - 1 for all radii `r_i`.
+
+    Instead of evaluating the polynomials at each grid point, the values at all
+    angles of one radius are calculated with one FFT of the coefficients scaled
+    by the powers of the radius. Radii are processed in chunks of bounded memory,
+    the (read-only) result with the shape `(len(r), N_phi)` is cached with
+    `num`, `den`, `r` and `N_phi` as key until `clear_H_cache()` is called.
+    """
+    num, den = np.atleast_1d(num), np.atleast_1d(den)
+    r = np.atleast_1d(np.asarray(r, dtype=float))
+    key = ('polar', _hash_arrays(num, den, r), int(N_phi))
+    res = _cache_get(key)
+    if res is not None:
+        return res
+
+    H = np.empty((len(r), N_phi))
+    N_r = max(1, H_GRID_CHUNK // max(len(num), len(den), N_phi))
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        for i in range(0, len(r), N_r):
+            r_i = r[i:i + N_r, np.newaxis]
+            H[i:i + N_r] = _abs_polyval_polar(num, r_i, N_phi)\
+                / _abs_polyval_polar(den, r_i, N_phi)\
+                * np.where(r_i > 1, r_i, 1)**(len(num) - len(den))
+    return _cache_put(key, H)
 
 
 # ------------------------------------------------------------------------------
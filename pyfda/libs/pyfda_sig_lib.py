@@ -15,6 +15,7 @@ from numpy import pi
 import scipy.signal as sig
 
 import pyfda.filterbroker as fb
+from pyfda.libs.pyfda_lib import fast_fft, rfft2fft, sos_freqz
 
 import logging
 logger = logging.getLogger(__name__)
@@ -198,6 +199,12 @@ b :  array_like
 a :  array_like (optional, default = 1 for FIR-filter)
      Denominator coefficients (recursive part of filter)
 
+sos : boolean (optional, default : False)
+     When True, `b` contains second-order sections with shape `(n_sections, 6)`.
+     The group delay is calculated as the sum of the group delays of the
+     sections (all sections are evaluated at once) which is much more accurate
+     than using the expanded polynomials for high filter orders.
+
 whole : boolean (optional, default : False)
      Only when True calculate group delay around
      the complete unit circle (0 ... 2 pi)
@@ -537,14 +544,14 @@ Examples
             if verbose:
                 logger.info("FIR filter, using J.O. Smith's algorithm for group delay.")
 
-    if sos and alg != "shpak":
-        b, a = sig.sos2tf(b)
-
     time_0 = int(time.perf_counter() * 1e9)
 
     # ---------------------
     if alg == 'diff':
-        w, H = sig.freqz(b, a, worN=nfft, whole=whole)
+        if sos:
+            w, H = sos_freqz(b, worN=nfft, whole=whole)
+        else:
+            w, H = sig.freqz(b, a, worN=nfft, whole=whole)
         # np.spacing(1) is equivalent to matlab "eps"
         singular = np.absolute(H) < n_eps * 10 * np.spacing(1)
         H[singular] = 0
@@ -554,24 +561,24 @@ Examples
 
     # ---------------------
     elif alg == 'jos':
-        b, a = map(np.atleast_1d, (b, a))  # when scalars, convert to 1-dim. arrays
-
-        c = np.convolve(b, a[::-1])     # equivalent FIR polynome
-                                        # c(z) = b(z) * a(1/z)*z^(-oa)
-        cr = c * np.arange(c.size)      # multiply with ramp -> derivative of c wrt 1/z
+        # equivalent FIR polynome(s) c(z) = b(z) * a(1/z)*z^(-oa), one per section
+        c, N_a = _equiv_fir(b, a, sos)
+        cr = c * np.arange(c.shape[-1])  # multiply with ramp -> derivative of c wrt 1/z
 
-        den = np.fft.fft(c, nfft)   # FFT = evaluate polynome around unit circle
-        num = np.fft.fft(cr, nfft)  # and ramped polynome at NFFT equidistant points
+        # FFT = evaluate polynome(s) around unit circle
+        den = np.fft.fft(c, nfft, axis=-1)
+        num = np.fft.fft(cr, nfft, axis=-1)  # and ramped polynome(s) at NFFT points
 
         # Check for singularities i.e. where denominator (`den`) coefficients
         # approach zero or numerator (`num`) or denominator coefficients are
         # non-finite, i.e. `nan`, `ìnf` or `ninf`.
-        singular = np.where(~np.isfinite(den) | ~np.isfinite(num) |
-                            (abs(den) < n_eps * np.spacing(1)))[0]
+        singular = np.where(np.any(~np.isfinite(den) | ~np.isfinite(num) |
+                                   (abs(den) < n_eps * np.spacing(1)), axis=0))[0]
 
         with np.errstate(invalid='ignore', divide='ignore'):
-            # element-wise division of numerator and denominator FFTs
-            tau_g = np.real(num / den) - a.size + 1
+            # element-wise division of numerator and denominator FFTs, the group
+            # delays of cascaded sections add up
+            tau_g = np.sum(np.real(num / den), axis=0) - N_a
 
         # set group delay = 0 at each singularity
         tau_g[singular] = 0
@@ -582,7 +589,7 @@ Examples
                 logger.warning('i = {0} '.format(i * fs/nfft))
 
         if not whole:
-            nfft = nfft/2
+            nfft = nfft // 2
             tau_g = tau_g[0:nfft]
             w = w[0:nfft]
 
@@ -600,22 +607,22 @@ Examples
     # ---------------------
     elif alg == "scipy":  # implementation as in scipy.signal
         w = np.atleast_1d(w)
-        b, a = map(np.atleast_1d, (b, a))
-        c = np.convolve(b, a[::-1])    # coefficients of equivalent FIR polynome
-        cr = c * np.arange(c.size)     # and of the ramped polynome
+        c, N_a = _equiv_fir(b, a, sos)  # coefficients of equivalent FIR polynome(s)
+        cr = c * np.arange(c.shape[-1])  # and of the ramped polynome(s)
         z = np.exp(-1j * w)            # complex frequency points around the unit circle
-        den = np.polyval(c[::-1], z)   # evaluate polynome
-        num = np.polyval(cr[::-1], z)  # and ramped polynome
+        den = np.array([np.polyval(c_i[::-1], z) for c_i in c])  # evaluate polynome(s)
+        num = np.array([np.polyval(c_i[::-1], z) for c_i in cr])  # and ramped ones
 
         # Check for singularities i.e. where denominator (`den`) coefficients
         # approach zero or numerator (`num`) or denominator coefficients are
         # non-finite, i.e. `nan`, `ìnf` or `ninf`.
-        singular = np.where(~np.isfinite(den) | ~np.isfinite(num) |
-                            (abs(den) < n_eps * np.spacing(1)))[0]
+        singular = np.where(np.any(~np.isfinite(den) | ~np.isfinite(num) |
+                                   (abs(den) < n_eps * np.spacing(1)), axis=0))[0]
 
         with np.errstate(invalid='ignore', divide='ignore'):
-            # element-wise division of numerator and denominator FFTs
-            tau_g = np.real(num / den) - a.size + 1
+            # element-wise division of numerator and denominator, the group
+            # delays of cascaded sections add up
+            tau_g = np.sum(np.real(num / den), axis=0) - N_a
 
         # set group delay = 0 at each singularity
         tau_g[singular] = 0
@@ -626,7 +633,7 @@ Examples
                 logger.warning('i = {0} '.format(i * fs/nfft))
 
         if not whole:
-            nfft = nfft/2
+            nfft = nfft // 2
             tau_g = tau_g[0:nfft]
             w = w[0:nfft]
 
@@ -649,6 +656,22 @@ Examples
     return w, tau_g
 
 
+# ------------------------------------------------------------------------------
+def _equiv_fir(b, a, sos=False):
+    """
+    Return the coefficients `c` of the equivalent FIR polynome
+    c(z) = b(z) * a(1/z)*z^(-oa) as a 2D array with one row per second-order
+    section (`sos = True`, `b` contains the sections) or a single row, and the
+    total order `N_a` of the denominator polynome(s).
+    """
+    if sos:
+        sos = np.atleast_2d(b)
+        c = np.array([np.convolve(s[:3], s[5:2:-1]) for s in sos])
+        return c, 2 * len(sos)
+    b, a = map(np.atleast_1d, (b, a))  # when scalars, convert to 1-dim. arrays
+    return np.convolve(b, a[::-1])[np.newaxis, :], a.size - 1
+
+
 # ------------------------------------------------------------------------------
 def group_delayz(b, a, w, plot=None, fs=2*np.pi):
     """
@@ -830,3 +853,290 @@ def zorp_group_delayz(zorp, w, fs=1):
     r2 = r**2
     cos = np.cos(W - phi)
     return w, 2 * pi * (r2 - r*cos) / (r2 + 1 - 2*r*cos)
+
+
+# ------------------------------------------------------------------------------
+class Min_Max_Pyramid(object):
+    """
+    Multi-level min / max envelopes of the real 1D array `y` for fast plotting of
+    long signals: Level `k` contains the minima and maxima of blocks of
+    `B**(k+1)` samples, levels are calculated until they contain no more than
+    `N_min` blocks. The additional memory is about `2 / (B - 1) * len(y)` values.
+
+    NaNs are ignored unless a block consists only of NaNs.
+
+    Example
+    -------
+    >>> pyr = Min_Max_Pyramid(y)
+    >>> n, y_min, y_max = pyr.envelope(0, len(y), 1000)  # 1000 columns
+    """
+
+    def __init__(self, y, B: int = 8, N_min: int = 1000):
+        self.y = y
+        self.N = len(y)
+        self.B = B
+        self.levels = []  # list of tuples (block length, minima, maxima)
+        L, y_min, y_max = 1, y, y
+        while len(y_min) > N_min:
+            y_min = self._reduce(y_min, np.fmin)
+            y_max = self._reduce(y_max, np.fmax)
+            L *= B
+            self.levels.append((L, y_min, y_max))
+
+    def _reduce(self, a, ufunc):
+        """ Reduce blocks of `B` elements of `a` with `ufunc` """
+        N_full = len(a) // self.B * self.B
+        a_red = ufunc.reduce(np.reshape(a[:N_full], (-1, self.B)), axis=1)
+        if N_full < len(a):  # incomplete last block
+            a_red = np.append(a_red, ufunc.reduce(a[N_full:]))
+        return a_red
+
+    def envelope(self, N_start: int, N_end: int, N_col: int):
+        """
+        Return the envelope of `y[N_start:N_end]` with approx. `N_col` columns
+        (but not more columns than samples). Columns are aligned to the blocks of
+        the selected level, i.e. first and last column may extend beyond
+        `N_start` and `N_end`.
+
+        Returns
+        -------
+        n: ndarray of int
+            index of the first sample of each column
+
+        y_min, y_max: ndarray
+            minimum / maximum of `y` in each column. For columns consisting
+            of single samples, both are identical to `y[n]`.
+        """
+        N_start, N_end = max(N_start, 0), min(N_end, self.N)
+        if N_end <= N_start:
+            return np.zeros(0, dtype=int), self.y[:0], self.y[:0]
+        # choose the coarsest level with no more than the required samples per column
+        L, y_min, y_max = 1, self.y, self.y
+        for lvl in self.levels:
+            if lvl[0] > (N_end - N_start) / max(N_col, 1):
+                break
+            L, y_min, y_max = lvl
+        # first and last + 1 block of the level
+        j_start, j_end = N_start // L, -(-N_end // L)
+        edges = np.unique(np.linspace(j_start, j_end, max(N_col, 1) + 1, dtype=int))[:-1]
+        if len(edges) == j_end - j_start:  # no further reduction needed
+            return edges * L, y_min[j_start:j_end], y_max[j_start:j_end]
+        return (edges * L, np.fmin.reduceat(y_min[j_start:j_end], edges - j_start),
+                np.fmax.reduceat(y_max[j_start:j_end], edges - j_start))
+
+
+# ------------------------------------------------------------------------------
+class Segment_FFT_Base(object):
+    """
+    Base class for spectral estimators of long signals that are passed frame by
+    frame via `add()`: Segments of `len(win)` samples with `N_ovlp` overlapping
+    samples are multiplied with the window `win` and Fourier transformed. Only
+    samples `N_start ... N_end - 1` of the signal are used. Subclasses process
+    the FFTs of completed segments in `_accumulate()`, for real signals only
+    the bins 0 ... N_FFT//2 are calculated.
+
+    When `detrend` is True, the mean of each segment is subtracted before
+    windowing.
+    """
+    detrend = False
+
+    def __init__(self, win, N_ovlp: int = 0, N_start: int = 0, N_end: int = None):
+        self.win = np.asarray(win)
+        self.N_seg = len(self.win)
+        self.N_ovlp = N_ovlp
+        if not 0 <= N_ovlp < self.N_seg:
+            raise ValueError("N_OVLP must be less than N_FFT!")
+        self.N_step = self.N_seg - N_ovlp
+        self.N_start = N_start
+        self.N_end = np.inf if N_end is None else N_end
+        self.reset()
+
+    def reset(self):
+        """ Clear the accumulated results """
+        self.N_next = 0  # index of the first sample of the next frame
+        self.buf = self.win[:0]  # samples not processed yet (less than one segment)
+        self.N_avg = 0  # number of processed segments
+        self.cmplx = False  # complex signal
+
+    def add(self, x, N_first: int = None, N_batch: int = 2**16):
+        """
+        Add the next frame `x` of the signal and process all segments that have
+        been completed. `N_first` is the index of the first sample of `x`, by
+        default the frame continues the previous one. FFTs are calculated in
+        batches of approx. `N_batch` samples.
+        """
+        if N_first is None:
+            N_first = self.N_next
+        elif N_first != self.N_next:  # not contiguous, drop incomplete segment
+            self.buf = self.win[:0]
+        self.N_next = N_first + len(x)
+        lo, hi = max(self.N_start - N_first, 0), min(self.N_end, self.N_next) - N_first
+        if hi <= lo:
+            return
+        self.cmplx = self.cmplx or np.iscomplexobj(x)
+        if len(self.buf) > 0:
+            x = np.concatenate((self.buf, x[lo:hi]))
+        else:
+            x = x[lo:hi]
+        N_segs = max((len(x) - self.N_seg) // self.N_step + 1, 0)
+        if N_segs > 0:
+            segs = np.lib.stride_tricks.sliding_window_view(x, self.N_seg)[::self.N_step]
+            B = max(N_batch // self.N_seg, 1)  # segments per batch
+            # the negative frequencies of complex segments are not redundant
+            sides = 'two' if np.iscomplexobj(x) else 'one'
+            for i in range(0, N_segs, B):
+                seg = segs[i:i+B]
+                if self.detrend:
+                    seg = seg - np.mean(seg, axis=-1, keepdims=True)
+                self._accumulate(fast_fft(seg * self.win, sides=sides))
+            self.N_avg += N_segs
+        self.buf = np.array(x[N_segs * self.N_step:])
+
+    def _accumulate(self, X):
+        """
+        Process the FFTs `X` (one segment per row), single-sided (bins
+        0 ... N_FFT//2) for real segments
+        """
+        raise NotImplementedError
+
+
+# ------------------------------------------------------------------------------
+class Welch(Segment_FFT_Base):
+    """
+    Welch estimate of the spectrum of a long signal that is passed frame by frame
+    via `add()`: The squared FFT magnitudes of all segments are accumulated,
+    memory is proportional to the segment length, not to the signal length.
+
+    Example
+    -------
+    >>> welch = Welch(sig.windows.hann(256, sym=False), N_ovlp=128)
+    >>> for frame in frames:
+    ...     welch.add(frame)
+    >>> X = welch.spectrum() / 256  # averaged magnitude of FFT(x * win) / N_FFT
+    """
+
+    def reset(self):
+        """ Clear the accumulated spectrum """
+        super().reset()
+        self.P = np.zeros(self.N_seg)  # accumulated |FFT|^2
+
+    def _accumulate(self, X):
+        P = np.sum(X.real**2 + X.imag**2, axis=0)
+        if len(P) < self.N_seg:  # single-sided
+            P = rfft2fft(P, self.N_seg)
+        self.P += P
+
+    def spectrum(self):
+        """
+        Return the root mean square of the FFT magnitudes of all segments, i.e.
+        `sqrt(mean(|FFT(x_seg * win)|^2))` (zeros when no segment has been completed)
+        """
+        if self.N_avg == 0:
+            return np.zeros(self.N_seg)
+        return np.sqrt(self.P / self.N_avg)
+
+
+# ------------------------------------------------------------------------------
+class STFT(Segment_FFT_Base):
+    """
+    Short-time Fourier transform of a long signal that is passed frame by frame
+    via `add()`, the columns of the spectrogram are calculated as soon as their
+    segments are complete. The mean of each segment is removed before windowing.
+
+    The complex STFT is stored, `spectrogram()` derives PSD, magnitude or phase
+    from it with the same scaling as `scipy.signal.spectrogram()` without
+    recalculating the FFTs.
+
+    Example
+    -------
+    >>> stft = STFT(sig.windows.hann(256, sym=False), N_ovlp=128)
+    >>> for frame in frames:
+    ...     stft.add(frame)
+    >>> f, t, Sxx = stft.spectrogram(fs=1, mode='psd')
+    """
+    detrend = True
+
+    def reset(self):
+        """ Clear the calculated columns """
+        super().reset()
+        self.cols = []  # list of arrays with FFTs of the segments (one per row)
+        self.Z = None  # complex STFT (frequency x time), single-sided for real signals
+
+    def _accumulate(self, X):
+        self.cols.append(X)
+        self.Z = None
+
+    def _stft(self):
+        """
+        Return the complex STFT with one column per segment, single-sided for
+        real signals
+        """
+        if self.Z is None:
+            if len(self.cols) == 0:
+                return np.zeros((self.N_seg // 2 + 1, 0), dtype=complex)
+            if len({X.shape[1] for X in self.cols}) > 1:  # real and complex frames
+                self.cols = [X if X.shape[1] == self.N_seg else rfft2fft(X, self.N_seg)
+                             for X in self.cols]
+            self.cols = [np.concatenate(self.cols)]
+            self.Z = self.cols[0].T
+        return self.Z
+
+    def stft(self):
+        """
+        Return the complex two-sided STFT with shape (`len(win)`, number of segments)
+        """
+        Z = self._stft()
+        if Z.shape[0] < self.N_seg:
+            Z = rfft2fft(Z, self.N_seg, axis=0)
+        return Z
+
+    def spectrogram(self, fs=1., mode: str = 'psd', scaling: str = 'density',
+                    onesided: bool = True):
+        """
+        Return frequencies `f`, times `t` (center of the segments, referred to
+        sample 0 of the signal) and spectrogram `Sxx` of the processed segments.
+
+        Parameters
+        ----------
+        fs: float
+            sampling frequency
+
+        mode: str
+            'psd', 'complex', 'magnitude', 'angle' or 'phase' (unwrapped along
+            the frequency axis), see `scipy.signal.spectrogram()`
+
+        scaling: str
+            'density' (scaled by `fs`) or 'spectrum'
+
+        onesided: bool
+            Return a one-sided spectrum for real signals, complex signals always
+            return a two-sided spectrum.
+        """
+        onesided = onesided and not self.cmplx
+        Z = self._stft() if onesided else self.stft()
+        if onesided:
+            N_f = self.N_seg // 2 + 1
+            Z = Z[:N_f]
+            f = np.fft.rfftfreq(self.N_seg, 1 / fs)
+        else:
+            f = np.fft.fftfreq(self.N_seg, 1 / fs)
+        t = (self.N_start + self.N_seg / 2 + np.arange(Z.shape[1]) * self.N_step) / fs
+
+        if scaling == 'density':
+            scale = 1.0 / (fs * np.sum(self.win * self.win))
+        else:
+            scale = 1.0 / np.sum(self.win)**2
+
+        if mode == 'psd':
+            Sxx = (Z.real**2 + Z.imag**2) * scale
+            if onesided:  # double all bins except DC and (for even N_FFT) f_S/2
+                Sxx[1:N_f - 1 + self.N_seg % 2] *= 2
+        else:
+            Sxx = Z * np.sqrt(scale)
+            if mode == 'magnitude':
+                Sxx = np.abs(Sxx)
+            elif mode in {'angle', 'phase'}:
+                Sxx = np.angle(Sxx)
+                if mode == 'phase':
+                    Sxx = np.unwrap(Sxx, axis=0)
+        return f, t, Sxx
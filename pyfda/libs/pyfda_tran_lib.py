@@ -0,0 +1,774 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of the pyFDA project hosted at https://github.com/chipmuenk/pyfda
+#
+# Copyright © pyFDA Project Contributors
+# Licensed under the terms of the MIT License
+# (see file LICENSE in root directory for details)
+
+"""
+Library for transient simulations without Qt widgets: Calculate stimuli and
+floating point / fixpoint responses frame by frame.
+
+Example
+-------
+>>> import pyfda.filterbroker as fb
+>>> from pyfda.libs.pyfda_tran_lib import simulate
+>>> res = simulate(fb.fil[0], {'stim': 'step', 'noise': 'gauss', 'noi': 0.01}, N=1000)
+>>> y = res['y']
+
+Data of long simulations exceeding `MEMMAP_THRESHOLD` is stored in memory
+mapped files in `pyfda_dirs.SCRATCH_DIR` instead of RAM.
+"""
+import tempfile
+import numpy as np
+from numpy import pi
+import scipy.signal as sig
+from scipy.special import sinc, diric
+
+import pyfda.libs.pyfda_fix_lib as fx
+import pyfda.libs.pyfda_dirs as dirs
+from pyfda.libs.pyfda_lib import (
+    rect_bl, sawtooth_bl, triang_bl, comb_bl, safe_numexpr_eval)
+
+import logging
+logger = logging.getLogger(__name__)
+
+#: Default stimulus parameters, same as initial settings of the stimulus UI
+STIM_PARAMS_DEFAULT = {
+    'stim': 'dirac', 'chirp_type': 'linear', 'noise': 'none', 'noi': 0.1, 'DC': 0.0,
+    'A1': 1.0, 'A2': 0.0, 'f1': 0.02, 'f2': 0.03, 'phi1': 0, 'phi2': 0,
+    'T1': 0, 'T2': 0, 'TW1': 1, 'TW2': 1, 'BW1': 0.5, 'BW2': 0.5, 'stim_par1': 0.5,
+    'stim_formula': "A1 * abs(sin(2 * pi * f1 * n))",
+    'bl': False,  # use bandlimited versions of periodic stimuli
+    'step_err': False,  # display settling error instead of step response
+    'seed': None,  # seed for the noise generator, None: random seed for each run
+    'f_S': 1}
+
+#: Simulation data (stimulus, response, quantized stimulus) with a total size in
+#: bytes above this threshold is stored in memory mapped files by default
+MEMMAP_THRESHOLD = 2**30
+
+
+# ------------------------------------------------------------------------------
+def alloc_array(N, dtype=float, memmap=False):
+    """
+    Return an uninitialized 1D array with `N` elements of type `dtype`, stored in
+    RAM or (`memmap == True`) in an anonymous temporary file in
+    `pyfda_dirs.SCRATCH_DIR`. The file is deleted automatically when the array
+    is released.
+    """
+    if not memmap:
+        return np.empty(N, dtype=dtype)
+    with tempfile.TemporaryFile(prefix='pyfda_', dir=dirs.get_scratch_dir()) as f:
+        # the memory map keeps its own handle to the file
+        return np.memmap(f, dtype=dtype, mode='w+', shape=(max(N, 1),))[:N]
+
+
+# ------------------------------------------------------------------------------
+class Phase(object):
+    """
+    Phase accumulator for :math:`\\varphi[n] = 2 \\pi f n + \\varphi_0`.
+
+    The phase at the beginning of each frame is calculated in cycles modulo 1
+    with exact integer arithmetic, within the frame the phase is incremented by
+    the precalculated values :math:`2 \\pi f k`. This keeps the phase precise for
+    large indices `n` (e.g. `n ~ 1e9`) where `2 * pi * f * n` loses several digits.
+    """
+
+    def __init__(self, f, phi=0.):
+        self.f = f
+        self.phi = phi
+        # exact representation of the float f as a ratio of integers
+        self.f_num, self.f_den = float(f).as_integer_ratio()
+        self._w_k = np.empty(0)
+
+    def fill(self, out, N_first, N_frame):
+        """
+        Write the phase for `n = N_first ... N_first + N_frame - 1` to the float
+        array `out` and return it.
+        """
+        if len(self._w_k) != N_frame:
+            self._w_k = 2 * pi * self.f * np.arange(N_frame)
+        phi_first = 2 * pi * ((self.f_num * N_first) % self.f_den) / self.f_den\
+            + self.phi
+        return np.add(self._w_k, phi_first, out=out[:N_frame])
+
+
+# ------------------------------------------------------------------------------
+class Stim_Base(object):
+    """
+    Base class for stimuli. `prepare()` is called once per simulation run with
+    the complete parameter dict, `fill()` writes a frame of the stimulus to a
+    preallocated buffer. Derived classes are registered with
+    `register_stimulus()`.
+    """
+    title = ''  #: plot title
+    H_str = r'$y[n]$'  #: y-axis label
+    cmplx = False  #: stimulus is complex even for real amplitudes
+
+    def prepare(self, p, N_end):
+        """ Store parameters and initialize phase accumulators for run """
+        self.p = p
+        self.N_end = N_end
+        self.A1, self.A2 = p['A1'], p['A2']
+        self.ph1 = Phase(p['f1'], p['phi1'] / 180 * pi)
+        self.ph2 = Phase(p['f2'], p['phi2'] / 180 * pi)
+        self.T1_idx = int(np.round(p['T1']))
+        self._bufs = {}
+
+    def get_title(self):
+        """ Return plot title and y-axis label """
+        return self.title, self.H_str
+
+    def fill(self, out, N_first, N_frame):
+        """ Write `N_frame` samples starting at `N_first` to `out` """
+        raise NotImplementedError
+
+    def _buf(self, key, N_frame):
+        """ Return float work buffer `key` with (at least) `N_frame` elements """
+        if key not in self._bufs or len(self._bufs[key]) < N_frame:
+            self._bufs[key] = np.empty(N_frame)
+        return self._bufs[key][:N_frame]
+
+    def _n(self, N_first, N_frame):
+        """ Return sample indices n for the current frame """
+        return np.arange(N_first, N_first + N_frame)
+
+    def _sum_harmonic(self, out, func, N_first, N_frame):
+        """ Write `A1 * func(phi1[n]) + A2 * func(phi2[n])` to `out` """
+        ph = func(self.ph1.fill(self._buf(1, N_frame), N_first, N_frame),
+                  out=self._buf(1, N_frame))
+        np.multiply(ph, self.A1, out=out, casting='unsafe')
+        if self.A2 != 0:
+            ph = func(self.ph2.fill(self._buf(2, N_frame), N_first, N_frame),
+                      out=self._buf(2, N_frame))
+            out += self.A2 * ph
+
+
+class Stim_None(Stim_Base):
+    title = r'Zero Input Response'
+    H_str = r'$h_0[n]$'
+
+    def fill(self, out, N_first, N_frame):
+        out.fill(0)
+
+
+class Stim_Dirac(Stim_Base):
+    title = r'Impulse Response'
+    H_str = r'$h[n]$'
+
+    def fill(self, out, N_first, N_frame):
+        out.fill(0)
+        if N_first <= self.T1_idx < N_first + N_frame:
+            out[self.T1_idx - N_first] = self.A1
+
+
+class Stim_Sinc(Stim_Base):
+    title = r'Sinc Impulse'
+
+    def fill(self, out, N_first, N_frame):
+        p, n = self.p, self._n(N_first, N_frame)
+        out[:] = self.A1 * sinc(2 * (n - p['T1']) * p['f1'])\
+            + self.A2 * sinc(2 * (n - p['T2']) * p['f2'])
+
+
+class Stim_Gauss(Stim_Base):
+    title = r'Gaussian Impulse'
+
+    def fill(self, out, N_first, N_frame):
+        p, n = self.p, self._n(N_first, N_frame)
+        out[:] = self.A1 * sig.gausspulse((n - p['T1']), fc=p['f1'], bw=p['BW1'])\
+            + self.A2 * sig.gausspulse((n - p['T2']), fc=p['f2'], bw=p['BW2'])
+
+
+class Stim_Rect(Stim_Base):
+    title = r'Rect Impulse'
+
+    def fill(self, out, N_first, N_frame):
+        n = self._n(N_first, N_frame)
+        n_rise = int(self.T1_idx - np.floor(self.p['TW1']/2))
+        n_min = max(n_rise, 0)
+        n_max = min(n_rise + self.p['TW1'], self.N_end)
+        out[:] = self.A1 * np.where((n >= n_min) & (n < n_max), 1, 0)
+
+
+class Stim_Step(Stim_Base):
+    def get_title(self):
+        if self.p['step_err']:
+            return r'Settling Error $\epsilon$', r'$h_{\epsilon, \infty} - h_{\epsilon}[n]$'
+        else:
+            return r'Step Response', r'$h_{\epsilon}[n]$'
+
+    def fill(self, out, N_first, N_frame):
+        idx = min(max(self.T1_idx - N_first, 0), N_frame)
+        out[:idx].fill(0)
+        out[idx:].fill(self.A1)
+
+
+class Stim_Cos(Stim_Base):
+    title = r'Cosine Stimulus'
+
+    def fill(self, out, N_first, N_frame):
+        self._sum_harmonic(out, np.cos, N_first, N_frame)
+
+
+class Stim_Sine(Stim_Base):
+    title = r'Sinusoidal Stimulus'
+
+    def fill(self, out, N_first, N_frame):
+        self._sum_harmonic(out, np.sin, N_first, N_frame)
+
+
+class Stim_Exp(Stim_Base):
+    title = r'Complex Exponential Stimulus'
+    cmplx = True
+
+    def fill(self, out, N_first, N_frame):
+        out[:] = self.A1 * np.exp(1j * self.ph1.fill(self._buf(1, N_frame),
+                                                      N_first, N_frame))
+        if self.A2 != 0:
+            out += self.A2 * np.exp(1j * self.ph2.fill(self._buf(2, N_frame),
+                                                       N_first, N_frame))
+
+
+class Stim_Diric(Stim_Base):
+    title = r'Periodic Sinc Stimulus'
+
+    def fill(self, out, N_first, N_frame):
+        p, n = self.p, self._n(N_first, N_frame)
+        out[:] = self.A1 * diric((4 * pi * (n - p['T1']) * p['f1'] + self.ph1.phi * 2)
+                                 / p['TW1'], p['TW1'])
+
+
+class Stim_Chirp(Stim_Base):
+    def get_title(self):
+        return self.p['chirp_type'].capitalize() + ' Chirp Stimulus', self.H_str
+
+    def fill(self, out, N_first, N_frame):
+        p = self.p
+        if p['T2'] == 0:  # sig.chirp is buggy, T_sim cannot be larger than T_end
+            T_end = self.N_end  # frequency sweep over complete interval
+        else:
+            T_end = p['T2']  # frequency sweep till T2
+        out[:] = self.A1 * sig.chirp(self._n(N_first, N_frame), p['f1'], T_end,
+                                     p['f2'], method=p['chirp_type'], phi=self.ph1.phi)
+
+
+class Stim_Periodic(Stim_Base):
+    """
+    Base class for periodic stimuli `A1 * func(phi1[n])`, using the bandlimited
+    function `func_bl` instead when 'bl' is selected
+    """
+    title_bl = ''
+
+    def get_title(self):
+        return self.title_bl if self.p['bl'] else self.title, self.H_str
+
+    def func(self, ph):
+        raise NotImplementedError
+
+    def fill(self, out, N_first, N_frame):
+        ph = self.ph1.fill(self._buf(1, N_frame), N_first, N_frame)
+        out[:] = self.A1 * self.func(ph)
+
+
+class Stim_Triang(Stim_Periodic):
+    title = r'Triangular Stimulus'
+    title_bl = r'Bandlim. Triangular Stimulus'
+
+    def func(self, ph):
+        return triang_bl(ph) if self.p['bl'] else sig.sawtooth(ph, width=0.5)
+
+
+class Stim_Saw(Stim_Periodic):
+    title = r'Sawtooth Stimulus'
+    title_bl = r'Bandlim. Sawtooth Stimulus'
+
+    def func(self, ph):
+        return sawtooth_bl(ph) if self.p['bl'] else sig.sawtooth(ph)
+
+
+class Stim_Square(Stim_Periodic):
+    title = r'Rect. Stimulus'
+    title_bl = r'Bandlimited Rect. Stimulus'
+
+    def func(self, ph):
+        if self.p['bl']:
+            return rect_bl(ph, duty=self.p['stim_par1'])
+        else:
+            return sig.square(ph, duty=self.p['stim_par1'])
+
+
+class Stim_Comb(Stim_Periodic):
+    title = title_bl = r'Bandlim. Comb Stimulus'
+
+    def func(self, ph):
+        return comb_bl(ph)
+
+
+class Stim_AM(Stim_Base):
+    title = (r'AM Stimulus: $A_1 \sin(2 \pi n f_1 + \varphi_1)'
+             r'\cdot A_2 \sin(2 \pi n f_2 + \varphi_2)$')
+
+    def fill(self, out, N_first, N_frame):
+        ph1 = np.sin(self.ph1.fill(self._buf(1, N_frame), N_first, N_frame),
+                     out=self._buf(1, N_frame))
+        ph2 = np.sin(self.ph2.fill(self._buf(2, N_frame), N_first, N_frame),
+                     out=self._buf(2, N_frame))
+        np.multiply(ph1, ph2, out=ph1)
+        np.multiply(ph1, self.A1 * self.A2, out=out, casting='unsafe')
+
+
+class Stim_PMFM(Stim_Base):
+    title = (r'PM / FM Stimulus: $A_1 \sin(2 \pi n f_1'
+             r'+ \varphi_1 + A_2 \sin(2 \pi n f_2 + \varphi_2))$')
+
+    def fill(self, out, N_first, N_frame):
+        ph2 = np.sin(self.ph2.fill(self._buf(2, N_frame), N_first, N_frame),
+                     out=self._buf(2, N_frame))
+        out[:] = self.A1 * np.sin(
+            self.ph1.fill(self._buf(1, N_frame), N_first, N_frame) + self.A2 * ph2)
+
+
+class Stim_PWM(Stim_Base):
+    title = (r'PWM Stimulus with Duty Cycle $\frac {1} {2}(1 + A_2\sin(2 \pi n f_2'
+             r'+ \varphi_2 ))$')
+
+    def fill(self, out, N_first, N_frame):
+        ph1 = self.ph1.fill(self._buf(1, N_frame), N_first, N_frame)
+        duty = 1/2 + self.A2 / 2 * np.sin(
+            self.ph2.fill(self._buf(2, N_frame), N_first, N_frame))
+        if self.p['bl']:
+            # phase increment cannot be derived from ph1 - duty for varying duty
+            out[:] = self.A1 * rect_bl(ph1, duty=duty, w=2 * pi * self.p['f1'])
+        else:
+            out[:] = self.A1 * sig.square(ph1, duty=duty)
+
+
+class Stim_Formula(Stim_Base):
+    title = r'Formula Defined Stimulus'
+
+    def prepare(self, p, N_end):
+        super().prepare(p, N_end)
+        # evaluate the formula for two samples to check for complex results
+        self.cmplx = np.iscomplexobj(self._eval(0, 2))
+
+    def _eval(self, N_first, N_frame):
+        p = self.p
+        param_dict = {"A1": p['A1'], "A2": p['A2'], "f1": p['f1'], "f2": p['f2'],
+                      "phi1": p['phi1'], "phi2": p['phi2'],
+                      "BW1": p['BW1'], "BW2": p['BW2'],
+                      "f_S": p['f_S'], "n": self._n(N_first, N_frame), "j": 1j}
+        return safe_numexpr_eval(p['stim_formula'], (N_frame,), param_dict)
+
+    def fill(self, out, N_first, N_frame):
+        out[:] = self._eval(N_first, N_frame)
+
+
+#: Registry of stimulus classes, the keys are the values of `stim_params['stim']`
+STIMULI = {}
+
+
+def register_stimulus(name, cls):
+    """
+    Register the stimulus class `cls` (derived from `Stim_Base`) as `name`
+    """
+    STIMULI[name] = cls
+
+
+for _name, _cls in {
+        'none': Stim_None, 'dirac': Stim_Dirac, 'sinc': Stim_Sinc,
+        'gauss': Stim_Gauss, 'rect': Stim_Rect, 'step': Stim_Step,
+        'cos': Stim_Cos, 'sine': Stim_Sine, 'exp': Stim_Exp, 'diric': Stim_Diric,
+        'chirp': Stim_Chirp, 'triang': Stim_Triang, 'saw': Stim_Saw,
+        'square': Stim_Square, 'comb': Stim_Comb, 'am': Stim_AM, 'pmfm': Stim_PMFM,
+        'pwm': Stim_PWM, 'formula': Stim_Formula}.items():
+    register_stimulus(_name, _cls)
+
+
+# ------------------------------------------------------------------------------
+class Noise(object):
+    """
+    Additive noise with the parameters 'noise', 'noi' and 'seed'. The states of
+    the random number generator, the MLS shift register and the Brownian
+    integrator are kept between frames, the noise sequence only depends on the
+    seed and the length of the simulation, not on the frame size.
+    """
+    #: title suffixes for the kinds of noise
+    titles = {'none': '', 'gauss': r' + Gaussian Noise', 'uniform': r' + Uniform Noise',
+              'prbs': r' + PRBS Noise', 'mls': r' + max. length sequence',
+              'brownian': r' + Brownian Noise'}
+
+    def prepare(self, p, N_end):
+        """ Initialize generator and states for a simulation run """
+        self.kind = p['noise']
+        self.noi = p['noi']
+        self.rng = np.random.default_rng(p['seed'])
+        # the period of the MLS (2 ** nbits - 1) should cover the whole simulation
+        self.mls_nbits = min(max(int(np.ceil(np.log2(N_end + 1))), 2), 32)
+        self.mls_state = None
+        self.brown = 0.  # state of the Brownian integrator
+        if self.kind not in self.titles:
+            logger.error('Unknown kind of noise "{}"'.format(self.kind))
+
+    def get_title(self):
+        return self.titles.get(self.kind, '')
+
+    def add(self, out, N_first, N_frame):
+        """ Add the next `N_frame` noise samples to `out` """
+        if self.kind == "gauss":
+            out += self.noi * self.rng.standard_normal(N_frame)
+        elif self.kind == "uniform":
+            out += self.noi * (self.rng.random(N_frame) - 0.5)
+        elif self.kind == "prbs":
+            out += self.noi * 2 * (self.rng.integers(0, 2, N_frame) - 0.5)
+        elif self.kind == "mls":
+            mls, self.mls_state = sig.max_len_seq(
+                self.mls_nbits, state=self.mls_state, length=N_frame)
+            out += self.noi * 2 * (mls - 0.5)
+        elif self.kind == "brownian":
+            noi = self.rng.standard_normal(N_frame)
+            noi[0] += self.brown  # continue integration from the last frame
+            np.cumsum(noi, out=noi)
+            self.brown = noi[-1]
+            out += self.noi * noi
+
+
+# ------------------------------------------------------------------------------
+class Stimulus(object):
+    """
+    Calculate stimulus frames from the parameters in the dict `stim_params`, see
+    `STIM_PARAMS_DEFAULT` for keys and default values. Missing keys are taken
+    from `STIM_PARAMS_DEFAULT`. The stimulus kind `stim_params['stim']` is
+    looked up in the registry `STIMULI`.
+
+    Attributes `title_str` and `H_str` contain plot title and y-axis label,
+    `T1_idx` the sample index corresponding to T1 and `dtype` the data type of
+    the stimulus.
+    """
+
+    def __init__(self, stim_params=None):
+        self.set_params(stim_params)
+
+    def set_params(self, stim_params=None):
+        """ Update stimulus parameters, missing keys are taken from defaults """
+        self.p = dict(STIM_PARAMS_DEFAULT)
+        if stim_params is not None:
+            for k in stim_params:
+                if k not in STIM_PARAMS_DEFAULT:
+                    raise KeyError(f'Unknown stimulus parameter "{k}"!')
+            self.p.update(stim_params)
+        self.kind = None  # prepare() needs to be called
+
+    # --------------------------------------------------------------------------
+    def prepare(self, N_end: int = 10) -> None:
+        """
+        Prepare the stimulus for a simulation run with `N_end` samples: Instantiate
+        and prepare the stimulus kind, set title string, y-axis label and dtype.
+        """
+        p = self.p
+        self.N_end = N_end
+        self.T1_idx = int(np.round(p['T1']))
+        if p['stim'] in STIMULI:
+            self.kind = STIMULI[p['stim']]()
+            self.kind.prepare(p, N_end)
+            self.title_str, self.H_str = self.kind.get_title()
+        else:
+            self.kind = None
+            self.title_str, self.H_str = "", r'$y[n]$'
+
+        if self.kind is not None and self.kind.cmplx or type(p['DC']) == complex\
+                or type(p['A1']) == complex or type(p['A2']) == complex\
+                or type(p['noi']) == complex:
+            self.dtype = complex
+        else:
+            self.dtype = float
+
+        self.noise = Noise()
+        self.noise.prepare(p, N_end)
+        self.title_str += self.noise.get_title()
+        if p['DC'] != 0:
+            self.title_str += r' + DC'
+
+    # --------------------------------------------------------------------------
+    def fill(self, out: np.ndarray, N_first: int = 0, N_frame: int = 10):
+        """
+        Write a frame of `N_frame` stimulus samples, starting with index `N_first`,
+        to the preallocated buffer `out` and return it. `prepare()` has to be
+        called before. Return None for an unknown stimulus.
+        """
+        p = self.p
+        if self.kind is None:
+            logger.error('Unknown stimulus format "{0}"'.format(p['stim']))
+            return None
+        out = out[:N_frame]
+        self.kind.fill(out, N_first, N_frame)
+        # Add noise, frames need to be filled consecutively for a noise sequence
+        # independent of the frame size
+        self.noise.add(out, N_first, N_frame)
+        # Add DC to stimulus
+        if p['DC'] != 0:
+            out += p['DC']
+        return out
+
+    # --------------------------------------------------------------------------
+    def calc_frame(self, N_first: int = 0, N_frame: int = 10, N_end: int = 10,
+                   init: bool = False) -> np.ndarray:
+        """
+        Calculate a data frame of stimulus `x` with a length of `N_frame` samples,
+        starting with index `N_first` in an internal buffer.
+
+        Parameters
+        ----------
+        N_first: int
+            index of first data point
+
+        N_frame: int
+            number of samples to be generated
+
+        N_end: int
+            index of last data point + 1 of the whole stimulus
+
+        init: bool
+            when init == True or N_first == 0, prepare stimulus
+
+        Returns
+        -------
+        x: ndarray
+            an array with `N_frame` stimulus data points or None for an
+            unknown stimulus
+        """
+        if init or N_first == 0 or self.kind is None:
+            self.prepare(N_end)
+        if getattr(self, 'xf', None) is None or len(self.xf) != N_frame\
+                or self.xf.dtype != self.dtype:
+            self.xf = np.zeros(N_frame, dtype=self.dtype)
+        return self.fill(self.xf, N_first, N_frame)
+
+
+# ------------------------------------------------------------------------------
+class Tran_Sim(object):
+    """
+    Transient simulation of the filter described by `fil_dict` (floating point
+    coefficients in 'sos' or 'ba') with stimulus parameters `stim_params` (dict
+    or `Stimulus` instance) for `N` samples, calculated in frames of `N_frame`
+    samples.
+
+    When the fixpoint filter function `fxfilter` is given, the stimulus is
+    quantized with the input quantizer `fil_dict['fxqc']['QI']` and filtered
+    with `fxfilter(x_q)` instead.
+
+    After `run()`, stimulus, quantized stimulus (fixpoint only) and response
+    are available as attributes `x`, `x_q` and `y`. With `memmap == True` they
+    are memory mapped arrays that are written frame by frame, by default
+    (`memmap == None`) this is the case when their size exceeds
+    `MEMMAP_THRESHOLD`.
+
+    Spectral estimators with an `add(frame)` method (`pyfda_sig_lib.Welch`,
+    `pyfda_sig_lib.STFT`) can be put into the dicts `welch` and `stft` with the
+    keys 'x', 'x_q' or 'y', they are reset at the start of `run()` and fed with
+    each frame of the corresponding signal.
+    """
+
+    def __init__(self, fil_dict, stim_params=None, N=100, N_frame=None,
+                 fxfilter=None, memmap=None):
+        self.fil_dict = fil_dict
+        # resolve formats that are converted lazily by `fil_save()` in the calling
+        # (main) thread, `run()` is executed in the `Impz_Worker` thread
+        for key in ('sos', 'ba'):
+            fil_dict.get(key)
+        self.N_end = int(N)
+        self.N_frame = self.N_end if not N_frame else int(N_frame)
+        self.fxfilter = fxfilter
+        self.error = False
+
+        if isinstance(stim_params, Stimulus):
+            self.stim = stim_params
+        else:
+            self.stim = Stimulus(stim_params)
+        # calculate a few samples to initialize title string etc. and determine ndtype
+        x_test = self.stim.calc_frame(N_frame=10, N_end=self.N_end, init=True)
+        self.title_str = self.stim.title_str
+        self.cmplx_stim = x_test is not None and bool(np.any(np.iscomplex(x_test)))
+
+        if memmap is None:  # x, y and x_q (fixpoint only)
+            memmap = self.N_end * (2 * np.dtype(self.stim.dtype).itemsize + 8)\
+                > MEMMAP_THRESHOLD
+        self.memmap = memmap
+        if self.memmap and not N_frame:
+            # limit size of temporary arrays
+            self.N_frame = min(self.N_end, 2**20)
+
+        self.N_first = 0  # initialize frame index
+        self.x = alloc_array(self.N_end, self.stim.dtype, self.memmap)  # stimulus
+        self.y = alloc_array(self.N_end, self.stim.dtype, self.memmap)  # response
+        self.x_q = None
+        self.welch = {}  # spectral estimators for 'x', 'x_q' and 'y'
+        self.stft = {}  # spectrograms for 'x', 'x_q' and 'y'
+
+    # --------------------------------------------------------------------------
+    def _init_filter(self):
+        """
+        Initialize input quantizer for fixpoint simulation or filter memory with
+        zeros for floating point simulation, either for cascaded structure (sos)
+        or direct form. Return False for improper filter coefficients.
+        """
+        if self.fxfilter is not None:
+            if self.x_q is None:  # quantized stimulus
+                self.x_q = alloc_array(self.N_end, np.float64, self.memmap)
+            if self.cmplx_stim:
+                logger.warning(
+                    "Complex stimulus: Only its real part is used for the "
+                    "fixpoint filter!")
+            self.q_i = fx.Fixed(self.fil_dict['fxqc']['QI'])  # setup quantizer
+            self.q_i.setQobj({'frmt': 'dec'})  # always use integer decimal format
+            return True
+
+        self.sos = np.asarray(self.fil_dict['sos'])
+        if len(self.sos) > 0:  # has second order sections
+            self.zi = np.zeros((self.sos.shape[0], 2))
+        else:
+            self.bb = np.asarray(self.fil_dict['ba'][0])
+            self.aa = np.asarray(self.fil_dict['ba'][1])
+            if min(len(self.aa), len(self.bb)) < 2:
+                logger.error(
+                    'No proper filter coefficients: len(a), len(b) < 2 !')
+                return False
+            self.zi = np.zeros(max(len(self.aa), len(self.bb)) - 1)
+        return True
+
+    # --------------------------------------------------------------------------
+    def run(self, cancelled=None, progress=None):
+        """
+        Calculate stimulus and response frame by frame.
+
+        Parameters
+        ----------
+        cancelled: callable or None
+            When `cancelled()` returns True after a frame, the simulation is
+            stopped.
+
+        progress: callable or None
+            `progress(N)` is called after each frame with the number of calculated
+            samples `N`.
+
+        Returns
+        -------
+        bool
+            True when the simulation has been completed, False when it has been
+            cancelled or an error occurred (`self.error == True`).
+        """
+        self.N_first = 0
+        self.error = not self._init_filter()
+        if self.error:
+            return False
+        self.stim.prepare(self.N_end)
+        estimators = list(self.welch.items()) + list(self.stft.items())
+        for _, est in estimators:
+            est.reset()
+
+        while self.N_first < self.N_end:
+            # The last frame could be shorter than self.N_frame:
+            L_frame = min(self.N_frame, self.N_end - self.N_first)
+            # Define slicing expression for the current frame
+            frame = slice(self.N_first, self.N_first + L_frame)
+
+            # ------------------------------------------------------------------
+            # ---- calculate stimuli for current frame in place ----------------
+            # ------------------------------------------------------------------
+            if self.stim.fill(self.x[frame], N_first=self.N_first,
+                              N_frame=L_frame) is None:
+                self.error = True
+                return False
+
+            # ------------------------------------------------------------------
+            # ---- calculate fixpoint or floating point response for current frame
+            # ------------------------------------------------------------------
+            if self.fxfilter is not None:  # fixpoint filter
+                # quantize stimulus
+                self.q_i.fixp_into(self.x[frame].real, out=self.x_q[frame])
+                # --------------------------------------------------------------
+                # ---- Get fixpoint response for current frame -----------------
+                # --------------------------------------------------------------
+                try:
+                    self.y[frame] = np.asarray(self.fxfilter(self.x_q[frame]))
+
+                except ValueError as e:
+                    if self.fxfilter(self.x_q[frame]) is None:
+                        logger.error("Fixpoint simulation returned empty results!")
+                    else:
+                        logger.error("Simulator error {0}".format(e))
+                    self.error = True
+                    return False
+
+            else:
+                # --------------------------------------------------------------
+                # ---- Get floating point response for current frame -----------
+                # --------------------------------------------------------------
+                if len(self.sos) > 0:  # has second order sections
+                    self.y[frame], self.zi = sig.sosfilt(self.sos, self.x[frame],
+                                                         zi=self.zi)
+                else:  # no second order sections
+                    self.y[frame], self.zi = sig.lfilter(
+                        self.bb, self.aa, self.x[frame], zi=self.zi)
+                # remove complex values produced by numerical inaccuracies,
+                # `tol` is specified in multiples of machine eps
+                self.y[frame] = np.real_if_close(self.y[frame], tol=1e3)
+
+            for key, est in estimators:
+                sig_k = getattr(self, key)
+                if sig_k is not None:
+                    est.add(sig_k[frame])
+
+            # --- Increase frame counter ---------------------------------------
+            self.N_first += self.N_frame
+            if cancelled is not None and cancelled():
+                return False
+            if progress is not None:
+                progress(min(self.N_first, self.N_end))
+        return True
+
+
+# ------------------------------------------------------------------------------
+def simulate(fil_dict, stim_params=None, N=100, N_frame=None, fx=None, memmap=None):
+    """
+    Calculate stimulus and transient response of a filter without any Qt widgets.
+
+    Parameters
+    ----------
+    fil_dict: dict
+        filter dict, e.g. `fb.fil[0]`, with floating point coefficients in
+        `'sos'` or `'ba'` and the fixpoint quantization dict in `'fxqc'`
+
+    stim_params: dict or None
+        stimulus parameters, see `STIM_PARAMS_DEFAULT` for keys and defaults
+
+    N: int
+        number of samples
+
+    N_frame: int or None
+        number of samples per frame, the whole stimulus is calculated
+        in one frame by default
+
+    fx: callable or None
+        fixpoint filter function `y = fx(x_q)` (e.g. `fxfilter()` of a fixpoint
+        widget returning the response for the quantized stimulus `x_q`).
+        When None, the floating point response is calculated.
+
+    memmap: bool or None
+        store the results in memory mapped files, by default this is done when
+        their size exceeds `MEMMAP_THRESHOLD`
+
+    Returns
+    -------
+    dict
+        with stimulus `'x'`, quantized stimulus `'x_q'` (None for floating point
+        simulations), response `'y'` and plot title `'title'`. On errors,
+        None is returned.
+    """
+    sim = Tran_Sim(fil_dict, stim_params, N=N, N_frame=N_frame, fxfilter=fx,
+                   memmap=memmap)
+    if not sim.run():
+        return None
+    return {'x': sim.x, 'x_q': sim.x_q, 'y': sim.y, 'title': sim.title_str}
@@ -11,14 +11,16 @@ Construct a widget consisting of a matplotlib canvas and an improved Navigation
 toolbar.
 """
 import sys
+import numpy as np
 from pyfda.libs.pyfda_lib import cmp_version
+from pyfda.libs.pyfda_sig_lib import Min_Max_Pyramid
 
 # do not import matplotlib.pyplot - pyplot brings its own GUI, event loop etc!!!
 from matplotlib.figure import Figure
 from matplotlib.transforms import Bbox
 from matplotlib import rcParams
 from matplotlib import lines
-from matplotlib.pyplot import setp
+from matplotlib.collections import LineCollection
 
 try:
     MPL_CURS = True
@@ -51,27 +53,64 @@ for key in pyfda_rc.mpl_rc:
 # ------------------------------------------------------------------------------
 def stems(x, y, ax=None, label=None, mkr_fmt=None, **kwargs):
     """
-    Provide a faster replacement for stem plots under matplotlib < 3.1.0 using
-    vlines (= LineCollection). LineCollection keywords are supported.
+    Provide a faster replacement for matplotlib stem plots using a `Stem_Plot`
+    (one `LineCollection` for the stems, one `Line2D` for the markers) and a
+    horizontal line at `bottom`. LineCollection keywords are supported.
+
+    Return a handle for the legend and the `Stem_Plot` for updating the data.
     """
     # create a copy of the kwargs dict without 'bottom' key-value pair, provide
     # pop bottom from dict (defuault = 0), not compatible with vlines
     bottom = kwargs.pop('bottom', 0)
     ax.axhline(bottom, **kwargs)
-    if cmp_version("matplotlib", "3.1.0") >= 0:
-        ml, sl, bl = ax.stem(x, y, use_line_collection=True, bottom=bottom)
-        setp(ml, **mkr_fmt)
-        setp(bl, **kwargs)
-        setp(sl, **kwargs)
-    else:
-        ax.vlines(x, y, bottom, label=label, **kwargs)
-        scatter(x, y, ax=ax, label=label, mkr_fmt=mkr_fmt, **kwargs)
+    stem_plot = Stem_Plot(ax, x, y, bottom=bottom, label=label, mkr_fmt=mkr_fmt,
+                          **kwargs)
 
     if mkr_fmt['marker']:
         handle = (lines.Line2D([], [], **kwargs), lines.Line2D([], [], **mkr_fmt))
     else:
         handle = lines.Line2D([], [], **kwargs)
-    return handle
+    return handle, stem_plot
+
+
+class Stem_Plot(object):
+    """
+    Stem plot in axis `ax`, consisting of a single `LineCollection` for the stems
+    (attribute `stems`, LineCollection keywords are supported) and a single
+    `Line2D` for the markers (attribute `markers`, None when `mkr_fmt` contains
+    no marker).
+
+    The data can be updated in place with `set_data()` without creating new
+    artists.
+    """
+
+    def __init__(self, ax, x, y, bottom=0, label=None, mkr_fmt=None, **kwargs):
+        self.ax = ax
+        self.bottom = bottom
+        self.stems = LineCollection(self._segments(x, y), label=label, **kwargs)
+        ax.add_collection(self.stems)  # updates data limits
+        if mkr_fmt and mkr_fmt.get('marker'):
+            self.markers, = ax.plot(x, y, linestyle='None', **mkr_fmt)
+        else:
+            self.markers = None
+            ax.autoscale_view()
+
+    def _segments(self, x, y):
+        """ Return array with the segments (x, bottom) -> (x, y) """
+        seg = np.empty((len(x), 2, 2))
+        seg[:, 0, 0] = seg[:, 1, 0] = x
+        seg[:, 0, 1] = self.bottom
+        seg[:, 1, 1] = y
+        return seg
+
+    def set_data(self, x, y):
+        """
+        Update stems and markers with new data in place. Axis limits are not
+        updated.
+        """
+        self.stems.set_segments(self._segments(x, y))
+        if self.markers is not None:
+            self.markers.set_data(x, y)
 
 
 def scatter(x, y, ax=None, label=None, mkr_fmt=None, **kwargs):
@@ -96,6 +135,83 @@ def no_plot(x, y, ax=None, bottom=0, label=None, **kwargs):
     pass
 
 
+# ------------------------------------------------------------------------------
+class Decimated_Plot(object):
+    """
+    Plot `y` over the equidistant, increasing `x` in the axis `ax` with
+    `plot_func(x, y)` when no more than `N_PX` samples per pixel column of the
+    axis are visible. Otherwise, plot the min / max envelope per pixel column as
+    a line with properties `fmt` instead, calculated from a `Min_Max_Pyramid`.
+
+    The plot is updated when the x-limits of `ax` or one of its shared axes change
+    by zooming or panning. Real samples are plotted for an interval three times
+    the visible range and are only replotted when the view leaves this interval.
+    """
+    N_PX = 2  #: max. number of samples per pixel column plotted without decimation
+
+    def __init__(self, ax, x, y, plot_func, fmt=None):
+        self.ax = ax
+        self.x = x
+        self.y = y
+        self.plot_func = plot_func
+        self.fmt = {} if fmt is None else fmt
+        self.pyramid = Min_Max_Pyramid(y)
+        self.artists = []  # artists of the current plot
+        self.raw_range = None  # plotted range of real samples, None for envelope
+        self.update()
+        for a in ax.get_shared_x_axes().get_siblings(ax):
+            a.callbacks.connect('xlim_changed', self.update)
+
+    def _idx(self, x_val):
+        """ Return (fractional) sample index of `x_val` """
+        if len(self.x) < 2 or self.x[-1] == self.x[0]:
+            return 0
+        return (x_val - self.x[0]) / (self.x[-1] - self.x[0]) * (len(self.x) - 1)
+
+    def update(self, ax_lim=None):
+        """
+        (Re-)plot data for the x-limits of `ax_lim` or for the full data range when
+        `ax_lim` is None
+        """
+        N = len(self.y)
+        if ax_lim is None:
+            N_start, N_end = 0, N
+        else:
+            x_min, x_max = sorted(ax_lim.get_xlim())
+            N_start = max(int(np.floor(self._idx(x_min))), 0)
+            N_end = min(int(np.ceil(self._idx(x_max))) + 1, N)
+        N_vis = max(N_end - N_start, 1)
+        N_px = max(int(self.ax.bbox.width), 1)
+
+        if N_vis <= self.N_PX * N_px:  # plot real samples
+            if self.raw_range is not None and self.raw_range[0] <= N_start\
+                    and N_end <= self.raw_range[1]:
+                return  # visible samples have been plotted already
+            N_start, N_end = max(N_start - N_vis, 0), min(N_end + N_vis, N)
+            self.raw_range = (N_start, N_end)
+            self._remove()
+            artists = set(self.ax.get_children())
+            self.plot_func(self.x[N_start:N_end], self.y[N_start:N_end])
+            self.artists = [a for a in self.ax.get_children() if a not in artists]
+        else:  # plot min / max envelope
+            N_start, N_end = max(N_start - N_vis, 0), min(N_end + N_vis, N)
+            n, y_min, y_max = self.pyramid.envelope(N_start, N_end, 3 * N_px)
+            x = np.repeat(self.x[n], 2)
+            y = np.column_stack((y_min, y_max)).ravel()
+            if self.raw_range is None and self.artists:
+                self.artists[0].set_data(x, y)
+            else:
+                self.raw_range = None
+                self._remove()
+                self.artists = self.ax.plot(x, y, **self.fmt)
+
+    def _remove(self):
+        """ Remove the artists of the current plot """
+        for a in self.artists:
+            a.remove()
+        self.artists = []
+
+
 # ------------------------------------------------------------------------------
 class MplWidget(QWidget):
     """
@@ -14,11 +14,11 @@ from pyfda.libs.compat import (
 
 import numpy as np
 from numpy import pi, ones, sin, cos, log10
-import scipy.signal as sig
 
 import pyfda.filterbroker as fb
 from pyfda.pyfda_rc import params
-from pyfda.libs.pyfda_lib import H_mag, mod_version, safe_eval, to_html
+from pyfda.libs.pyfda_lib import (
+    H_mag, H_mag_scale, H_abs_polar, mod_version, safe_eval, to_html, calc_Hcomplex)
 from pyfda.libs.pyfda_qt_lib import qget_cmb_box, PushButton
 from pyfda.plot_widgets.mpl_widget import MplWidget
 
@@ -291,7 +291,11 @@ class Plot_3D(QWidget):
         dy = (self.ymax - self.ymin) / steps  # grid size cartesian range
 
         if self.but_plot_in_UC.isChecked():  # Plot circular range in 3D-Plot
-            [r, phi] = np.meshgrid(np.arange(rmin, rmax, dr),
+            # angles 2 pi k / N_phi for the FFT based calculation, the last
+            # angle 2 pi closes the circle
+            self.r = np.arange(rmin, rmax, dr)
+            self.N_phi = steps - 1
+            [r, phi] = np.meshgrid(self.r,
                                    np.linspace(0, 2 * pi, steps, endpoint=True))
             self.x = r * cos(phi)
             self.y = r * sin(phi)
@@ -442,7 +446,7 @@ class Plot_3D(QWidget):
         # -----------------------------------------------------------------------------
 
 
-        [w, H] = sig.freqz(bb, aa, worN=N_FFT, whole=True)
+        [w, H] = calc_Hcomplex(fb.fil[0], N_FFT, True)
         H = np.nan_to_num(H)  # replace nans and inf by finite numbers
 
         H_abs = abs(H)
@@ -494,7 +498,14 @@ class Plot_3D(QWidget):
         # calculate H(jw)| along the unity circle and |H(z)|, each clipped
         # between bottom and top
         H_UC = H_mag(bb, aa, self.xy_UC, top, H_min=bottom, log=self.but_log.isChecked())
-        Hmag = H_mag(bb, aa, self.z, top, H_min=bottom, log=self.but_log.isChecked())
+        if self.but_plot_in_UC.isChecked():
+            # shape (r, phi) -> append first angle to close the circle and
+            # transpose to the shape of the meshgrid (phi, r)
+            H_abs = H_abs_polar(bb, aa, self.r, self.N_phi)
+            Hmag = H_mag_scale(np.hstack((H_abs, H_abs[:, :1])).T, top, H_min=bottom,
+                               log=self.but_log.isChecked())
+        else:
+            Hmag = H_mag(bb, aa, self.z, top, H_min=bottom, log=self.but_log.isChecked())
 
         # ===============================================================
         # Plot Unit Circle (UC)
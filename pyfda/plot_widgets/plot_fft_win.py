@@ -11,12 +11,12 @@ Create a popup window with FFT window information
 """
 
 import numpy as np
-from numpy.fft import fft, fftshift, fftfreq
+from numpy.fft import fftshift, fftfreq
 from scipy.signal import argrelextrema
 
 import matplotlib.patches as mpl_patches
 
-from pyfda.libs.pyfda_lib import safe_eval, to_html, pprint_log
+from pyfda.libs.pyfda_lib import safe_eval, to_html, pprint_log, fast_fft
 from pyfda.libs.pyfda_qt_lib import (
     qwindow_stay_on_top, qtext_width, QVLine, QHLine)
 from pyfda.pyfda_rc import params
@@ -437,10 +437,11 @@ class Plot_FFT_win(QDialog):
             / np.square(np.sum(self.win_view))
         self.cgain = np.sum(self.win_view) / self.N_view  # coherent gain
 
-        # calculate the FFT of the window with a zero padding factor
-        # of `self.pad`
-        self.F = fftfreq(self.N_view * self.pad, d=1. / fb.fil[0]['f_S'])
-        self.Win = np.abs(fft(self.win_view, self.N_view * self.pad))
+        # calculate the FFT of the window with a zero padding factor of (at least)
+        # `self.pad`, padded to a length that can be calculated efficiently
+        self.Win = np.abs(fast_fft(self.win_view, self.N_view * self.pad,
+                                   fast_len=True))
+        self.F = fftfreq(len(self.Win), d=1. / fb.fil[0]['f_S'])
 
         # Correct gain for periodic signals (coherent gain)
         if self.but_norm_f.isChecked():
@@ -448,12 +449,12 @@ class Plot_FFT_win(QDialog):
 
         # calculate frequency of first zero and maximum sidelobe level
         first_zero = argrelextrema(
-            self.Win[:(self.N_view*self.pad)//2], np.less)
+            self.Win[:len(self.Win)//2], np.less)
         if np.shape(first_zero)[1] > 0:
             first_zero = first_zero[0][0]
             self.first_zero_f = self.F[first_zero]
             self.sidelobe_level = np.max(
-                self.Win[first_zero:(self.N_view*self.pad)//2])
+                self.Win[first_zero:len(self.Win)//2])
         else:
             self.first_zero_f = np.nan
             self.sidelobe_level = 0
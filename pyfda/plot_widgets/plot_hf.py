@@ -23,7 +23,8 @@ from matplotlib.ticker import AutoMinorLocator
 import pyfda.filterbroker as fb
 from pyfda.pyfda_rc import params
 from pyfda.plot_widgets.mpl_widget import MplWidget
-from pyfda.libs.pyfda_lib import calc_Hcomplex, pprint_log, safe_eval, to_html
+from pyfda.libs.pyfda_lib import (
+    calc_Hcomplex, select_freq_range, pprint_log, safe_eval, to_html)
 from pyfda.libs.pyfda_qt_lib import PushButton, qtext_width, qcmb_box_populate
 
 import logging
@@ -47,6 +48,7 @@ class Plot_Hf(QWidget):
 
         self.log_bottom = -80
         self.lin_neg_bottom = -10
+        self.zoom_lines = {}  # {axes: H(f) line} for recalculation when zooming in
 
         self.cmb_units_a_items = [
             "<span>Set unit for y-axis</span>",
@@ -485,11 +487,12 @@ class Plot_Hf(QWidget):
                 extent = extent.transformed(self.mplwidget.fig.transFigure.inverted())
                 rect = Rectangle((extent.xmin, extent.ymin), extent.width,
                         extent.height, facecolor=rcParams['figure.facecolor'], edgecolor='none',
-                        transform=self.mplwidget.fig.transFigure, zorder=-1)
-                self.ax_i.patches.append(rect)
+                        transform=self.mplwidget.fig.transFigure, zorder=-1, clip_on=False)
+                self.ax_i.add_artist(rect)
 
                 self.ax_i.set_xlim(fb.fil[0]['freqSpecsRange'])
-                self.ax_i.plot(self.F, self.H_plt)
+                self.zoom_lines[self.ax_i] = self.ax_i.plot(self.F, self.H_plt)[0]
+                self.ax_i.callbacks.connect('xlim_changed', self.zoom_hf)
 
             if self.cmbInset.currentIndex() == 1: # edit / navigate inset
                 self.ax_i.set_navigate(True)
@@ -504,6 +507,7 @@ class Plot_Hf(QWidget):
             try:
                 #remove ax_i from the figure
                 self.mplwidget.fig.delaxes(self.ax_i)
+                self.zoom_lines.pop(self.ax_i, None)
             except AttributeError:
                 pass
 
@@ -537,13 +541,14 @@ class Plot_Hf(QWidget):
             else:
                 phi_str += ' in deg ' + r'$\rightarrow $'
                 scale = 180./np.pi
+            self.phi_scale = scale
 
             # replace nan and inf by finite values, otherwise np.unwrap yields
             # an array full of nans
             phi = np.angle(np.nan_to_num(self.H_c))
         # -----------------------------------------------------------
-            self.ax_p.plot(self.F, np.unwrap(phi)*scale,
-                           'g-.', label="Phase")
+            self.line_phi, = self.ax_p.plot(self.F, np.unwrap(phi)*scale,
+                                            'g-.', label="Phase")
         # -----------------------------------------------------------
             self.ax_p.set_ylabel(phi_str)
 
@@ -553,7 +558,59 @@ class Plot_Hf(QWidget):
         (Re-)Calculate the complex frequency response H_cmplx(W) (complex)
         for W = 0 ... 2 pi:
         """
-        self.W, self.H_cmplx = calc_Hcomplex(fb.fil[0], params['N_FFT'], True)
+        self.W, self.H_cmplx = calc_Hcomplex(fb.fil[0], params['N_FFT'], True,
+                                             tol=params['H_tol'])
+
+#------------------------------------------------------------------------------
+    def calc_H_plt(self, H_c):
+        """
+        Return magnitude, real or imaginary part of the complex frequency response
+        `H_c` in the selected unit
+        """
+        if self.cmbShowH.currentIndex() == 0:  # show magnitude of H
+            H = abs(H_c)
+        elif self.cmbShowH.currentIndex() == 1:  # show real part of H
+            H = H_c.real
+        else:  # show imag. part of H
+            H = H_c.imag
+
+        if self.unitA == 'dB':
+            return np.maximum(20*np.log10(abs(H)), self.log_bottom)
+        elif self.unitA == 'V':
+            return H
+        else:
+            return H * H.conj()
+
+#------------------------------------------------------------------------------
+    def zoom_hf(self, ax):
+        """
+        Triggered when the x-limits of the main plot or the inset `ax` have been
+        changed: When the displayed frequency range is less than f_S/2, H(f) is
+        recalculated with `params['N_FFT']` points in this band using the chirp-z
+        transform, giving a much higher resolution of e.g. pass band ripple than
+        the full range calculation. Otherwise, the full range data is displayed.
+        """
+        line = self.zoom_lines.get(ax)
+        if line is None or not hasattr(self, 'H_plt'):
+            return
+        # restrict band to the calculated frequency range
+        f_1, f_2 = np.clip(sorted(ax.get_xlim()), self.F[0], self.F[-1])
+        if f_2 - f_1 >= self.f_max / 2 or f_2 <= f_1:
+            F, H_plt, H_c = self.F, self.H_plt, self.H_c
+        else:
+            F, H_c = calc_Hcomplex(fb.fil[0], params['N_FFT'], True, fs=self.f_max,
+                                   f_range=(f_1, f_2))
+            if self.but_zerophase.isChecked():  # remove the linear phase
+                H_c = H_c * np.exp(1j * np.pi * F / self.f_max * fb.fil[0]["N"])
+            with np.errstate(divide='ignore'):
+                H_plt = self.calc_H_plt(H_c)
+        line.set_data(F, H_plt)
+
+        if ax is self.ax and hasattr(self, 'ax_p'):
+            self.line_phi.set_data(
+                F, np.unwrap(np.angle(np.nan_to_num(H_c))) * self.phi_scale)
+            self.ax_p.relim()
+            self.ax_p.autoscale_view(scalex=False)
 
 #------------------------------------------------------------------------------
     def draw(self):
@@ -628,32 +685,18 @@ class Plot_Hf(QWidget):
 
         # ========= select frequency range to be displayed =====================
         # === shift, scale and select: W -> F, H_cplx -> H_c
-        self.F = self.W / (2 * np.pi) * self.f_max
-
-        if fb.fil[0]['freqSpecsRangeType'] == 'sym':
-            # shift H and F by f_S/2
-            self.H_c = np.fft.fftshift(self.H_cmplx)
-            self.F -= self.f_max/2.
-        elif fb.fil[0]['freqSpecsRangeType'] == 'half':
-            # only use the first half of H and F
-            self.H_c = self.H_cmplx[0:params['N_FFT']//2]
-            self.F = self.F[0:params['N_FFT']//2]
-        else:  # fb.fil[0]['freqSpecsRangeType'] == 'whole'
-            # use H and F as calculated
-            self.H_c = self.H_cmplx
+        self.F, self.H_c = select_freq_range(
+            self.W, self.H_cmplx, fb.fil[0]['freqSpecsRangeType'], self.f_max)
 
         # now calculate mag / real / imaginary part of H_c:
         if self.but_zerophase.isChecked():  # remove the linear phase
-            self.H_c = self.H_c * np.exp(1j * self.W[0:len(self.F)] * fb.fil[0]["N"]/2.)
+            self.H_c = self.H_c * np.exp(1j * np.pi * self.F / self.f_max * fb.fil[0]["N"])
 
         if self.cmbShowH.currentIndex() == 0:  # show magnitude of H
-            H = abs(self.H_c)
             H_str = r'$|H(\mathrm{e}^{\mathrm{j} \Omega})|$'
         elif self.cmbShowH.currentIndex() == 1: # show real part of H
-            H = self.H_c.real
             H_str = r'$\Re \{H(\mathrm{e}^{\mathrm{j} \Omega})\}$'
         else:  # show imag. part of H
-            H = self.H_c.imag
             H_str = r'$\Im \{H(\mathrm{e}^{\mathrm{j} \Omega})\}$'
 
         # ================ Main Plotting Routine =========================
@@ -666,11 +709,11 @@ class Plot_Hf(QWidget):
                     return_type='float', sign='neg')
                 self.led_log_bottom.setText(str(self.log_bottom))
 
-                self.H_plt = np.maximum(20*np.log10(abs(H)), self.log_bottom)
+                self.H_plt = self.calc_H_plt(self.H_c)
                 A_lim = [self.log_bottom, 2]
                 H_str += ' in dB ' + r'$\rightarrow$'
             elif self.unitA == 'V':  #  'lin'
-                self.H_plt = H
+                self.H_plt = self.calc_H_plt(self.H_c)
                 if self.cmbShowH.currentIndex() != 0:  # H can be less than zero
                     A_min = max(self.lin_neg_bottom, np.nanmin(self.H_plt[np.isfinite(self.H_plt)]))
                 else:
@@ -680,14 +723,14 @@ class Plot_Hf(QWidget):
                 self.ax.axhline(linewidth=1, color='k') # horizontal line at 0
             else: # unit is W
                 A_lim = [0, (1.03 + A_max)**2.]
-                self.H_plt = H * H.conj()
+                self.H_plt = self.calc_H_plt(self.H_c)
                 H_str += ' in W ' + r'$\rightarrow $'
 
             #logger.debug("lim: {0}, min: {1}, max: {2} - {3}".format(A_lim, A_min, A_max, self.H_plt[0]))
 
             #-----------------------------------------------------------
             self.ax.clear()
-            self.ax.plot(self.F, self.H_plt, label = 'H(f)')
+            self.zoom_lines[self.ax] = self.ax.plot(self.F, self.H_plt, label = 'H(f)')[0]
             # TODO: self.draw_inset() # this gives an infinite recursion
             self.draw_phase(self.ax)
             #-----------------------------------------------------------
@@ -699,6 +742,9 @@ class Plot_Hf(QWidget):
             #     self.ax_bounds = [self.ax.get_ybound()[0], self.ax.get_ybound()[1]]#, self.ax.get]
             self.ax.set_xlim(f_lim)
             self.ax.set_ylim(A_lim)
+            # `ax.clear()` also removes the callbacks
+            self.ax.callbacks.connect('xlim_changed', self.zoom_hf)
+            self.zoom_hf(self.ax)
             # logger.warning("set limits")
 
             self.ax.set_xlabel(fb.fil[0]['plt_fLabel'])
@@ -712,6 +758,9 @@ class Plot_Hf(QWidget):
 
             np.seterr(**old_settings_seterr)
 
+        if self.inset_idx > 0:  # update inset with the new data
+            self.zoom_hf(self.ax_i)
+
         self.redraw()
 
 #------------------------------------------------------------------------------
@@ -11,23 +11,25 @@ Widget for plotting impulse and general transient responses
 """
 import time
 from pyfda.libs.compat import (
-    QWidget, pyqtSignal, QTabWidget, QVBoxLayout, QIcon, QSize, QSizePolicy)
+    QWidget, QThread, pyqtSignal, QTabWidget, QVBoxLayout, QIcon, QSize, QSizePolicy)
 
 import numpy as np
 import scipy.signal as sig
 import matplotlib.patches as mpl_patches
-# import matplotlib.lines as lines
+import matplotlib.lines as lines
 from matplotlib.ticker import AutoMinorLocator
 
 import pyfda.filterbroker as fb
-import pyfda.libs.pyfda_fix_lib as fx
-from pyfda.libs.pyfda_sig_lib import angle_zero
+from pyfda.libs.pyfda_sig_lib import angle_zero, Welch, STFT
+from pyfda.libs.pyfda_tran_lib import Tran_Sim
 from pyfda.libs.pyfda_lib import (
-    safe_eval, pprint_log, first_item, calc_ssb_spectrum, calc_Hcomplex)
+    safe_eval, pprint_log, first_item, calc_ssb_spectrum, calc_Hcomplex, fast_fft,
+    calc_fft_power)
 from pyfda.libs.pyfda_qt_lib import (
     qget_cmb_box, qset_cmb_box, qstyle_widget, qcmb_box_add_item, qcmb_box_del_item)
 from pyfda.pyfda_rc import params  # FMT string for QLineEdit fields, e.g. '{:.3g}'
-from pyfda.plot_widgets.mpl_widget import MplWidget, stems, scatter
+from pyfda.plot_widgets.mpl_widget import (
+    MplWidget, Decimated_Plot, Stem_Plot, stems, scatter)
 
 from pyfda.plot_widgets.tran.plot_tran_stim import Plot_Tran_Stim
 from pyfda.plot_widgets.tran.tran_io import Tran_IO
@@ -42,6 +44,45 @@ logger = logging.getLogger(__name__)
 
 classes = {'Plot_Impz': 'y[n] / Y(f)'}  #: Dict containing class name : display name
 
+T_PROGRESS = 0.1  #: minimum time in s between two updates of the progress bar
+
+
+class Impz_Worker(QThread):
+    """
+    Run the frame loop `func(worker)` for calculating stimulus and response
+    in a separate thread to keep the GUI responsive. `func` polls `cancelled()`
+    after each frame and reports the number of calculated samples via
+    `progress()`.
+    """
+    sig_progress = pyqtSignal(int)
+
+    def __init__(self, func, parent=None):
+        super().__init__(parent)
+        self.func = func
+        self._cancel = False
+        self._t_progress = 0.
+
+    def run(self):
+        self.func(self)
+
+    def cancel(self):
+        """ Request the frame loop to stop after the current frame """
+        self._cancel = True
+
+    def cancelled(self):
+        """ Return True when cancelling the frame loop has been requested """
+        return self._cancel
+
+    def progress(self, N):
+        """
+        Emit the number of calculated samples `N`, at most every `T_PROGRESS`
+        seconds to avoid flooding the GUI event loop.
+        """
+        t = time.perf_counter()
+        if t - self._t_progress >= T_PROGRESS:
+            self._t_progress = t
+            self.sig_progress.emit(N)
+
 
 class Plot_Impz(QWidget):
     """
@@ -64,10 +105,17 @@ class Plot_Impz(QWidget):
         # same when fixpoint specs have been changed, only needed in Fixpoint mode
         self.needs_calc_fx = True
         self.needs_redraw = [True] * 2  # flag which plot needs to be redrawn
+        # settings of the time domain plot, the data is updated in place as long
+        # as they don't change (None: rebuild plot)
+        self.time_layout = None
         self.error = False
+        self.worker = None  # worker thread for calculating the response
+        self.restart_sim = None  # restart simulation after cancelling worker
         self.tool_tip = "Impulse / transient response and their spectra"
         self.tab_label = "y[n]"
         self.active_tab = 0  # index for active tab
+        # spectrogram combobox entries -> signals
+        self.spgr_keys = {'xn': 'x', 'xqn': 'x_q', 'yn': 'y'}
         # markersize=None, markeredgewidth=None, markeredgecolor=None,
         # markerfacecolor=None, markerfacecoloralt='none', fillstyle=None,
         self.fmt_mkr_size = 8
@@ -211,6 +259,9 @@ class Plot_Impz(QWidget):
         self.ui.led_log_bottom_freq.editingFinished.connect(self.draw)
         self.ui.but_freq_norm_impz.clicked.connect(self.draw)
         self.ui.but_freq_show_info.clicked.connect(self.draw)
+        self.ui.but_freq_welch.clicked.connect(self._welch_ui)
+        self.ui.led_nfft_welch.editingFinished.connect(self._welch_ui2params)
+        self.ui.led_ovlp_welch.editingFinished.connect(self._welch_ui2params)
 
 # ------------------------------------------------------------------------------
     def toggle_stim_options(self):
@@ -390,12 +441,24 @@ class Plot_Impz(QWidget):
             - Autorun (when something relevant in the UI has been updated)
             - 'fx_sim' : 'specs_changed'
 
+        When a simulation is running, it is cancelled. Unless triggered by the
+        "Run" button, the simulation is restarted with the new settings when
+        the worker thread has finished. The "Run" button also cancels such a
+        pending restart.
+
         The following tasks are performed:
             - Enable energy scaling for impulse stimuli when requirements are met
             - check for and enable fixpoint settings
             - when triggered by `but_run` or when `Auto`== pressed and
               `self.needs_calc == True`, continue with calculating stimulus and response
         """
+        if self.worker is not None:  # simulation is running, stop it
+            self.worker.cancel()
+            if self.sender() is self.ui.but_run:
+                self.restart_sim = None  # also cancel pending restarts
+            else:
+                self.restart_sim = (arg,)
+            return
 
         # allow scaling the frequency response from pure impulse (no DC, no noise)
         # button is only visible for impulse-shaped stimuli
@@ -418,14 +481,15 @@ class Plot_Impz(QWidget):
             return
 
         if self.needs_calc:
-            # set title and axis string and calculate 10 samples to determine ndtype
-            x_test = self.stim_wdg.calc_stimulus_frame(init=True)
-            self.title_str = self.stim_wdg.title_str
-
-            self.N_first = 0  # initialize frame index
-            self.n = np.arange(self.ui.N_end, dtype=float)
-            self.x = np.empty(self.ui.N_end, dtype=x_test.dtype)  # stimulus
-            self.y = np.empty_like(self.x)  # response
+            # update stimulus parameters from the UI and setup the simulation,
+            # this sets title and axis string and determines the ndtype
+            self.stim_wdg.stim.set_params(self.stim_wdg.stim_params())
+            self.sim = Tran_Sim(fb.fil[0], self.stim_wdg.stim, N=self.ui.N_end,
+                                N_frame=self.ui.N_frame)
+            self.title_str = self.sim.title_str
+
+            self.x = self.sim.x  # stimulus
+            self.y = self.sim.y  # response
             self.cmplx = False  # Flag for complex signal
             # initialize progress bar
             self.ui.prg_wdg.setMaximum(self.ui.N_end)
@@ -438,109 +502,81 @@ class Plot_Impz(QWidget):
 
             if self.fx_sim:
                 # - update plot title string
-                # - setup input quantizer self.q_i
                 # - emit {'fx_sim': 'init'} to listening widgets
                 self.title_str = r'$Fixpoint$ ' + self.title_str
-                self.x_q = np.empty_like(self.x, dtype=np.float64)  # quantized stimulus
-                if np.any(np.iscomplex(x_test)):
-                    logger.warning(
-                        "Complex stimulus: Only its real part is used for the "
-                        "fixpoint filter!")
-                self.q_i = fx.Fixed(fb.fil[0]['fxqc']['QI'])  # setup quantizer
-                self.q_i.setQobj({'frmt': 'dec'})  # always use integer decimal format
                 # initialize FX filter and get a handle for `fxfilter()` function
                 self.emit({'fx_sim': 'init'})
                 return  # process_sig_rx() switches directly to impz() in next step
             else:
-                # Initialize filter memory with zeros, for either cascaded structure (sos)
-                # or direct form
-                self.sos = np.asarray(fb.fil[0]['sos'])
-                if len(self.sos) > 0:  # has second order sections
-                    self.zi = np.zeros((self.sos.shape[0], 2))
-                else:
-                    self.bb = np.asarray(fb.fil[0]['ba'][0])
-                    self.aa = np.asarray(fb.fil[0]['ba'][1])
-                    if min(len(self.aa), len(self.bb)) < 2:
-                        logger.error(
-                            'No proper filter coefficients: len(a), len(b) < 2 !')
-                        return
-                    self.zi = np.zeros(max(len(self.aa), len(self.bb)) - 1)
                 # calculate float impulse response:
                 self.impz()
 
     # --------------------------------------------------------------------------
     def impz(self):
         """
-        Calculate floating point / fixpoint response and redraw it
+        Start calculating the floating point / fixpoint response frame by frame
+        in a worker thread via `self._impz_frames()`, `self._impz_done()` is
+        called when the worker has finished.
 
         Triggered by:
         - `self.impz_init()` (floating point)
         -  Fixpoint widget, requesting "start_fx_response_calculation"
             via `process_rx_signal()` (fixpoint filter)
         """
-        while self.N_first < self.ui.N_end:
-            # logger.info("impz(): Calculating frame "
-            #             f"{int(np.ceil(self.N_first / self.ui.N_frame)) + 1} of "
-            #             f"{int(np.ceil(self.ui.N_end / self.ui.N_frame))}")
-            # The last frame could be shorter than self.ui.N_frame:
-            L_frame = min(self.ui.N_frame, self.ui.N_end - self.N_first)
-            # Define slicing expression for the current frame
-            frame = slice(self.N_first, self.N_first + L_frame)
-
-            # ------------------------------------------------------------------
-            # ---- calculate stimuli for current frame -------------------------
-            # ------------------------------------------------------------------
-            self.x[frame] = self.stim_wdg.calc_stimulus_frame(
-                    N_first=self.N_first, N_frame=L_frame, N_end=self.ui.N_end)
-
-            # ------------------------------------------------------------------
-            # ---- calculate fixpoint or floating point response for current frame
-            # ------------------------------------------------------------------
-            if self.fx_sim:  # fixpoint filter
-                self.x_q[frame] = self.q_i.fixp(self.x[frame].real)  # quantize stimulus
-                # --------------------------------------------------------------
-                # ---- Get fixpoint response for current frame -----------------
-                # --------------------------------------------------------------
-                try:
-                    self.y[frame] = np.asarray(self.fxfilter(self.x_q[frame]))
-
-                except ValueError as e:
-                    if self.fxfilter(self.x_q[frame]) is None:
-                        logger.error("Fixpoint simulation returned empty results!")
-                    else:
-                        logger.error("Simulator error {0}".format(e))
-                        fb.fx_results = None
-                    self.error = True
+        self.sim.fxfilter = self.fxfilter if self.fx_sim else None
+        self._init_estimators()
+        self.worker = Impz_Worker(self._impz_frames, parent=self)
+        self.worker.sig_progress.connect(self.ui.prg_wdg.setValue)
+        self.worker.finished.connect(self._impz_done)
+        self.worker.start()
 
-                if self.error:
-                    self.ui.but_run.setIcon(QIcon(":/play.svg"))
-                    qstyle_widget(self.ui.but_run, "error")
-                    self.needs_calc = True
-                    break  # exit while loop
+    # --------------------------------------------------------------------------
+    def _impz_frames(self, worker):
+        """
+        Calculate stimulus and floating point / fixpoint response frame by frame
+        with `self.sim.run()`, executed in the thread of `worker`. The loop is left
+        after the current frame when cancelling has been requested or an error
+        occurred. Widgets must not be modified here.
+        """
+        self.sim.run(cancelled=worker.cancelled, progress=worker.progress)
 
-            else:
-                # --------------------------------------------------------------
-                # ---- Get floating point response for current frame -----------
-                # --------------------------------------------------------------
-                if len(self.sos) > 0:  # has second order sections
-                    self.y[frame], self.zi = sig.sosfilt(self.sos, self.x[frame],
-                                                         zi=self.zi)
-                else:  # no second order sections
-                    self.y[frame], self.zi = sig.lfilter(
-                        self.bb, self.aa, self.x[frame], zi=self.zi)
-                # remove complex values produced by numerical inaccuracies,
-                # `tol` is specified in multiples of machine eps
-                self.y[frame] = np.real_if_close(self.y[frame], tol=1e3)
-
-            # TODO: Test for user interrupt here
-            # --- Increase frame counter ---------------------------------------
-            self.N_first += self.ui.N_frame
-            self.ui.prg_wdg.setValue(self.N_first)
-
-        # -------------------------------------------------------------
-        # ----------------------- finish ------------------------------
-        # -------------------------------------------------------------
-        self.impz_finish()
+    # --------------------------------------------------------------------------
+    def _impz_done(self):
+        """
+        Triggered when the worker thread has finished: Update the UI for errors
+        or cancelled simulations or finish the simulation via `impz_finish()`.
+        Restart the simulation when this has been requested during the run.
+        """
+        worker, self.worker = self.worker, None
+        worker.wait()
+        worker.deleteLater()
+
+        self.error = self.sim.error
+        if self.fx_sim:
+            self.x_q = self.sim.x_q  # quantized stimulus
+            self.q_i = self.sim.q_i  # input quantizer
+            if self.error:
+                fb.fx_results = None
+
+        if self.error:
+            self.ui.but_run.setIcon(QIcon(":/play.svg"))
+            qstyle_widget(self.ui.but_run, "error")
+            self.needs_calc = True
+        elif worker.cancelled():
+            logger.info(f"Cancelled transient {self.fx_str}response calculation")
+            self.ui.prg_wdg.setValue(0)
+            self.ui.but_run.setIcon(QIcon(":/play.svg"))
+            qstyle_widget(self.ui.but_run, "changed")
+            self.needs_calc = True
+            if self.fx_sim:
+                self.emit({'fx_sim': 'finish'})
+        else:
+            self.impz_finish()
+
+        if self.restart_sim is not None:
+            arg, = self.restart_sim
+            self.restart_sim = None
+            self.impz_init(arg)
 
     # --------------------------------------------------------------------------
     def impz_finish(self):
@@ -558,16 +594,22 @@ class Plot_Impz(QWidget):
         # step error calculation: calculate system DC response and subtract it
         # from the response
         if self.stim_wdg.ui.stim == "step" and self.stim_wdg.ui.chk_step_err.isChecked():
-            if len(self.sos) > 0:  # has second order sections
-                dc = sig.sosfreqz(self.sos, [0])  # yields (w(0), H(0))
+            sos = np.asarray(fb.fil[0]['sos'])
+            if len(sos) > 0:  # has second order sections
+                dc = sig.sosfreqz(sos, [0])  # yields (w(0), H(0))
             else:
-                dc = sig.freqz(self.bb, self.aa, [0])
+                dc = sig.freqz(fb.fil[0]['ba'][0], fb.fil[0]['ba'][1], [0])
             self.y[max(self.ui.N_start, self.stim_wdg.T1_idx):] = \
                 self.y[max(self.ui.N_start, self.stim_wdg.T1_idx):] - abs(dc[1])
+            # accumulated spectra are invalid now
+            self.sim.welch.pop('y', None)
+            self.sim.stft.pop('y', None)
 
         # Test whether response or stimulus are complex
         # TODO: shouldn't stimulus and response be treated separately?
-        self.cmplx = bool(np.any(np.iscomplex(self.y)) or np.any(np.iscomplex(self.x)))
+        # (equivalent to `np.any(np.iscomplex())` without full-size temporary arrays)
+        self.cmplx = bool(np.iscomplexobj(self.y) and np.any(self.y.imag)
+                          or np.iscomplexobj(self.x) and np.any(self.x.imag))
         self.ui.lbl_stim_cmplx_warn.setVisible(self.cmplx)
         self.ui.prg_wdg.setValue(self.ui.N_end)  # 100% reached
         self.t_resp = time.process_time()
@@ -643,10 +685,35 @@ class Plot_Impz(QWidget):
         """
         (Re-)calculate FFTs of stimulus `self.X`, quantized stimulus `self.X_q`
         and response `self.Y` using the window function from `self.ui.win_dict['win']`.
+
+        For real signals and a single-sided frequency range, only the bins
+        0 ... N//2 are calculated.
+
+        In Welch mode, magnitude spectra averaged over segments of
+        `self.ui.nfft_welch` points are used instead. They have been accumulated
+        during the simulation or are calculated frame by frame from the stored
+        signals when the settings have been changed in the meantime.
+
+        The number of FFT points, the normalized equivalent noise bandwidth and
+        the coherent gain of the window are stored in `self.N_fft`, `self.nenbw`
+        and `self.cgain`.
         """
+        welch = self.ui.but_freq_welch.isChecked()
+        if welch:
+            win, N_ovlp = self._welch_params()
+        else:
+            win = self.ui.qfft_win_select.get_window(self.ui.N)
+        N = self.N_fft = len(win)
+        self.nenbw = N * np.sum(np.square(win)) / np.square(np.sum(win))
+        self.cgain = np.sum(win) / N
+        win = win / self.cgain
+        # the single-sided FFT of real signals contains all information needed
+        # for the 'half' range, complex signals need the full spectrum for the power
+        def sides(x):
+            return 'one' if fb.fil[0]['freqSpecsRangeType'] == 'half'\
+                and not np.iscomplexobj(x) else 'two'
+
         # calculate FFT of stimulus / response
-        N = self.ui.N
-        win = self.ui.qfft_win_select.get_window(N) / self.ui.win_dict['cgain']
         if self.x is None:
             self.X = np.zeros(N)  # dummy result
             logger.warning("Stimulus is 'None', FFT cannot be calculated.")
@@ -655,31 +722,37 @@ class Plot_Impz(QWidget):
             logger.warning(
                 "Length of stimulus is {0} < N = {1}, FFT cannot be calculated."
                 .format(len(self.x), self.ui.N_end))
+        elif welch:
+            self.X = self._estimator(Welch, 'x', win, N_ovlp).spectrum() / N
+            if self.fx_sim and hasattr(self, "q_i"):
+                self.X_q = self._estimator(Welch, 'x_q', win, N_ovlp).spectrum() / N
         else:
             # multiply the  time signal with window function
             x_win = self.x[self.ui.N_start:self.ui.N_end] * win
             # calculate absolute value and scale by N_FFT
-            self.X = np.fft.fft(x_win) / self.ui.N
+            self.X = fast_fft(x_win, sides=sides(x_win)) / N
             # self.X[0] = self.X[0] * np.sqrt(2) # correct value at DC
 
             if self.fx_sim and hasattr(self, "q_i"):
                 # same for fixpoint simulation
                 x_q_win = self.q_i.fixp(self.x[self.ui.N_start:self.ui.N_end])\
                     * win
-                self.X_q = np.fft.fft(x_q_win) / self.ui.N
+                self.X_q = fast_fft(x_q_win, sides=sides(x_q_win)) / N
                 # self.X_q[0] = self.X_q[0] * np.sqrt(2) # correct value at DC
 
         if self.y is None or len(self.y) < self.ui.N_end:
-            self.Y = np.zeros(self.ui.N)  # dummy result
+            self.Y = np.zeros(N)  # dummy result
             if self.y is None:
                 logger.warning("Transient response is 'None', FFT cannot be calculated.")
             else:
                 logger.warning(
                     "Length of transient response is {0} < N = {1}, FFT cannot be "
                     "calculated.".format(len(self.y), self.ui.N_end))
+        elif welch:
+            self.Y = self._estimator(Welch, 'y', win, N_ovlp).spectrum() / N
         else:
             y_win = self.y[self.ui.N_start:self.ui.N_end] * win
-            self.Y = np.fft.fft(y_win) / self.ui.N
+            self.Y = fast_fft(y_win, sides=sides(y_win)) / N
             # self.Y[0] = self.Y[0] * np.sqrt(2) # correct value at DC
 
 #        if self.ui.chk_win_freq.isChecked():
@@ -687,6 +760,64 @@ class Plot_Impz(QWidget):
 
         self.needs_redraw[1] = True   # redraw of frequency widget needed
 
+    # ------------------------------------------------------------------------
+    def _welch_params(self):
+        """
+        Return window function and number of overlapping points for Welch spectral
+        estimation, segments are limited to the number of displayed points.
+        """
+        N_fft = max(min(self.ui.nfft_welch, self.ui.N), 1)
+        N_ovlp = min(self.ui.ovlp_welch, N_fft - 1)
+        return self.ui.qfft_win_select.get_window(N_fft), N_ovlp
+
+    # ------------------------------------------------------------------------
+    def _spgr_params(self):
+        """
+        Return window function and number of overlapping points for the
+        spectrogram, segments are limited to the number of displayed points.
+        """
+        N_fft = max(min(self.ui.time_nfft_spgr, self.ui.N), 1)
+        N_ovlp = self.ui.time_ovlp_spgr if self.ui.time_ovlp_spgr < N_fft else 0
+        return self.ui.qfft_win_select.get_window(N_fft), N_ovlp
+
+    # ------------------------------------------------------------------------
+    def _init_estimators(self):
+        """
+        Setup Welch estimators for stimulus, quantized stimulus and response
+        when Welch mode is selected and the STFT for the signal selected for the
+        spectrogram. They are fed frame by frame during the simulation.
+        """
+        self.sim.welch = {}
+        if self.ui.but_freq_welch.isChecked():
+            win, N_ovlp = self._welch_params()
+            for key in ['x', 'y'] + ['x_q'] * self.fx_sim:
+                self.sim.welch[key] = Welch(win / np.mean(win), N_ovlp,
+                                            self.ui.N_start, self.ui.N_end)
+        self.sim.stft = {}
+        key = self.spgr_keys.get(qget_cmb_box(self.ui.cmb_plt_time_spgr))
+        if key is not None and (key != 'x_q' or self.fx_sim):
+            win, N_ovlp = self._spgr_params()
+            self.sim.stft[key] = STFT(win, N_ovlp, self.ui.N_start, self.ui.N_end)
+
+    # ------------------------------------------------------------------------
+    def _estimator(self, cls, key, win, N_ovlp):
+        """
+        Return the spectral estimator (`Welch` or `STFT`) for signal `key` ('x',
+        'x_q' or 'y') that has been fed during the simulation. When it is
+        missing, incomplete or has been calculated with different settings,
+        calculate it frame by frame from the stored signal and cache it.
+        """
+        ests = self.sim.welch if cls is Welch else self.sim.stft
+        est = ests.get(key)
+        if est is None or est.N_next < self.ui.N_end or est.N_ovlp != N_ovlp\
+                or est.N_start != self.ui.N_start or not np.array_equal(est.win, win):
+            x = getattr(self, key)
+            est = cls(win, N_ovlp, self.ui.N_start, self.ui.N_end)
+            for N_first in range(self.ui.N_start, self.ui.N_end, self.sim.N_frame):
+                est.add(x[N_first:N_first + self.sim.N_frame], N_first=N_first)
+            ests[key] = est
+        return est
+
 ###############################################################################
 #        PLOTTING
 ###############################################################################
@@ -701,6 +832,9 @@ class Plot_Impz(QWidget):
         if type(arg) is not None:
             self.needs_redraw = [True] * 2
 
+        if self.worker is not None:  # response is being calculated
+            return
+
         if not hasattr(self, 'cmplx'):  # has response been calculated yet?
             logger.error("Response should have been calculated by now!")
             return
@@ -761,6 +895,50 @@ class Plot_Impz(QWidget):
 
         self.draw()
 
+# ----------------------------------------------------------------------------
+    def _welch_ui2params(self):
+        """
+        Update overlap and nfft parameters for Welch spectral estimation from UI
+        """
+        nfft_welch = safe_eval(self.ui.led_nfft_welch.text(),
+                               self.ui.nfft_welch, return_type='int', sign='pos')
+        if nfft_welch <= self.ui.ovlp_welch:
+            logger.warning("N_FFT must be larger than N_OVLP!")
+        else:
+            self.ui.nfft_welch = nfft_welch
+        self.ui.led_nfft_welch.setText(str(self.ui.nfft_welch))
+
+        ovlp_welch = safe_eval(self.ui.led_ovlp_welch.text(),
+                               self.ui.ovlp_welch, return_type='int', sign='poszero')
+        if ovlp_welch >= self.ui.nfft_welch:
+            logger.warning("N_OVLP must be less than N_FFT!")
+        else:
+            self.ui.ovlp_welch = ovlp_welch
+        self.ui.led_ovlp_welch.setText(str(self.ui.ovlp_welch))
+
+        self.draw()
+
+# ----------------------------------------------------------------------------
+    def _welch_ui(self):
+        """
+        Show / hide Welch parameters when Welch mode has been toggled. Welch
+        estimates have no phase, only the magnitude can be displayed then.
+        """
+        welch_en = self.ui.but_freq_welch.isChecked()
+
+        self.ui.lbl_nfft_welch.setVisible(welch_en)
+        self.ui.led_nfft_welch.setVisible(welch_en)
+        self.ui.lbl_ovlp_welch.setVisible(welch_en)
+        self.ui.led_ovlp_welch.setVisible(welch_en)
+
+        cmb = self.ui.cmb_freq_display
+        if welch_en:
+            qset_cmb_box(cmb, 'mag', data=True)
+        for data in ('mag_phi', 're_im'):
+            cmb.model().item(cmb.findData(data)).setEnabled(not welch_en)
+
+        self.draw()
+
 # ----------------------------------------------------------------------------
     def _spgr_cmb(self):
         """
@@ -822,7 +1000,7 @@ class Plot_Impz(QWidget):
 
     # ------------------------------------------------------------------------
     def draw_data(self, plt_style, ax, x, y, bottom=0, label='',
-                  plt_fmt={}, mkr_fmt={}, **args):
+                  plt_fmt={}, mkr_fmt={}, artists=None, **args):
         """
         Plot x, y data (numpy arrays with equal length) in a plot style defined
         by `plt_style`.
@@ -845,6 +1023,10 @@ class Plot_Impz(QWidget):
             Line styles (color, linewidth etc.) for plotting (default: None).
         mkr_fmt : dict
             Marker styles
+        artists : list or None
+            When a list is passed, the artists showing the data (`Line2D`,
+            `Stem_Plot` or `PathCollection`) are appended as `(ax, artist)` for
+            updating the data in place.
         args : dict
             additional keys and values. As they might not be
             compatible with every plot style, they have to be added individually
@@ -860,30 +1042,70 @@ class Plot_Impz(QWidget):
             plt_fmt = {}
         if plt_style == "line":
             handle, = ax.plot(x, y, label=label, **plt_fmt)
+            data_artists = [handle]
         elif plt_style == "stem":
-            handle = stems(x, y, ax=ax, bottom=bottom, label=label, mkr_fmt=mkr_fmt,
-                           **plt_fmt)
+            handle, stem_plot = stems(x, y, ax=ax, bottom=bottom, label=label,
+                                      mkr_fmt=mkr_fmt, **plt_fmt)
+            data_artists = [stem_plot]
         elif plt_style == "steps":
             handle, = ax.plot(x, y, drawstyle='steps-mid', label=label, **plt_fmt)
+            data_artists = [handle]
         elif plt_style == "dots":
             handle = scatter(x, y, ax=ax, label=label, mkr_fmt=mkr_fmt)
+            data_artists = [handle]
         else:
             handle = []
+            data_artists = []
 
         # plot markers (except for 'stem' and 'dots' where they have been plotted already)
         if mkr_fmt and plt_style not in {'stem', 'dots'}:
             handle_mkr = scatter(x, y, ax=ax, mkr_fmt=mkr_fmt)
+            data_artists.append(handle_mkr)
             # join handles to plot them on top of each other in the legend
             handle = (handle, handle_mkr)
+        if artists is not None:
+            artists += [(ax, a) for a in data_artists]
         return handle
 
-    # ================ Plotting routine time domain =========================
-    def _init_axes_time(self):
+    # --------------------------------------------------------------------------
+    def draw_data_dec(self, plt_style, ax, x, y, bottom=0, label='',
+                      plt_fmt={}, mkr_fmt={}, artists=None):
         """
-        Clear and initialize the axes of the time domain matplotlib widgets
+        Plot x, y data like `draw_data()`. When there are more samples than pixel
+        columns in `ax`, use a `Decimated_Plot` that plots the min / max envelope
+        of `y` until the plot is zoomed in far enough. Only the artists of
+        plots that are not decimated are appended to `artists`.
+
+        Returns
+        -------
+        handle :  A `lines.Line2D()` objects or tuple with two of them
+            This provides a handle to the properties of line and marker (optionally)
+            which are displayed by legend
         """
-        self.t = self.n * fb.fil[0]['T_S']
+        if plt_style == "none" or len(y) <= Decimated_Plot.N_PX * ax.bbox.width:
+            return self.draw_data(plt_style, ax, x, y, bottom=bottom, label=label,
+                                  plt_fmt=plt_fmt, mkr_fmt=mkr_fmt, artists=artists)
+
+        # keep a reference, axes callbacks only store weak references
+        self.dec_plots.append(Decimated_Plot(
+            ax, x, y, lambda x, y: self.draw_data(
+                plt_style, ax, x, y, bottom=bottom, label=label, plt_fmt=plt_fmt,
+                mkr_fmt=mkr_fmt),
+            fmt=plt_fmt))
+        # proxy artists for the legend
+        if plt_style == "dots":
+            return lines.Line2D([], [], linestyle='', **mkr_fmt)
+        elif mkr_fmt.get('marker'):
+            return (lines.Line2D([], [], **plt_fmt),
+                    lines.Line2D([], [], linestyle='', **mkr_fmt))
+        else:
+            return lines.Line2D([], [], **plt_fmt)
 
+    # ================ Plotting routine time domain =========================
+    def _time_plot_styles(self):
+        """
+        Read plot styles of the time domain from the UI
+        """
         self.plt_time_resp = qget_cmb_box(self.ui.cmb_plt_time_resp).replace("*", "")
         self.plt_time_stim = qget_cmb_box(self.ui.cmb_plt_time_stim).replace("*", "")
         self.plt_time_stmq = qget_cmb_box(self.ui.cmb_plt_time_stmq).replace("*", "")
@@ -894,7 +1116,15 @@ class Plot_Impz(QWidget):
             or self.plt_time_stim != "none"\
             or (self.plt_time_stmq != "none" and self.fx_sim)
 
+    # ------------------------------------------------------------------------
+    def _init_axes_time(self):
+        """
+        Clear and initialize the axes of the time domain matplotlib widgets
+        """
         self.mplwidget_t.fig.clf()  # clear figure with axes
+        self.dec_plots = []  # decimated plots of the time domain axes
+        # artists of the data in the time domain axes for in place updates
+        self.time_artists = {}
 
         num_subplots = max(int(self.plt_time_enabled) + self.cmplx + self.spgr, 1)
 
@@ -930,11 +1160,12 @@ class Plot_Impz(QWidget):
         if self.y is None:  # safety net for empty responses
             for ax in self.mplwidget_t.fig.get_axes():  # remove all axes
                 self.mplwidget_t.fig.delaxes(ax)
+            self.time_layout = None
             return
 
         H_str = self.stim_wdg.H_str
 
-        self._init_axes_time()
+        self._time_plot_styles()
         self._log_mode_time()
 
         # '$h... = some impulse response, don't change
@@ -973,7 +1204,7 @@ class Plot_Impz(QWidget):
         else:
             x_q = None
 
-        t = self.t[N_start:N_end]
+        t = np.arange(N_start, N_end) * fb.fil[0]['T_S']
         x = self.x[N_start:N_end] * self.scale_i
         y = self.y[N_start:N_end] * self.scale_o
         win = self.ui.qfft_win_select.get_window(self.ui.N)
@@ -1022,6 +1253,15 @@ class Plot_Impz(QWidget):
             else:
                 H_str = H_str + ' in V'
 
+        # only the data has changed: update the plots in place
+        layout = self._time_layout(N_start, N_end)
+        if layout == self.time_layout and not self.dec_plots and not self.spgr:
+            self._update_time_data(
+                t, {'x_r': x_r, 'x_q': x_q, 'x_i': x_i, 'y_r': y_r, 'y_i': y_i})
+            return
+
+        self._init_axes_time()
+
         if self.ui.but_fx_range.isChecked() and self.fx_sim:
             self.ax_r.axhline(fx_max, 0, 1, color='k', linestyle='--')
             self.ax_r.axhline(fx_min, 0, 1, color='k', linestyle='--')
@@ -1033,25 +1273,28 @@ class Plot_Impz(QWidget):
 
         # --------------- Stimulus plot --------------------------------------
         if self.plt_time_stim != "none":
-            h_r.append(self.draw_data(
+            h_r.append(self.draw_data_dec(
                 self.plt_time_stim, self.ax_r, t,
                 x_r, label=lbl_x_r, bottom=bottom_t,
-                plt_fmt=self.fmt_plot_stim, mkr_fmt=fmt_mkr_stim))
+                plt_fmt=self.fmt_plot_stim, mkr_fmt=fmt_mkr_stim,
+                artists=self.time_artists.setdefault('x_r', [])))
             l_r += [lbl_x_r]
 
         # -------------- Stimulus <q> plot ------------------------------------
         if x_q is not None and self.plt_time_stmq != "none":
-            h_r.append(self.draw_data(
+            h_r.append(self.draw_data_dec(
                 self.plt_time_stmq, self.ax_r, t,
                 x_q, label='$x_q[n]$', bottom=bottom_t,
-                plt_fmt=self.fmt_plot_stmq, mkr_fmt=fmt_mkr_stmq))
+                plt_fmt=self.fmt_plot_stmq, mkr_fmt=fmt_mkr_stmq,
+                artists=self.time_artists.setdefault('x_q', [])))
             l_r += ['$x_q[n]$']
         # --------------- Response plot ----------------------------------
         if self.plt_time_resp != "none":
-            h_r.append(self.draw_data(
+            h_r.append(self.draw_data_dec(
                 self.plt_time_resp, self.ax_r, t,
                 y_r, label=lbl_y_r, bottom=bottom_t,
-                plt_fmt=self.fmt_plot_resp, mkr_fmt=fmt_mkr_resp))
+                plt_fmt=self.fmt_plot_resp, mkr_fmt=fmt_mkr_resp,
+                artists=self.time_artists.setdefault('y_r', [])))
             l_r += [lbl_y_r]
         # --------------- Window plot ----------------------------------
         if self.ui.chk_win_time.isChecked():
@@ -1068,18 +1311,20 @@ class Plot_Impz(QWidget):
         if self.cmplx:
             if self.plt_time_stim != "none":
                 # --- imag. part of stimulus -----
-                h_i.append(self.draw_data(
+                h_i.append(self.draw_data_dec(
                     self.plt_time_stim, self.ax_i, t,
                     x_i, label=lbl_x_i, bottom=bottom_t,
-                    plt_fmt=self.fmt_plot_stim, mkr_fmt=fmt_mkr_stim))
+                    plt_fmt=self.fmt_plot_stim, mkr_fmt=fmt_mkr_stim,
+                    artists=self.time_artists.setdefault('x_i', [])))
                 l_i += [lbl_x_i]
 
             if self.plt_time_resp != "none":
                 # --- imag. part of response -----
-                h_i.append(self.draw_data(
+                h_i.append(self.draw_data_dec(
                     self.plt_time_resp, self.ax_i, t,
                     y_i, label=lbl_y_i, bottom=bottom_t,
-                    plt_fmt=self.fmt_plot_resp, mkr_fmt=fmt_mkr_resp))
+                    plt_fmt=self.fmt_plot_resp, mkr_fmt=fmt_mkr_resp,
+                    artists=self.time_artists.setdefault('y_i', [])))
                 l_i += [lbl_y_i]
 
             # --- labels and markers -----
@@ -1114,26 +1359,21 @@ class Plot_Impz(QWidget):
             self.ui.led_time_nfft_spgr.setText(str(self.ui.time_nfft_spgr))
             self.ui.led_time_ovlp_spgr.setText(str(self.ui.time_ovlp_spgr))
 
+            key = self.spgr_keys.get(self.plt_time_spgr)
             if self.plt_time_spgr == "xn":
-                s = x
                 sig_lbl = 'X'
-            elif self.plt_time_spgr == "xqn" and hasattr(self, "x_q"):
-                s = x_q
+                scale_spgr = self.scale_i
+            elif self.plt_time_spgr == "xqn" and getattr(self, "x_q", None) is not None:
                 sig_lbl = 'X_Q'
+                scale_spgr = self.scale_i
             elif self.plt_time_spgr == "yn":
-                s = y
                 sig_lbl = 'Y'
+                scale_spgr = self.scale_o
             else:
-                s = None
+                key = None
                 sig_lbl = 'None'
             spgr_args = r"$({0}, {1})$".format(fb.fil[0]['plt_tLabel'][1],
                                                fb.fil[0]['plt_fLabel'][1])
-            # ------ onesided / twosided ------------
-            if fb.fil[0]['freqSpecsRangeType'] == 'half':
-                sides = 'onesided'
-            else:
-                sides = 'twosided'
-
             # ------- Unit / Mode ----------------------
             mode = qget_cmb_box(self.ui.cmb_mode_spgr_time, data=True)
             self.ui.lbl_byfs_spgr_time.setVisible(mode == 'psd')
@@ -1178,58 +1418,26 @@ class Plot_Impz(QWidget):
                                .format(mode))
                 mode = "psd"
 
-            # ------- lin / log ----------------------
-            if self.ui.but_log_spgr_time.isChecked():
-                scale = 'dB'
-                # 10 log10 for 'psd', otherwise 20 log10
-                bottom_spgr = self.ui.bottom_t
-            else:
-                scale = 'linear'
-                bottom_spgr = 0
-
-            t_range = (self.t[self.ui.N_start], self.t[-1])
             # hidden images: https://scipython.com/blog/hidden-images-in-spectrograms/
 
 # =============================================================================
-            win = self.ui.qfft_win_select.get_window(self.ui.time_nfft_spgr)
-            if False:
-                Sxx, f, t, im = self.ax_s.specgram(
-                    s, Fs=fb.fil[0]['f_S'], NFFT=self.ui.time_nfft_spgr,
-                    noverlap=self.ui.time_ovlp_spgr, pad_to=None, xextent=t_range,
-                    sides=sides, scale_by_freq=self.ui.chk_byfs_spgr_time.isChecked(),
-                    mode=mode, scale=scale, vmin=bottom_spgr, cmap=None)
-                # Fs : sampling frequency for scaling
-                # window: callable or ndarray, default window_hanning
-                # NFFT : data points for each block
-                # pad_to: create zero-padding
-                # xextent: image extent along x-axis; None or (xmin, xmax)
-                # scale_by_freq: True scales power spectral density by f_S
-
-                cbar = self.mplwidget_t.fig.colorbar(im, ax=self.ax_s, aspect=30,
-                                                     pad=0.005)
-                cbar.ax.set_ylabel(spgr_pre + spgr_symb + spgr_args + spgr_unit)
-
-                self.ax_s.set_ylabel(fb.fil[0]['plt_fLabel'])
-            else:
-                f, t, Sxx = sig.spectrogram(
-                    s, fb.fil[0]['f_S'], window=win,  # ('tukey', 0.25),
-                    nperseg=self.ui.time_nfft_spgr, noverlap=self.ui.time_ovlp_spgr,
-                    nfft=None, return_onesided=fb.fil[0]['freqSpecsRangeType'] == 'half',
-                    scaling=scaling, mode=mode, detrend='constant')
-                # Fs : sampling frequency for scaling
-                # window: callable or ndarray, default window_hanning
-                # nperseg : data points for each segment
-                # noverlap : number of overlapping points between segments
-                # nfft: = nperseg by default, can be larger to create zero-padding
-                # return_onesided : For complex data, a two-sided spectrum is
-                #                   returned always
+            if key is not None:
+                # The STFT of the signal has been calculated during the simulation
+                # or is calculated once for the current settings, display-only
+                # changes (mode, scaling, log. scale) just re-render it.
+                win, N_ovlp = self._spgr_params()
+                f, t, Sxx = self._estimator(STFT, key, win, N_ovlp).spectrogram(
+                    fb.fil[0]['f_S'], mode=mode, scaling=scaling,
+                    onesided=fb.fil[0]['freqSpecsRangeType'] == 'half')
                 # scaling: 'density' scales power spectral density by f_S,
                 #          'spectrum' returns power spectrum in V**2
-                # mode: 'psd', 'complex','magnitude','angle', 'phase' (no unwrapping)
+                # mode: 'psd', 'complex','magnitude','angle', 'phase'
+                # For complex data, a two-sided spectrum is returned always
 
-    #            col_mesh = self.ax_s.pcolormesh(t, np.fft.fftshift(f),
-    #                           np.fft.fftshift(Sxx, axes=0), shading='gouraud')
-                # self.ax_s.colorbar(col_mesh)
+                if mode == 'psd':  # scaling of fixpoint signals
+                    Sxx = Sxx * scale_spgr**2
+                elif mode == 'magnitude':
+                    Sxx = Sxx * scale_spgr
 
                 if self.ui.but_log_spgr_time.isChecked():
                     Sxx = np.maximum(dB_scale * np.log10(np.abs(Sxx)), self.ui.bottom_t)
@@ -1245,12 +1453,14 @@ class Plot_Impz(QWidget):
         if self.ACTIVE_3D:  # not implemented / tested yet
             # plotting the stems
             for i in range(self.ui.N_start, self.ui.N_end):
-                self.ax3d.plot([self.t[i], self.t[i]], [y_r[i], y_r[i]], [0, y_i[i]],
+                t_i = i * fb.fil[0]['T_S']
+                self.ax3d.plot([t_i, t_i], [y_r[i], y_r[i]], [0, y_i[i]],
                                '-', linewidth=2, alpha=.5)
 
             # plotting a circle on the top of each stem
             self.ax3d.plot(
-                self.t[self.ui.N_start:], y_r[self.ui.N_start:], y_i[self.ui.N_start:],
+                np.arange(self.ui.N_start, self.ui.N_end) * fb.fil[0]['T_S'],
+                y_r[self.ui.N_start:], y_i[self.ui.N_start:],
                 'o', markersize=8, markerfacecolor='none', label='$y[n]$')
 
             self.ax3d.set_xlabel('x')
@@ -1260,8 +1470,59 @@ class Plot_Impz(QWidget):
         # --------------- Title and common labels ---------------------------
         self.axes_time[-1].set_xlabel(fb.fil[0]['plt_tLabel'])
         self.axes_time[0].set_title(self.title_str)
-        self.ax_r.set_xlim([self.t[self.ui.N_start], self.t[self.ui.N_end-1]])
+        self.ax_r.set_xlim([self.ui.N_start * fb.fil[0]['T_S'],
+                            (self.ui.N_end - 1) * fb.fil[0]['T_S']])
         # expand_lim(self.ax_r, 0.02)
+        self.time_layout = layout
+
+        self.redraw()  # redraw currently active mplwidget
+
+        self.needs_redraw[0] = False
+
+    # ------------------------------------------------------------------------
+    def _time_layout(self, N_start, N_end):
+        """
+        Return a tuple with all settings determining the time domain plot
+        except for the data itself
+        """
+        if self.ui.chk_win_time.isChecked():
+            win = self.ui.qfft_win_select.get_window(self.ui.N).tobytes()
+        else:
+            win = None
+        return (
+            qget_cmb_box(self.ui.cmb_plt_time_resp), qget_cmb_box(self.ui.cmb_plt_time_stim),
+            qget_cmb_box(self.ui.cmb_plt_time_stmq), self.plt_time_spgr,
+            self.cmplx, self.fx_sim, getattr(self, 'x_q', None) is None,
+            self.scale_i, self.scale_o, self.fx_min, self.fx_max,
+            self.ui.but_log_time.isChecked(), self.ui.bottom_t,
+            self.ui.but_fx_range.isChecked(), win, self.ui.win_dict['cur_win_name'],
+            N_start, N_end, fb.fil[0]['T_S'], fb.fil[0]['plt_tLabel'],
+            self.title_str, self.stim_wdg.H_str)
+
+    # ------------------------------------------------------------------------
+    def _update_time_data(self, t, data):
+        """
+        Update the data of the time domain plots in place without rebuilding
+        the axes and artists and rescale the y-axes. `data` is a dict with the
+        y-data for the keys of `self.time_artists`.
+        """
+        for key, artists in self.time_artists.items():
+            for _, a in artists:
+                if isinstance(a, (Stem_Plot, lines.Line2D)):
+                    a.set_data(t, data[key])
+                else:  # scatter plot
+                    a.set_offsets(np.column_stack((t, data[key])))
+
+        for ax in self.axes_time:
+            ax.relim()  # only considers lines, add data limits of collections
+        for key, artists in self.time_artists.items():
+            for ax, a in artists:
+                if not isinstance(a, lines.Line2D):
+                    ax.update_datalim(np.column_stack((t, data[key])))
+        for ax in self.axes_time:
+            ax.autoscale_view()
+        self.ax_r.set_xlim([self.ui.N_start * fb.fil[0]['T_S'],
+                            (self.ui.N_end - 1) * fb.fil[0]['T_S']])
 
         self.redraw()  # redraw currently active mplwidget
 
@@ -1330,8 +1591,8 @@ class Plot_Impz(QWidget):
         self._init_axes_freq()
         self._log_mode_freq()
 
-        nenbw = self.ui.win_dict['nenbw']
-        cgain = self.ui.win_dict['cgain']
+        nenbw = self.nenbw
+        cgain = self.cgain
 
         plt_response = self.plt_freq_resp != "none"
         plt_stimulus = self.plt_freq_stim != "none"
@@ -1374,16 +1635,16 @@ class Plot_Impz(QWidget):
                 # By default, k = params['N_FFT'] which is used for the calculation
                 # of the non-transient tabs and for F_id / H_id here.
                 # Here, the frequency axes must be scaled to fit the number of
-                # frequency points self.ui.N
-                F_range = [f * self.ui.N / fb.fil[0]['f_max'] for f in F_range]
-                f_max = self.ui.N
+                # frequency points self.N_fft
+                F_range = [f * self.N_fft / fb.fil[0]['f_max'] for f in F_range]
+                f_max = self.N_fft
             else:
                 f_max = fb.fil[0]['f_max']
 
             # freqz-based ideal frequency response:
             F_id, H_id = calc_Hcomplex(fb.fil[0], params['N_FFT'], True, fs=f_max)
             # frequency vector for FFT-based frequency plots:
-            F = np.fft.fftfreq(self.ui.N, d=1. / f_max)
+            F = np.fft.fftfreq(self.N_fft, d=1. / f_max)
         # -----------------------------------------------------------------
         # Scale frequency response and calculate power
         # -----------------------------------------------------------------
@@ -1396,7 +1657,7 @@ class Plot_Impz(QWidget):
                 and self.ui.but_freq_norm_impz.isEnabled()\
                     and self.ui.but_freq_norm_impz.isChecked():
                 freq_resp = True  # calculate frequency response from impulse response
-                scale_impz = self.ui.N * self.ui.win_dict['cgain']\
+                scale_impz = self.N_fft * cgain\
                     * self.stim_wdg.ui.scale_impz
                 if self.ui.win_dict['cur_win_name'].lower() not in\
                         {'boxcar', 'rectangular'}:
@@ -1410,23 +1671,24 @@ class Plot_Impz(QWidget):
             P_scale = scale_impz / nenbw
             if plt_stimulus:
                 # scale display of frequency response
-                Px = np.sum(np.square(np.abs(self.X))) * P_scale
+                Px = calc_fft_power(self.X, self.N_fft) * P_scale
                 if fb.fil[0]['freqSpecsRangeType'] == 'half' and not freq_resp:
-                    X = calc_ssb_spectrum(self.X) * self.scale_i * scale_impz
+                    X = calc_ssb_spectrum(self.X, self.N_fft) * self.scale_i * scale_impz
                 else:
                     X = self.X * self.scale_i * scale_impz
 
             if plt_stimulus_q:
-                Pxq = np.sum(np.square(np.abs(self.X_q))) * P_scale
+                Pxq = calc_fft_power(self.X_q, self.N_fft) * P_scale
                 if fb.fil[0]['freqSpecsRangeType'] == 'half' and not freq_resp:
-                    X_q = calc_ssb_spectrum(self.X_q) * self.scale_i * scale_impz
+                    X_q = calc_ssb_spectrum(self.X_q, self.N_fft) * self.scale_i\
+                        * scale_impz
                 else:
                     X_q = self.X_q * self.scale_i * scale_impz
 
             if plt_response:
-                Py = np.sum(np.square(np.abs(self.Y * self.scale_o))) * P_scale
+                Py = calc_fft_power(self.Y * self.scale_o, self.N_fft) * P_scale
                 if fb.fil[0]['freqSpecsRangeType'] == 'half' and not freq_resp:
-                    Y = calc_ssb_spectrum(self.Y) * self.scale_o * scale_impz
+                    Y = calc_ssb_spectrum(self.Y, self.N_fft) * self.scale_o * scale_impz
                 else:
                     Y = self.Y * self.scale_o * scale_impz
 
@@ -1447,21 +1709,21 @@ class Plot_Impz(QWidget):
                 F = np.fft.fftshift(F)
 
                 # shift H_id and F_id by f_S/2
-                F_id -= f_max/2
+                F_id = F_id - f_max/2
                 H_id = np.fft.fftshift(H_id)
                 if not freq_resp:
-                    H_id /= 2
+                    H_id = H_id / 2
 
             elif fb.fil[0]['freqSpecsRangeType'] == 'half':
                 # display 0 ... f_S/2 -> only use the first half of X, Y and F
                 if plt_response:
-                    Y = Y[0:self.ui.N//2]
+                    Y = Y[0:self.N_fft//2]
                 if plt_stimulus:
-                    X = X[0:self.ui.N//2]
+                    X = X[0:self.N_fft//2]
                 if plt_stimulus_q:
-                    X_q = X_q[0:self.ui.N//2]
+                    X_q = X_q[0:self.N_fft//2]
 
-                F = F[0:self.ui.N//2]
+                F = F[0:self.N_fft//2]
                 F_id = F_id[0:params['N_FFT']//2]
                 H_id = H_id[0:params['N_FFT']//2]
 
@@ -1469,7 +1731,7 @@ class Plot_Impz(QWidget):
                 # display 0 ... f_S -> shift frequency axis
                 F = np.fft.fftshift(F) + f_max/2.
                 if not freq_resp:
-                    H_id /= 2
+                    H_id = H_id / 2
 
             # -----------------------------------------------------------------
             # Calculate log FFT and power if selected, set units
@@ -1744,7 +2006,7 @@ class Plot_Impz(QWidget):
 
             if self.ui.but_log_freq.isChecked():
                 # scale second axis for noise power
-                corr = 10*np.log10(self.ui.N) - nenbw  # nenbw is in dB
+                corr = 10*np.log10(self.N_fft) - nenbw  # nenbw is in dB
                 mn, mx = self.ax_f1.get_ylim()
                 self.ax_f1_noise.set_ylim(mn+corr, mx+corr)
                 self.ax_f1_noise.set_ylabel(r'$P_N$ in dBW')
@@ -105,6 +105,8 @@ class PlotImpz_UI(QWidget):
         self.plt_freq_stmq = "none"
 
         self.bottom_f = -120  # initial value for log. scale
+        self.nfft_welch = 1024  # number of fft points per Welch segment
+        self.ovlp_welch = 512  # number of overlap points between Welch segments
         self.param = None
 
         self.f_scale = fb.fil[0]['f_S']
@@ -500,6 +502,35 @@ class PlotImpz_UI(QWidget):
         self.but_freq_norm_impz.setChecked(True)
         self.but_freq_norm_impz.setObjectName("freq_norm_impz")
 
+        self.but_freq_welch = QPushButton("Welch", self)
+        self.but_freq_welch.setMaximumWidth(qtext_width(" Welch "))
+        self.but_freq_welch.setObjectName("but_freq_welch")
+        self.but_freq_welch.setToolTip(
+            "<span>Average the spectra of overlapping, windowed segments (Welch "
+            "method). The spectra are accumulated frame by frame during the "
+            "simulation, only magnitudes are available.</span>")
+        self.but_freq_welch.setCheckable(True)
+        self.but_freq_welch.setChecked(False)
+        welch_en = self.but_freq_welch.isChecked()
+
+        self.lbl_nfft_welch = QLabel(to_html("&nbsp;N_FFT =", frmt='bi'), self)
+        self.lbl_nfft_welch.setVisible(welch_en)
+        self.led_nfft_welch = QLineEdit(self)
+        self.led_nfft_welch.setText(str(self.nfft_welch))
+        self.led_nfft_welch.setMaximumWidth(qtext_width(N_x=8))
+        self.led_nfft_welch.setToolTip("<span>Number of FFT points per "
+                                       "Welch segment.</span>")
+        self.led_nfft_welch.setVisible(welch_en)
+
+        self.lbl_ovlp_welch = QLabel(to_html("&nbsp;N_OVLP =", frmt='bi'), self)
+        self.lbl_ovlp_welch.setVisible(welch_en)
+        self.led_ovlp_welch = QLineEdit(self)
+        self.led_ovlp_welch.setText(str(self.ovlp_welch))
+        self.led_ovlp_welch.setMaximumWidth(qtext_width(N_x=8))
+        self.led_ovlp_welch.setToolTip("<span>Number of overlap data points "
+                                       "between Welch segments.</span>")
+        self.led_ovlp_welch.setVisible(welch_en)
+
         self.but_freq_show_info = QPushButton("Info", self)
         self.but_freq_show_info.setMaximumWidth(qtext_width(" Info "))
         self.but_freq_show_info.setObjectName("but_show_info_freq")
@@ -527,6 +558,12 @@ class PlotImpz_UI(QWidget):
         layH_ctrl_freq.addStretch(1)
         layH_ctrl_freq.addWidget(self.cmb_freq_display)
         layH_ctrl_freq.addStretch(1)
+        layH_ctrl_freq.addWidget(self.but_freq_welch)
+        layH_ctrl_freq.addWidget(self.lbl_nfft_welch)
+        layH_ctrl_freq.addWidget(self.led_nfft_welch)
+        layH_ctrl_freq.addWidget(self.lbl_ovlp_welch)
+        layH_ctrl_freq.addWidget(self.led_ovlp_welch)
+        layH_ctrl_freq.addStretch(1)
 
         layH_ctrl_freq.addWidget(self.but_freq_norm_impz)
         layH_ctrl_freq.addStretch(1)
@@ -17,7 +17,7 @@ import pyfda.filterbroker as fb
 from pyfda.pyfda_rc import params
 from pyfda.plot_widgets.mpl_widget import MplWidget
 from matplotlib.ticker import AutoMinorLocator
-from pyfda.libs.pyfda_lib import calc_Hcomplex, pprint_log
+from pyfda.libs.pyfda_lib import calc_Hcomplex, select_freq_range, pprint_log
 from pyfda.libs.pyfda_qt_lib import qget_cmb_box, PushButton
 
 import logging
@@ -160,7 +160,8 @@ class Plot_Phi(QWidget):
         (Re-)Calculate the complex frequency response H(f)
         """
         # calculate H_cplx(W) (complex) for W = 0 ... 2 pi:
-        self.W, self.H_cmplx = calc_Hcomplex(fb.fil[0], params['N_FFT'], wholeF=True)
+        self.W, self.H_cmplx = calc_Hcomplex(fb.fil[0], params['N_FFT'], wholeF=True,
+                                             tol=params['H_tol'])
         # replace nan and inf by finite values, otherwise np.unwrap yields
         # an array full of nans
         self.H_cmplx = np.nan_to_num(self.H_cmplx)
@@ -182,23 +183,10 @@ class Plot_Phi(QWidget):
 
         self.unitPhi = qget_cmb_box(self.cmbUnitsPhi, data=False)
 
-        f_max_2 = fb.fil[0]['f_max'] / 2.
-
         # ========= select frequency range to be displayed =====================
         # === shift, scale and select: W -> F, H_cplx -> H_c
-        F = self.W * f_max_2 / np.pi
-
-        if fb.fil[0]['freqSpecsRangeType'] == 'sym':
-            # shift H and F by f_S/2
-            H = np.fft.fftshift(self.H_cmplx)
-            F -= f_max_2
-        elif fb.fil[0]['freqSpecsRangeType'] == 'half':
-            # only use the first half of H and F
-            H = self.H_cmplx[0:params['N_FFT']//2]
-            F = F[0:params['N_FFT']//2]
-        else:  # fb.fil[0]['freqSpecsRangeType'] == 'whole'
-            # use H and F as calculated
-            H = self.H_cmplx
+        F, H = select_freq_range(self.W, self.H_cmplx, fb.fil[0]['freqSpecsRangeType'],
+                                 fb.fil[0]['f_max'])
 
         y_str = r'$\angle H(\mathrm{e}^{\mathrm{j} \Omega})$ in '
         if self.unitPhi == 'rad':
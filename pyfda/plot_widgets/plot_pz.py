@@ -12,11 +12,11 @@ Widget for plotting poles and zeros
 from pyfda.libs.compat import (
     QWidget, QLabel, QFrame, QDial, QHBoxLayout, pyqtSignal, QComboBox, QLineEdit)
 import numpy as np
-import scipy.signal as sig
 
 import pyfda.filterbroker as fb
 from pyfda.pyfda_rc import params
-from pyfda.libs.pyfda_lib import unique_roots, H_mag, to_html, safe_eval
+from pyfda.libs.pyfda_lib import (
+    unique_roots, poly_roots, H_mag, to_html, safe_eval, calc_Hcomplex)
 from pyfda.libs.pyfda_qt_lib import (
     PushButton, qcmb_box_populate, qget_cmb_box, qtext_width)
 
@@ -42,6 +42,7 @@ class Plot_PZ(QWidget):
                                  # with new limits etc. (not implemented yet)
         self.tool_tip = "Pole / zero plan"
         self.tab_label = "P / Z"
+        self.px_grid = 3  # grid resolution for contour plots in pixels
 
         self.cmb_overlay_items = [
             "<span>Add various overlays to P/Z diagram.</span>",
@@ -414,7 +415,7 @@ class Plot_PZ(QWidget):
 
             # Calculate the poles, zeros and scaling factor
             p = np.roots(a)
-            z = np.roots(b)
+            z = poly_roots(b)
             k = kn/kd
         elif not (len(p) or len(z)):  # P/Z were specified
             logger.error('Either b,a or z,p must be specified!')
@@ -510,9 +511,14 @@ class Plot_PZ(QWidget):
         # logger.warning(xl)
         # logger.warning(yl)
 
+        # grid resolution is tied to the size of the axes: one point every
+        # `px_grid` pixels, limited to a sensible number of points
+        bbox = self.ax.get_window_extent()
+        N_x = int(np.clip(bbox.width / self.px_grid, 20, 500))
+        N_y = int(np.clip(bbox.height / self.px_grid, 20, 500))
         [x, y] = np.meshgrid(
-            np.arange(xl[0], xl[1], 0.01),
-            np.arange(yl[0], yl[1], 0.01))
+            np.linspace(xl[0], xl[1], N_x),
+            np.linspace(yl[0], yl[1], N_y))
         z = x + 1j*y  # create coordinate grid for complex plane
 
         if self.but_log.isChecked():
@@ -521,6 +527,7 @@ class Plot_PZ(QWidget):
         else:
             H_max = self.zmax
             H_min = self.zmin
+        # |H(z)| is cached until coefficients or limits are changed
         Hmag = H_mag(fb.fil[0]['ba'][0], fb.fil[0]['ba'][1], z, H_max, H_min=H_min,
                      log=self.but_log.isChecked())
 
@@ -537,7 +544,7 @@ class Plot_PZ(QWidget):
         # Contour plots and color bar somehow mess up the coordinates:
         # restore to previous settings
         self.ax.set_xlim(xl)
-        self.ax.set_xlim(yl)
+        self.ax.set_ylim(yl)
 
     # --------------------------------------------------------------------------
     def draw_Hf(self, r=2, Hf_visible=True):
@@ -552,8 +559,7 @@ class Plot_PZ(QWidget):
         # suppress "divide by zero in log10" warnings
         old_settings_seterr = np.seterr()
         np.seterr(divide='ignore')
-        ba = fb.fil[0]['ba']
-        w, H = sig.freqz(ba[0], ba[1], worN=params['N_FFT'], whole=True)
+        w, H = calc_Hcomplex(fb.fil[0], params['N_FFT'], True)
         H = np.abs(H)
         if self.but_log.isChecked():
             H = np.clip(np.log10(H), -6, None)  # clip to -120 dB
@@ -144,7 +144,8 @@ class Plot_tau_g(QWidget):
         # scipy: self.W, self.tau_g = group_delay((bb, aa), w=params['N_FFT'],
         #                                           whole = True)
 
-        if fb.fil[0]['creator'][0] == 'sos':  # one of 'sos', 'zpk', 'ba'
+        # prefer second-order sections when the design routine has produced them
+        if len(fb.fil[0].get('sos', [])) > 0:
             self.W, self.tau_g = group_delay(fb.fil[0]['sos'], nfft=params['N_FFT'],
                                              sos=True, whole=True,
                                              verbose=self.chkWarnings.isChecked(),
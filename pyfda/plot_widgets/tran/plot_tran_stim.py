@@ -11,15 +11,10 @@ Widget for plotting impulse and general transient responses
 """
 from pyfda.libs.compat import QWidget, pyqtSignal, QVBoxLayout
 import numpy as np
-from numpy import ndarray, pi
-import scipy.signal as sig
-from scipy.special import sinc, diric
 
 import pyfda.filterbroker as fb
-from pyfda.libs.pyfda_sig_lib import angle_zero
-from pyfda.libs.pyfda_lib import (
-    safe_eval, pprint_log, np_type, calc_ssb_spectrum,
-    rect_bl, sawtooth_bl, triang_bl, comb_bl, safe_numexpr_eval)
+from pyfda.libs.pyfda_lib import pprint_log
+from pyfda.libs.pyfda_tran_lib import Stimulus
 
 from pyfda.pyfda_rc import params  # FMT string for QLineEdit fields, e.g. '{:.3g}'
 from pyfda.plot_widgets.tran.plot_tran_stim_ui import Plot_Tran_Stim_UI
@@ -44,6 +39,7 @@ class Plot_Tran_Stim(QWidget):
         self.needs_calc = True   # flag whether plots need to be recalculated
         self.needs_redraw = [True] * 2  # flag which plot needs to be redrawn
         self.error = False
+        self.stim = Stimulus()  # stimulus calculation without widgets
 
         self._construct_UI()
 
@@ -73,12 +69,47 @@ class Plot_Tran_Stim(QWidget):
 
         self.setLayout(layVMain)
 
+# ------------------------------------------------------------------------------
+    @property
+    def title_str(self) -> str:
+        """ Plot title of the last calculated stimulus """
+        return self.stim.title_str
+
+    @property
+    def H_str(self) -> str:
+        """ y-axis label of the last calculated stimulus """
+        return self.stim.H_str
+
+    @property
+    def T1_idx(self) -> int:
+        """ Sample index of T1 for the last calculated stimulus """
+        return self.stim.T1_idx
+
+# ------------------------------------------------------------------------------
+    def stim_params(self) -> dict:
+        """
+        Return a dict with the stimulus parameters from the UI for
+        `pyfda_tran_lib.Stimulus`
+        """
+        ui = self.ui
+        return {'stim': ui.stim, 'chirp_type': ui.chirp_type, 'noise': ui.noise,
+                'noi': ui.noi, 'DC': ui.DC, 'A1': ui.A1, 'A2': ui.A2,
+                'f1': ui.f1, 'f2': ui.f2, 'phi1': ui.phi1, 'phi2': ui.phi2,
+                'T1': ui.T1, 'T2': ui.T2, 'TW1': ui.TW1, 'TW2': ui.TW2,
+                'BW1': ui.BW1, 'BW2': ui.BW2, 'stim_par1': ui.stim_par1,
+                'stim_formula': ui.stim_formula,
+                'bl': ui.but_stim_bl.isChecked(),
+                'step_err': ui.chk_step_err.isChecked(),
+                'seed': ui.seed,
+                'f_S': fb.fil[0]['f_S']}
+
 # ------------------------------------------------------------------------------
     def calc_stimulus_frame(self, N_first: int = 0, N_frame: int = 10, N_end: int = 10,
                             init: bool = False) -> np.ndarray:
         """
         Calculate a data frame of stimulus `x` with a length of `N_frame` samples,
-        starting with index `N_first`
+        starting with index `N_first`, using the stimulus parameters from the UI.
+        The calculation is performed by `pyfda_tran_lib.Stimulus`.
 
         Parameters
         ----------
@@ -97,263 +128,10 @@ class Plot_Tran_Stim(QWidget):
             an array with `N` stimulus data points
         """
         if init or N_first == 0:
-            '''intialize title string, y-axis label and some variables'''
-            # use radians for angle internally
-            self.rad_phi1 = self.ui.phi1 / 180 * pi
-            self.rad_phi2 = self.ui.phi2 / 180 * pi
-            # check whether some amplitude is complex and set array type for xf
-            # correspondingly. 
-            if (self.ui.ledDC.isVisible and type(self.ui.DC) == complex) or\
-                (self.ui.ledAmp1.isVisible and type(self.ui.A1) == complex) or\
-                    (self.ui.ledAmp2.isVisible and type(self.ui.A2) == complex):
-                self.xf = np.zeros(N_frame, dtype=complex)
-            else:
-                self.xf = np.zeros(N_frame, dtype=float)
-
-            self.H_str = r'$y[n]$'  # default
-            self.title_str = ""
-            if self.ui.stim == "none":
-                self.title_str = r'Zero Input Response'
-                self.H_str = r'$h_0[n]$'
-            # ------------------------------------------------------------------
-            elif self.ui.stim == "dirac":
-                self.title_str = r'Impulse Response'
-                self.H_str = r'$h[n]$'
-            elif self.ui.stim == "sinc":
-                self.title_str = r'Sinc Impulse'
-            elif self.ui.stim == "gauss":
-                self.title_str = r'Gaussian Impulse'
-            elif self.ui.stim == "rect":
-                self.title_str = r'Rect Impulse'
-            # ------------------------------------------------------------------
-            elif self.ui.stim == "step":
-                if self.ui.chk_step_err.isChecked():
-                    self.title_str = r'Settling Error $\epsilon$'
-                    self.H_str = r'$h_{\epsilon, \infty} - h_{\epsilon}[n]$'
-                else:
-                    self.title_str = r'Step Response'
-                    self.H_str = r'$h_{\epsilon}[n]$'
-            # ------------------------------------------------------------------
-            elif self.ui.stim == "cos":
-                self.title_str = r'Cosine Stimulus'
-            elif self.ui.stim == "sine":
-                self.title_str = r'Sinusoidal Stimulus'
-            elif self.ui.stim == "exp":
-                self.title_str = r'Complex Exponential Stimulus'
-            elif self.ui.stim == "diric":
-                self.title_str = r'Periodic Sinc Stimulus'
-            # ------------------------------------------------------------------
-            elif self.ui.stim == "chirp":
-                self.title_str = self.ui.chirp_type.capitalize() + ' Chirp Stimulus'
-            # ------------------------------------------------------------------
-            elif self.ui.stim == "triang":
-                if self.ui.but_stim_bl.isChecked():
-                    self.title_str = r'Bandlim. Triangular Stimulus'
-                else:
-                    self.title_str = r'Triangular Stimulus'
-            elif self.ui.stim == "saw":
-                if self.ui.but_stim_bl.isChecked():
-                    self.title_str = r'Bandlim. Sawtooth Stimulus'
-                else:
-                    self.title_str = r'Sawtooth Stimulus'
-            elif self.ui.stim == "square":
-                if self.ui.but_stim_bl.isChecked():
-                    self.title_str = r'Bandlimited Rect. Stimulus'
-                else:
-                    self.title_str = r'Rect. Stimulus'
-            elif self.ui.stim == "comb":
-                self.title_str = r'Bandlim. Comb Stimulus'
-            # ------------------------------------------------------------------
-            elif self.ui.stim == "am":
-                self.title_str = (
-                    r'AM Stimulus: $A_1 \sin(2 \pi n f_1 + \varphi_1)'
-                    r'\cdot A_2 \sin(2 \pi n f_2 + \varphi_2)$')
-            elif self.ui.stim == "pmfm":
-                self.title_str = (
-                    r'PM / FM Stimulus: $A_1 \sin(2 \pi n f_1'
-                    r'+ \varphi_1 + A_2 \sin(2 \pi n f_2 + \varphi_2))$')
-            elif self.ui.stim == "pwm":
-                self.title_str = (
-                    r'PWM Stimulus with Duty Cycle $\frac {1} {2}(1 + A_2\sin(2 \pi n f_2'
-                    r'+ \varphi_2 ))$')
-
-            # ------------------------------------------------------------------
-            elif self.ui.stim == "formula":
-                self.title_str = r'Formula Defined Stimulus'
-            # ==================================================================
-            if self.ui.noise == "gauss":
-                self.title_str += r' + Gaussian Noise'
-            elif self.ui.noise == "uniform":
-                self.title_str += r' + Uniform Noise'
-            elif self.ui.noise == "prbs":
-                self.title_str += r' + PRBS Noise'
-            elif self.ui.noise == "mls":
-                self.title_str += r' + max. length sequence'
-            elif self.ui.noise == "brownian":
-                self.title_str += r' + Brownian Noise'
-            # ==================================================================
-            if self.ui.ledDC.isVisible and self.ui.DC != 0:
-                self.title_str += r' + DC'
-        # ----------------------------------------------------------------------
-
-        N_last = N_first + N_frame
-        n = np.arange(N_first, N_last)
-
-        # T_S = fb.fil[0]['T_S']
-        self.T1_idx = int(np.round(self.ui.T1))
-
-        # calculate stimuli x[n] ==============================================
-        if self.ui.stim == "none":
-            self.xf.fill(0)
-        # ----------------------------------------------------------------------
-        elif self.ui.stim == "dirac":
-            self.xf.fill(0)  # = np.zeros(N_frame, dtype=A_type)
-            if N_first <= self.T1_idx < N_last:
-                self.xf[self.T1_idx - N_first] = self.ui.A1
-        # ----------------------------------------------------------------------
-        elif self.ui.stim == "sinc":
-            self.xf = self.ui.A1 * sinc(2 * (n - self.ui.T1) * self.ui.f1)\
-                + self.ui.A2 * sinc(2 * (n - self.ui.T2) * self.ui.f2)
-        # ----------------------------------------------------------------------
-        elif self.ui.stim == "gauss":
-            self.xf = self.ui.A1 * sig.gausspulse(
-                    (n - self.ui.T1), fc=self.ui.f1, bw=self.ui.BW1) +\
-                self.ui.A2 * sig.gausspulse(
-                    (n - self.ui.T2), fc=self.ui.f2, bw=self.ui.BW2)
-        # ----------------------------------------------------------------------
-        elif self.ui.stim == "rect":
-            n_rise = int(self.T1_idx - np.floor(self.ui.TW1/2))
-            n_min = max(n_rise, 0)
-            n_max = min(n_rise + self.ui.TW1, N_end)
-            self.xf = self.ui.A1 * np.where((n >= n_min) & (n < n_max), 1, 0)
-        # ----------------------------------------------------------------------
-        elif self.ui.stim == "step":
-            if self.T1_idx < N_first:   # step before current frame
-                self.xf.fill(self.ui.A1)
-            if N_first <= self.T1_idx < N_last:  # step in current frame
-                self.xf[0:self.T1_idx - N_first].fill(0)
-                self.xf[self.T1_idx - N_first:].fill(self.ui.A1)
-            elif self.T1_idx >= N_last:  # step after current frame
-                self.xf.fill(0)
-        # ----------------------------------------------------------------------
-        elif self.ui.stim == "cos":
-            self.xf =\
-                self.ui.A1 * np.cos(2*pi * n * self.ui.f1 + self.rad_phi1) +\
-                self.ui.A2 * np.cos(2*pi * n * self.ui.f2 + self.rad_phi2)
-        # ----------------------------------------------------------------------
-        elif self.ui.stim == "sine":
-            self.xf =\
-                self.ui.A1 * np.sin(2*pi * n * self.ui.f1 + self.rad_phi1) +\
-                self.ui.A2 * np.sin(2*pi * n * self.ui.f2 + self.rad_phi2)
-        # ----------------------------------------------------------------------
-        elif self.ui.stim == "exp":
-            self.xf =\
-                self.ui.A1 * np.exp(1j * (2 * pi * n * self.ui.f1 + self.rad_phi1)) +\
-                self.ui.A2 * np.exp(1j * (2 * pi * n * self.ui.f2 + self.rad_phi2))
-        # ----------------------------------------------------------------------
-        elif self.ui.stim == "diric":
-            self.xf = self.ui.A1 * diric(
-                (4 * pi * (n-self.ui.T1) * self.ui.f1 + self.rad_phi1*2)
-                / self.ui.TW1, self.ui.TW1)
-        # ----------------------------------------------------------------------
-        elif self.ui.stim == "chirp":
-            if self.ui.T2 == 0:  # sig.chirp is buggy, T_sim cannot be larger than T_end
-                T_end = N_end  # frequency sweep over complete interval
-            else:
-                T_end = self.ui.T2  # frequency sweep till T2
-            self.xf = self.ui.A1 * sig.chirp(
-                n, self.ui.f1, T_end, self.ui.f2,
-                method=self.ui.chirp_type, phi=self.rad_phi1)
-        # ----------------------------------------------------------------------
-        elif self.ui.stim == "triang":
-            if self.ui.but_stim_bl.isChecked():
-                self.xf = self.ui.A1 * triang_bl(2*pi * n * self.ui.f1 + self.rad_phi1)
-            else:
-                self.xf = self.ui.A1 * sig.sawtooth(
-                    2*pi * n * self.ui.f1 + self.rad_phi1, width=0.5)
-        # ----------------------------------------------------------------------
-        elif self.ui.stim == "saw":
-            if self.ui.but_stim_bl.isChecked():
-                self.xf = self.ui.A1 * sawtooth_bl(2*pi * n * self.ui.f1 + self.rad_phi1)
-            else:
-                self.xf = self.ui.A1 * sig.sawtooth(2*pi * n * self.ui.f1 + self.rad_phi1)
-        # ----------------------------------------------------------------------
-        elif self.ui.stim == "square":
-            if self.ui.but_stim_bl.isChecked():
-                self.xf = self.ui.A1 * rect_bl(
-                    2 * pi * n * self.ui.f1 + self.rad_phi1, duty=self.ui.stim_par1)
-            else:
-                self.xf = self.ui.A1 * sig.square(
-                    2 * pi * n * self.ui.f1 + self.rad_phi1, duty=self.ui.stim_par1)
-        # ----------------------------------------------------------------------
-        elif self.ui.stim == "comb":
-            self.xf = self.ui.A1 * comb_bl(2 * pi * n * self.ui.f1 + self.rad_phi1)
-        # ----------------------------------------------------------------------
-        elif self.ui.stim == "am":
-            self.xf = self.ui.A1 * np.sin(2*pi * n * self.ui.f1 + self.rad_phi1)\
-                * self.ui.A2 * np.sin(2*pi * n * self.ui.f2 + self.rad_phi2)
-        # ----------------------------------------------------------------------
-        elif self.ui.stim == "pmfm":
-            self.xf = self.ui.A1 * np.sin(
-                2 * pi * n * self.ui.f1 + self.rad_phi1 +
-                self.ui.A2 * np.sin(2*pi * n * self.ui.f2 + self.rad_phi2))
-        # ----------------------------------------------------------------------
-        elif self.ui.stim == "pwm":
-            if self.ui.but_stim_bl.isChecked():
-                self.xf = self.ui.A1 * rect_bl(
-                    2 * np.pi * n * self.ui.f1 + self.rad_phi1,
-                    duty=(1/2 + self.ui.A2 / 2 *
-                          np.sin(2*pi * n * self.ui.f2 + self.rad_phi2)))
-            else:
-                self.xf = self.ui.A1 * sig.square(
-                    2 * np.pi * n * self.ui.f1 + self.rad_phi1,
-                    duty=(1/2 + self.ui.A2 / 2 *
-                          np.sin(2*pi * n * self.ui.f2 + self.rad_phi2)))
-        # ----------------------------------------------------------------------
-        elif self.ui.stim == "formula":
-            param_dict = {"A1": self.ui.A1, "A2": self.ui.A2,
-                          "f1": self.ui.f1, "f2": self.ui.f2,
-                          "phi1": self.ui.phi1, "phi2": self.ui.phi2,
-                          "BW1": self.ui.BW1, "BW2": self.ui.BW2,
-                          "f_S": fb.fil[0]['f_S'], "n": n, "j": 1j}
-
-            self.xf = safe_numexpr_eval(self.ui.stim_formula, (N_frame,), param_dict)
-        else:
-            logger.error('Unknown stimulus format "{0}"'.format(self.ui.stim))
-            return None
-        # ----------------------------------------------------------------------
-        # Add noise to stimulus
-        noi = 0
-        if self.ui.noise == "none":
-            pass
-        elif self.ui.noise == "gauss":
-            noi = self.ui.noi * np.random.randn(N_frame)
-        elif self.ui.noise == "uniform":
-            noi = self.ui.noi * (np.random.rand(N_frame)-0.5)
-        elif self.ui.noise == "prbs":
-            noi = self.ui.noi * 2 * (np.random.randint(0, 2, N_frame)-0.5)
-        elif self.ui.noise == "mls":
-            # max_len_seq returns `sequence, state`. The state is not stored here,
-            # hence, an identical sequence is created every time.
-            noi = self.ui.noi * 2 * (sig.max_len_seq(int(np.ceil(np.log2(N_frame))),
-                                     length=N_frame, state=None)[0] - 0.5)
-        elif self.ui.noise == "brownian":
-            # brownian noise
-            noi = np.cumsum(self.ui.noi * np.random.randn(N_frame))
-        else:
-            logger.error('Unknown kind of noise "{}"'.format(self.ui.noise))
-        if type(self.ui.noi) == complex:
-            self.xf = self.xf.astype(complex) + noi
-        else:
-            self.xf += noi
-        # Add DC to stimulus when visible / enabled
-        if self.ui.ledDC.isVisible:
-            if type(self.ui.DC) == complex:
-                self.xf = self.xf.astype(complex) + self.ui.DC
-            else:
-                self.xf += self.ui.DC
-
-        return self.xf[:N_frame]
+            self.stim.set_params(self.stim_params())
+        x = self.stim.calc_frame(N_first=N_first, N_frame=N_frame, N_end=N_end,
+                                 init=init)
+        return x
 # ------------------------------------------------------------------------------
 
 
@@ -93,6 +93,7 @@ class Plot_Tran_Stim_UI(QWidget):
         self.BW1 = self.BW2 = 0.5
         self.noi = 0.1
         self.noise = 'none'
+        self.seed = None  # seed for noise generator, None: random
         self.DC = 0.0
         self.stim_formula = "A1 * abs(sin(2 * pi * f1 * n))"
         self.stim_par1 = 0.5
@@ -204,9 +205,8 @@ class Plot_Tran_Stim_UI(QWidget):
             ("prbs", "PRBS",
              "<span>Pseudo-Random Binary Sequence with values &plusmn; A.</span>"),
             ("mls", "MLS",
-             "<span>Maximum Length Sequence with values &plusmn; A. The sequence is "
-             "always the same as the state is not stored for the next sequence start."
-             "</span>"),
+             "<span>Maximum Length Sequence with values &plusmn; A. The period of "
+             "the sequence is chosen to cover the whole simulation.</span>"),
             ("brownian", "Brownian",
              "<span>Brownian (cumulated sum) process based on Gaussian noise with"
              " std. deviation &sigma;.</span>")
@@ -388,6 +388,14 @@ class Plot_Tran_Stim_UI(QWidget):
         self.ledNoi.setToolTip("not initialized")
         self.ledNoi.setObjectName("stimNoi")
 
+        self.lblSeed = QLabel(to_html("&nbsp;Seed =", frmt='bi'), self)
+        self.ledSeed = QLineEdit(self)
+        self.ledSeed.setToolTip(
+            "<span>Seed for the noise generator, the noise sequence is reproduced "
+            "for identical seeds. Leave empty for a new random sequence in each "
+            "run.</span>")
+        self.ledSeed.setObjectName("stimSeed")
+
         layGStim = QGridLayout()
 
         layGStim.addLayout(layHCmbStim, 0, 1)
@@ -447,6 +455,9 @@ class Plot_Tran_Stim_UI(QWidget):
         layGStim.addWidget(self.cmbNoise, 0, 19)
         layGStim.addWidget(self.ledNoi, 1, 19)
 
+        layGStim.addWidget(self.lblSeed, 1, 20)
+        layGStim.addWidget(self.ledSeed, 1, 21)
+
         # ----------------------------------------------
         self.lblStimFormula = QLabel(to_html("x =", frmt='bi'), self)
         self.ledStimFormula = QLineEdit(self)
@@ -502,6 +513,7 @@ class Plot_Tran_Stim_UI(QWidget):
 
         self.cmbNoise.currentIndexChanged.connect(self._update_noi)
         self.ledNoi.editingFinished.connect(self._update_noi)
+        self.ledSeed.editingFinished.connect(self._update_noi)
         self.ledAmp1.editingFinished.connect(self._update_amp1)
         self.ledAmp2.editingFinished.connect(self._update_amp2)
         self.ledPhi1.editingFinished.connect(self._update_phi1)
@@ -884,9 +896,17 @@ class Plot_Tran_Stim_UI(QWidget):
         self.noise = qget_cmb_box(self.cmbNoise)
         self.lblNoi.setVisible(self.noise != 'none')
         self.ledNoi.setVisible(self.noise != 'none')
+        self.lblSeed.setVisible(self.noise not in {'none', 'mls'})
+        self.ledSeed.setVisible(self.noise not in {'none', 'mls'})
         if self.noise != 'none':
             self.noi = safe_eval(self.ledNoi.text(), 0, return_type='cmplx')
             self.ledNoi.setText(str(self.noi))
+            if self.ledSeed.text().strip() == "":
+                self.seed = None
+            else:
+                self.seed = safe_eval(self.ledSeed.text(), 0, return_type='int',
+                                      sign='poszero')
+                self.ledSeed.setText(str(self.seed))
             if self.noise == 'gauss':
                 self.lblNoi.setText(to_html("&nbsp;&sigma; =", frmt='bi'))
                 self.ledNoi.setToolTip(
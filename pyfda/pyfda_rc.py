@@ -43,6 +43,7 @@ THEME = 'light'     # select 'dark' or 'light' theme or 'none' or use one of the
 mpl_ms = 8  # base size for matplotlib markers
 # Various parameters for calculation and plotting
 params = {'N_FFT':  2048,   # number of FFT points for plot commands (freqz etc.)
+          'H_tol': 0.01,   # tolerance in dB for adaptive refinement of freq. grid (0: off)
           'FMT': '{:.3g}',  # format string for QLineEdit fields
           'CSV':  {  # format options and parameters for CSV-files and clipboard
                   'delimiter': ',',  # default delimiter
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of the pyFDA project hosted at https://github.com/chipmuenk/pyfda
+#
+# Copyright © pyFDA Project Contributors
+# Licensed under the terms of the MIT License
+# (see file LICENSE in root directory for details)
+
+"""
+Test suite for the block processing engine of FIR_DF_pyfixp. Running this module
+directly also benchmarks the block engine against the sample-by-sample loop:
+
+    python -m pyfda.tests.test_fir_df_pyfixp
+"""
+import time
+import unittest
+from unittest import mock
+import numpy as np
+
+import pyfda.libs.pyfda_fix_lib as fix_lib
+from pyfda.fixpoint_widgets.fir_df.fir_df_pyfixp import FIR_DF_pyfixp
+
+
+def fxfilter_loop(dut, x):
+    """
+    Filter `x` with the sample-by-sample reference implementation of `dut`,
+    mimicking `dut.fxfilter(x)`
+    """
+    dut.zi = np.concatenate((dut.zi, x))
+    y_q = dut._fxfilter_loop(len(x))
+    dut.zi = dut.zi[-(dut.L - 1):]
+    dut.N_over_filt = dut.Q_acc.N_over + dut.Q_mul.N_over
+    return dut.Q_O.fixp(y_q), dut.zi
+
+
+def simulate_dsm_1st_order(u, H, x0=0.):
+    """
+    First order delta-sigma modulator with the fixed NTF H(z) = 1 - z^-1,
+    replacing `deltasigma.simulateDSM()` with the same arguments and return values
+    """
+    x = np.ravel(x0)[0]  # state of the integrator
+    v = np.zeros(len(u))
+    xn = np.zeros((1, len(u)))
+    for n in range(len(u)):
+        v[n] = 1. if x + u[n] >= 0 else -1.
+        x = xn[0, n] = x + u[n] - v[n]
+    return v, xn, np.max(np.abs(xn), axis=1), x + u - v
+
+
+def make_params(L, ovfl='wrap', quant='round', q_mul=None):
+    b = np.round(np.sin(np.arange(L) + 1) * 64) / 128  # coefficients in Q0.7 format
+    return {'b': b, 'q_mul': q_mul,
+            'QA': {'Q': '2.10', 'ovfl': ovfl, 'quant': quant},
+            'QI': {'Q': '0.7', 'ovfl': 'sat', 'quant': 'round'},
+            'QO': {'Q': '1.6', 'ovfl': ovfl, 'quant': quant}}
+
+
+class TestSequenceFunctions(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(42)
+        # stimulus scaled for lots of accumulator overflows
+        self.x = np.round(rng.uniform(-1, 1, 3000) * 128) / 128
+
+    def compare(self, p, frames):
+        """
+        Filter `self.x` framewise with block engine and reference loop, compare
+        results, register contents and overflow counters.
+        """
+        dut_blk = FIR_DF_pyfixp(p)
+        dut_ref = FIR_DF_pyfixp(p)
+        for frame in frames:
+            y_blk, zi_blk = dut_blk.fxfilter(x=self.x[frame])
+            y_ref, zi_ref = fxfilter_loop(dut_ref, self.x[frame])
+            np.testing.assert_array_equal(y_blk, y_ref)
+            np.testing.assert_array_equal(zi_blk, zi_ref)
+            for Q in ('Q_mul', 'Q_acc', 'Q_O'):
+                for N in ('N', 'N_over', 'N_over_pos', 'N_over_neg'):
+                    self.assertEqual(getattr(getattr(dut_blk, Q), N),
+                                     getattr(getattr(dut_ref, Q), N))
+            self.assertEqual(dut_blk.N_over_filt, dut_ref.N_over_filt)
+
+    def test_wrap_round(self):
+        """ Wrap-around and rounding, single frame """
+        self.compare(make_params(31), [slice(0, 3000)])
+
+    def test_sat_floor_frames(self):
+        """ Saturation, truncation and quantized partial products, several frames """
+        p = make_params(17, ovfl='sat', quant='floor',
+                        q_mul={'Q': '0.8', 'ovfl': 'wrap', 'quant': 'round'})
+        self.compare(p, [slice(0, 1), slice(1, 1000), slice(1000, 1000), slice(1000, 3000)])
+
+    def test_long_filter(self):
+        """ Filter longer than a block of partial products """
+        self.compare(make_params(700, ovfl='wrap', quant='fix'), [slice(0, 500)])
+
+    def test_impulse_response(self):
+        """ Impulse response for `x == None` and scalar `x` """
+        p = make_params(5)
+        p['b'] = [1, 2, 3, 2, 1]
+        p['QA'] = {'Q': '4.3', 'ovfl': 'wrap', 'quant': 'round'}
+        p['QO'] = {'Q': '5.3', 'ovfl': 'wrap', 'quant': 'round'}
+        dut = FIR_DF_pyfixp(p)
+        y, _ = dut.fxfilter()
+        self.assertListEqual(list(y), [1, 2, 3, 2, 1])
+        dut.init(p)
+        y, _ = dut.fxfilter(x=0.5)
+        self.assertListEqual(list(y), [0.5, 1, 1.5, 1, 0.5])
+
+    def test_dsm(self):
+        """
+        Delta-sigma quantizers with a fixed NTF keep their states between frames
+        and blocks, the block engine yields the same results as the loop
+        """
+        q_dsm = {'Q': '2.10', 'ovfl': 'none', 'quant': 'dsm', 'dsm_order': 1}
+        p_mul = make_params(5, q_mul=q_dsm)  # modulated partial products
+        p_acc = make_params(5)  # modulated accumulator
+        p_acc['QA'] = q_dsm
+        fix_lib._synthesize_ntf.cache_clear()
+        self.addCleanup(fix_lib._synthesize_ntf.cache_clear)
+        with mock.patch.object(fix_lib, 'DS', True),\
+                mock.patch.object(fix_lib, 'synthesizeNTF', create=True,
+                                  return_value=((1,), (0,), 1)),\
+                mock.patch.object(fix_lib, 'simulateDSM', simulate_dsm_1st_order,
+                                  create=True),\
+                mock.patch('pyfda.fixpoint_widgets.fir_df.fir_df_pyfixp.BLK_SIZE', 100):
+            for p in (p_mul, p_acc):
+                self.compare(p, [slice(0, 7), slice(7, 300)])
+
+    def test_int_mode(self):
+        """
+        Wide accumulator, calculated bit-true in the integer domain. Compare with
+        an exact reference using Python integers.
+        """
+        WF = 30
+        p = make_params(9)
+        p['b'] = np.round(p['b'] * 2**WF) / 2**WF
+        p.update({'QI': {'Q': '0.30', 'ovfl': 'sat', 'quant': 'round'},
+                  'QCB': {'Q': '0.30', 'ovfl': 'sat', 'quant': 'round'},
+                  'QA': {'Q': '1.60', 'ovfl': 'wrap', 'quant': 'floor'},
+                  'QO': {'Q': '1.50', 'ovfl': 'wrap', 'quant': 'floor'}})
+        x = np.round(self.x[:200] * 2**WF) / 2**WF
+        dut = FIR_DF_pyfixp(p)
+        self.assertTrue(dut.int_mode)
+        dut.zi = np.concatenate((dut.zi, x))
+        y_q = dut._fxfilter_block_int(len(x))
+
+        x_int = [0] * (dut.L - 1) + [int(v) for v in np.round(x * 2**WF)]
+        b_int = [int(v) for v in np.round(p['b'] * 2**WF)]
+        y_ref = []
+        for k in range(len(x)):
+            acc = sum(x_int[k + i] * b_int[i] for i in range(dut.L)) >> 2 * WF - 60
+            acc = ((acc & (2**62 - 1)) ^ 2**61) - 2**61  # wrap around to 62 bits
+            y_ref.append(acc / 2**60)
+        self.assertListEqual(list(y_q), y_ref)
+
+    def test_int_mode_sat(self):
+        """
+        Wide inputs and coefficients with a narrow saturating accumulator: The
+        partial products and their sums exceed int64 although the accumulator
+        does not, compare with an exact reference using Python integers.
+        """
+        WF = 24
+        p = make_params(9, ovfl='sat', quant='floor')
+        p['b'] = np.round(p['b'] * 400 * 2**WF) / 2**WF
+        p.update({'QI': {'Q': '8.24', 'ovfl': 'sat', 'quant': 'round'},
+                  'QCB': {'Q': '8.24', 'ovfl': 'sat', 'quant': 'round'},
+                  'QA': {'Q': '0.54', 'ovfl': 'sat', 'quant': 'floor'}})
+        x = np.round(self.x[:200] * 250 * 2**WF) / 2**WF
+        dut = FIR_DF_pyfixp(p)
+        self.assertTrue(dut.int_mode)
+        dut.zi = np.concatenate((dut.zi, x))
+        y_q = dut._fxfilter_block_int(len(x))
+
+        x_int = [0] * (dut.L - 1) + [int(v) for v in np.round(x * 2**WF)]
+        b_int = [int(v) for v in np.round(p['b'] * 2**WF)]
+        y_ref = []
+        for k in range(len(x)):
+            acc = sum(x_int[k + i] * b_int[i] for i in range(dut.L)) << 54 - 2 * WF
+            acc = min(max(acc, -2**54), 2**54 - 1)  # saturate to 55 bits
+            y_ref.append(acc / 2**54)
+        self.assertListEqual(list(y_q), y_ref)
+
+
+def benchmark(L=200, N=20000):
+    """
+    Print throughput in samples/s for the block engine and the reference loop
+    """
+    x = np.round(np.random.default_rng(1).uniform(-1, 1, N) * 128) / 128
+    p = make_params(L)
+
+    dut = FIR_DF_pyfixp(p)
+    t1 = time.perf_counter()
+    y_blk, _ = dut.fxfilter(x=x)
+    T_blk = time.perf_counter() - t1
+
+    dut = FIR_DF_pyfixp(p)
+    t1 = time.perf_counter()
+    y_ref, _ = fxfilter_loop(dut, x)
+    T_ref = time.perf_counter() - t1
+
+    print(f"L = {L}, N = {N}, identical results: {np.array_equal(y_blk, y_ref)}")
+    print(f"block engine: {N / T_blk:12.0f} samples/s")
+    print(f"loop        : {N / T_ref:12.0f} samples/s")
+    print(f"speedup     : {T_ref / T_blk:12.1f}")
+
+
+if __name__ == '__main__':
+    benchmark()
+    unittest.main()
+
+# run tests with python -m pyfda.tests.test_fir_df_pyfixp
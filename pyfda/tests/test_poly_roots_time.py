@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of the pyFDA project hosted at https://github.com/chipmuenk/pyfda
+#
+# Copyright © pyFDA Project Contributors
+# Licensed under the terms of the MIT License
+# (see file LICENSE in root directory for details)
+
+"""
+Test suite for the root finder `poly_roots()` in pyfda_lib. Running this module
+directly also benchmarks speed and accuracy against `np.roots()`:
+
+    python -m pyfda.tests.test_poly_roots_time
+"""
+import time
+import unittest
+import numpy as np
+import scipy.signal as sig
+
+from pyfda.libs.pyfda_lib import poly_roots, fil_save
+
+
+def backward_error(p, z):
+    """
+    Normwise backward error `|p(z)| / sum(|p_k| |z|^(n-k))` of the roots `z`,
+    evaluated with the reversed polynomial for `|z| > 1`
+    """
+    p = np.trim_zeros(np.asarray(p), 'f')
+    err = np.empty(len(z))
+    for i, z_i in enumerate(z):
+        c, x = (p[::-1], 1 / z_i) if abs(z_i) > 1 else (p, z_i)
+        err[i] = abs(np.polyval(c, x)) / max(np.polyval(np.abs(c), abs(x)), 1e-300)
+    return err
+
+
+class TestSequenceFunctions(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        r = rng.standard_normal(51)
+        self.polys = {
+            'type I': sig.firwin(101, 0.2),
+            'type II': sig.firwin(100, 0.2),
+            'type III': np.convolve(sig.firwin(101, 0.2), [1, 0, -1]),
+            'type IV': np.convolve(sig.firwin(101, 0.2), [1, -1]),
+            'equiripple': sig.remez(81, [0, 0.1, 0.2, 0.5], [1, 0]),
+            'reciprocal': np.convolve(r, r[::-1]),
+            'multiple': np.convolve(np.ones(5), np.ones(5)),
+            'delay': [1, 2, 1, 0, 0],
+            'random': rng.standard_normal(60),
+            'complex': rng.standard_normal(30) + 1j * rng.standard_normal(30)}
+
+    def test_roots(self):
+        """
+        Roots are the same as `np.roots()` and at least as accurate
+        """
+        for name, p in self.polys.items():
+            z = poly_roots(p)
+            z_np = np.roots(p)
+            self.assertEqual(len(z), len(z_np), msg=name)
+            dist = np.abs(z[:, np.newaxis] - z_np) / np.maximum(1, np.abs(z_np))
+            self.assertLess(max(dist.min(axis=0).max(), dist.min(axis=1).max()), 1e-4,
+                            msg=name)
+            err = backward_error(p, z)
+            self.assertLess(err.max(), max(1e-13, 2 * backward_error(p, z_np).max()),
+                            msg=name)
+
+    def test_long_fir(self):
+        """
+        Roots of a long FIR filter are accurate where `np.roots()` fails
+        """
+        b = sig.firwin(1025, 0.2, window=('kaiser', 8))
+        z = poly_roots(b)
+        self.assertEqual(len(z), 1024)
+        self.assertLess(backward_error(b, z).max(), 1e-13)
+
+    def test_short_fir(self):
+        """
+        Short (anti-)symmetric FIR filters whose roots are all found by deflation
+        """
+        for b, z_goal in (([1], []), ([3], []), ([1, 1], [-1]), ([1, -1], [1]),
+                          ([1, 0, -1], [-1, 1]), ([1, 2, 1], [-1, -1]),
+                          ([2, 0, 0, -2], np.roots([1, 0, 0, -1]))):
+            z = poly_roots(b)
+            np.testing.assert_allclose(np.sort_complex(z), np.sort_complex(z_goal),
+                                       atol=1e-12, err_msg=str(b))
+
+        fil_dict = {}
+        fil_save(fil_dict, [1, 0, -1], 'ba', 'test')
+        np.testing.assert_allclose(np.sort_complex(fil_dict['zpk'][0]), [-1, 1])
+
+    def test_fil_save(self):
+        """
+        Zeros of FIR filters are calculated with `poly_roots()`, IIR filters
+        are converted with `tf2zpk()`
+        """
+        b = sig.firwin(101, 0.2)
+        fil_dict = {}
+        fil_save(fil_dict, b, 'ba', 'test')
+        z, p, k = fil_dict['zpk']
+        np.testing.assert_allclose(np.sort_complex(z), np.sort_complex(poly_roots(b)))
+        self.assertEqual(len(p), 100)
+        self.assertFalse(np.any(p))
+        self.assertAlmostEqual(k, b[0])
+
+        b, a = sig.ellip(4, 1, 40, 0.2)
+        fil_save(fil_dict, [b, a], 'ba', 'test')
+        for x, y in zip(fil_dict['zpk'], sig.tf2zpk(b, a)):
+            np.testing.assert_allclose(x, y)
+
+
+def benchmark(N_list=(256, 1024, 4096), N_calls=1):
+    """
+    Print time and max. normwise backward error of `poly_roots()` and
+    `np.roots()` for the zeros of a linear-phase FIR lowpass with `N` taps
+    """
+    for N in N_list:
+        b = sig.firwin(N + 1, 0.2, window=('kaiser', 8))
+        res = []
+        for fnc in (poly_roots, np.roots):
+            t1 = time.perf_counter()
+            for _ in range(N_calls):
+                z = fnc(b)
+            res.append(((time.perf_counter() - t1) / N_calls,
+                        backward_error(b, z).max()))
+        print(f"N = {N:5d}: poly_roots(): {res[0][0]:8.3f} s, error {res[0][1]:8.1e}; "
+              f"np.roots(): {res[1][0]:8.3f} s, error {res[1][1]:8.1e}")
+
+
+if __name__ == '__main__':
+    benchmark()
+    unittest.main()
+
+# run tests with python -m pyfda.tests.test_poly_roots_time
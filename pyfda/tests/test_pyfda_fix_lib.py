@@ -60,6 +60,12 @@ class TestSequenceFunctions(unittest.TestCase):
         self.assertEqual(0, self.myQ.WF)
         self.assertEqual('12.0', self.myQ.Q)
 
+        # DSM settings are only stored as attributes, not added to the passed dict
+        self.assertFalse({'dsm_order', 'dsm_osr', 'dsm_opt'} & set(q_obj))
+        self.myQ.setQobj({'dsm_osr': 32})
+        self.myQ.setQobj({'W': 8})
+        self.assertEqual((3, 32, 1),
+                         (self.myQ.dsm_order, self.myQ.dsm_osr, self.myQ.dsm_opt))
 
         # check whether option 'norm' sets the correct scale
         self.myQ.setQobj({'scale':'norm'})
@@ -489,6 +495,77 @@ class TestSequenceFunctions(unittest.TestCase):
         # yq_list = self.myQ.frmt2float(y_list)
         # self.assertEqual(yq_list, yq_list_goal)
 
+    def test_fix_int(self):
+        """
+        Test quantization and overflow handling in the integer domain
+        """
+        y_list_ovfl = [-np.inf, -3.2, -2.2, -1.2, -1.0, -0.5, 0, 0.5, 0.8, 1.0, 1.2, 2.2, 3.2, np.inf]
+        # float input, compare with results of fixp()
+        for ovfl in ['sat', 'none']:
+            for quant in ['floor', 'round', 'fix', 'ceil', 'rint']:
+                q_obj = {'WI':1, 'WF':2, 'ovfl':ovfl, 'quant':quant, 'frmt': 'dec', 'scale': 1}
+                self.myQ.setQobj(q_obj)
+                yq_list_goal = list(self.myQ.fixp(y_list_ovfl[1:-1]))
+                yq_list = list(self.myQ.int2float(self.myQ.fixp_int(y_list_ovfl[1:-1])))
+                self.assertEqual(yq_list, yq_list_goal)
+
+        # wrap-around, float input
+        q_obj = {'WI':1, 'WF':2, 'ovfl':'wrap', 'quant':'floor', 'frmt': 'dec', 'scale': 1}
+        self.myQ.setQobj(q_obj)
+        self.myQ.resetN()
+        yq_list = list(self.myQ.fixp_int(y_list_ovfl))
+        yq_list_goal = [0, 3, 7, -5, -4, -2, 0, 2, 3, 4, 4, -8, -4, 0]
+        self.assertEqual(yq_list, yq_list_goal)
+        self.assertEqual(self.myQ.N_over_neg, 3)
+        self.assertEqual(self.myQ.N_over_pos, 3)
+
+        # saturation, integer input with 4 fractional bits
+        q_obj = {'WI':1, 'WF':2, 'ovfl':'sat', 'quant':'round', 'frmt': 'dec', 'scale': 1}
+        self.myQ.setQobj(q_obj)
+        y_int = np.array([-40, -34, -6, -2, 2, 6, 10, 31, 40])
+        yq_list = list(self.myQ.fixp_int(y_int, WF_in=4))
+        yq_list_goal = [-8, -8, -2, 0, 0, 2, 2, 7, 7]
+        self.assertEqual(yq_list, yq_list_goal)
+        # same with floor and ceil
+        self.myQ.setQobj({'quant': 'floor'})
+        yq_list = list(self.myQ.fixp_int(y_int, WF_in=4))
+        self.assertEqual(yq_list, [-8, -8, -2, -1, 0, 1, 2, 7, 7])
+        self.myQ.setQobj({'quant': 'ceil'})
+        yq_list = list(self.myQ.fixp_int(y_int, WF_in=4))
+        self.assertEqual(yq_list, [-8, -8, -1, 0, 1, 2, 3, 7, 7])
+
+        # wide words are calculated bit-true with Python integers
+        q_obj = {'WI':10, 'WF':70, 'ovfl':'wrap', 'quant':'floor', 'frmt': 'dec', 'scale': 1}
+        self.myQ.setQobj(q_obj)
+        y_int = np.array([3**80, -3**80 - 7, 2**70 + 1], dtype=object)
+        yq_list = list(self.myQ.fixp_int(y_int, WF_in=72))
+        yq_list_goal = [((v >> 2) + 2**80) % 2**81 - 2**80 for v in y_int]
+        self.assertEqual(yq_list, yq_list_goal)
+        self.assertEqual(self.myQ.fixp_int(0.5 + 2**-50), 2**69 + 2**20)
+
+    @unittest.skipUnless(fix_lib.DS, "deltasigma module not available")
+    def test_dsm(self):
+        """
+        Delta-sigma modulation: the NTF is only synthesized once per setting,
+        framewise modulation yields the same result as a single call
+        """
+        q_obj = {'WI':0, 'WF':0, 'ovfl':'none', 'quant':'dsm', 'frmt': 'float',
+                 'dsm_order': 2, 'dsm_osr': 32}
+        self.myQ.setQobj(q_obj)
+        self.myQ.resetN()
+        y = 0.5 * np.sin(2 * np.pi * np.arange(1000) / 256)
+        yq_goal = self.myQ.fixp(y)
+        misses = fix_lib._synthesize_ntf.cache_info().misses
+
+        self.myQ.resetN()
+        yq = np.concatenate([self.myQ.fixp(y[k:k+100]) for k in range(0, 1000, 100)])
+        np.testing.assert_array_equal(yq, yq_goal)
+        self.assertEqual(fix_lib._synthesize_ntf.cache_info().misses, misses)
+
+        # new NTF settings reset the modulator states
+        self.myQ.setQobj({'dsm_order': 3})
+        self.assertIsNone(self.myQ.dsm_state)
+
 
 # TODO: test csd2dec, csd2dec_vec
 
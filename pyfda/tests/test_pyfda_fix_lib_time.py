@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of the pyFDA project hosted at https://github.com/chipmuenk/pyfda
+#
+# Copyright © pyFDA Project Contributors
+# Licensed under the terms of the MIT License
+# (see file LICENSE in root directory for details)
+
+"""
+Test suite for the fast paths `Fixed.fixp_into()`, `Fixed.float2frmt()` and
+`Fixed.frmt2float_vec()` for arrays. Running this module directly also performs
+micro-benchmarks against `Fixed.fixp()` and the previous format conversion:
+
+    python -m pyfda.tests.test_pyfda_fix_lib_time
+"""
+import time
+import unittest
+import numpy as np
+
+from pyfda.libs.pyfda_fix_lib import Fixed
+
+
+class TestSequenceFunctions(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(42)
+        self.y = np.concatenate((rng.uniform(-20, 20, 1000), np.arange(-64, 64) / 4,
+                                 [np.inf, -np.inf]))
+
+    def test_fixp_into(self):
+        """
+        Compare results and overflow counters of `fixp_into()` and `fixp()` for
+        all quantization and overflow settings
+        """
+        for quant in ['floor', 'round', 'fix', 'ceil', 'rint', 'none']:
+            for ovfl in ['wrap', 'sat', 'none']:
+                for scaling in ['mult', 'div', 'multdiv']:
+                    q_obj = {'WI': 3, 'WF': 4, 'ovfl': ovfl, 'quant': quant, 'scale': 3}
+                    myQ = Fixed(q_obj)
+                    myQ_fast = Fixed(q_obj)
+                    with np.errstate(invalid='ignore'):
+                        yq_goal = myQ.fixp(self.y, scaling=scaling)
+                        yq = myQ_fast.fixp_into(self.y, np.empty_like(self.y),
+                                                scaling=scaling)
+                    np.testing.assert_array_equal(yq, yq_goal)
+                    for N in ('N', 'N_over', 'N_over_pos', 'N_over_neg'):
+                        self.assertEqual(getattr(myQ, N), getattr(myQ_fast, N))
+
+    def test_fixp_into_inplace(self):
+        """
+        Quantize in place after changing the settings
+        """
+        myQ = Fixed({'WI': 0, 'WF': 3, 'ovfl': 'sat', 'quant': 'floor'})
+        myQ.setQobj({'ovfl': 'wrap', 'quant': 'round'})
+        y = np.array([-1.1, -1.0, -0.5, 0, 0.5, 0.9, 0.99, 1.0, 1.1])
+        yq_goal = myQ.fixp(y)
+        myQ.fixp_into(y)
+        np.testing.assert_array_equal(y, yq_goal)
+
+    def test_float2frmt_arr(self):
+        """
+        Compare bulk conversion of arrays to bin, hex and csd format with
+        element-wise conversion
+        """
+        for frmt in ['bin', 'hex', 'csd']:
+            for WI, WF in [(0, 15), (3, 4), (5, 0), (2, 30)]:
+                for ovfl in ['wrap', 'sat', 'none']:
+                    myQ = Fixed({'WI': WI, 'WF': WF, 'ovfl': ovfl, 'quant': 'round',
+                                 'frmt': frmt})
+                    y_str = myQ.float2frmt(self.y[:-2])
+                    y_str_goal = [myQ.float2frmt(y) for y in self.y[:-2]]
+                    self.assertListEqual(list(y_str), y_str_goal)
+
+    def test_frmt2float_vec(self):
+        """
+        Compare bulk conversion of strings to float with element-wise conversion,
+        including irregular strings and wide words (W = 50 ... 52) that are
+        converted element-wise
+        """
+        irregular = ['', '0', '-', '-0', '-01', '.1', '-.1', '1,1', ' 1', '1..1', 'abc',
+                     '0x1F', '+-0.+', '1' * 60, '-1.', 'FF', 'ff.8', '+.-']
+        for frmt in ['dec', 'bin', 'hex', 'csd']:
+            for WI, WF in [(0, 15), (3, 4), (5, 0), (9, 40), (10, 40), (10, 41)]:
+                for ovfl in ['wrap', 'sat']:
+                    myQ = Fixed({'WI': WI, 'WF': WF, 'ovfl': ovfl, 'quant': 'round',
+                                 'frmt': frmt})
+                    # strings with additional integer bits for testing overflows
+                    y_str = list(Fixed({'WI': WI + 3, 'WF': WF, 'frmt': frmt})
+                                 .float2frmt(self.y[:-2])) + irregular
+                    y_goal = [myQ.frmt2float(y) for y in y_str]
+                    np.testing.assert_array_equal(myQ.frmt2float_vec(y_str), y_goal)
+
+
+def benchmark(N=1000, N_calls=10000):
+    """
+    Print time per call of `fixp()` and `fixp_into()` for arrays of length `N`
+    """
+    y = np.random.default_rng(1).uniform(-1.2, 1.2, N)
+    out = np.empty_like(y)
+    myQ = Fixed({'WI': 0, 'WF': 15, 'ovfl': 'sat', 'quant': 'round'})
+
+    t1 = time.perf_counter()
+    for _ in range(N_calls):
+        myQ.fixp(y)
+    T_fixp = (time.perf_counter() - t1) / N_calls
+
+    t1 = time.perf_counter()
+    for _ in range(N_calls):
+        myQ.fixp_into(y, out)
+    T_into = (time.perf_counter() - t1) / N_calls
+
+    print(f"N = {N}")
+    print(f"fixp()     : {T_fixp * 1e6:8.2f} us / call")
+    print(f"fixp_into(): {T_into * 1e6:8.2f} us / call")
+    print(f"speedup    : {T_fixp / T_into:8.2f}")
+
+
+def benchmark_frmt(N=10000, N_calls=10):
+    """
+    Print the best time of `N_calls` for converting `N` coefficients to and from
+    bin, hex and csd format in bulk and with the previous code: `float2frmt()`
+    for arrays with `np.frompyfunc()` / `np.vectorize()` wrappers
+    (`_float2frmt_elementwise()`), `frmt2float()` element by element.
+    """
+    def best_time(func):
+        T = []
+        for _ in range(N_calls):
+            t1 = time.perf_counter()
+            result = func()
+            T.append(time.perf_counter() - t1)
+        return min(T), result
+
+    y = np.random.default_rng(1).uniform(-1, 1, N)
+    for frmt in ['bin', 'hex', 'csd']:
+        myQ = Fixed({'WI': 0, 'WF': 15, 'ovfl': 'sat', 'quant': 'round', 'frmt': frmt})
+        T_vec, y_str = best_time(lambda: myQ.float2frmt(y))
+        T_ref, y_str_ref = best_time(
+            lambda: myQ._float2frmt_elementwise(myQ.fixp(y, scaling='mult')))
+        print(f"float2frmt, {frmt}, N = {N}: {T_vec * 1e3:8.2f} ms (bulk), "
+              f"{T_ref * 1e3:8.2f} ms (previous), speedup: {T_ref / T_vec:6.1f}, "
+              f"identical: {np.array_equal(y_str, y_str_ref)}")
+
+        T_vec, y_q = best_time(lambda: myQ.frmt2float_vec(y_str))
+        T_ref, y_q_ref = best_time(lambda: [myQ.frmt2float(s) for s in y_str])
+        print(f"frmt2float, {frmt}, N = {N}: {T_vec * 1e3:8.2f} ms (bulk), "
+              f"{T_ref * 1e3:8.2f} ms (previous), speedup: {T_ref / T_vec:6.1f}, "
+              f"identical: {np.array_equal(y_q, y_q_ref)}")
+
+
+if __name__ == '__main__':
+    for N in (10, 1000, 100000):
+        benchmark(N=N, N_calls=max(10000000 // (N + 1000), 10))
+    benchmark_frmt()
+    unittest.main()
+
+# run tests with python -m pyfda.tests.test_pyfda_fix_lib_time
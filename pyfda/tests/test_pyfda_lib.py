@@ -0,0 +1,385 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of the pyFDA project hosted at https://github.com/chipmuenk/pyfda
+#
+# Copyright © pyFDA Project Contributors
+# Licensed under the terms of the MIT License
+# (see file LICENSE in root directory for details)
+
+"""
+Test suite for FFT helper functions and the frequency response cache in pyfda_lib
+"""
+import time
+import threading
+import unittest
+import numpy as np
+import scipy.signal as sig
+
+import pyfda.libs.pyfda_lib as pyfda_lib
+from pyfda.libs.lazy_dict import LazyDict
+from pyfda.libs.pyfda_lib import (
+    fast_fft, rfft2fft, calc_fft_power, calc_ssb_spectrum, sos_freqz, zoom_freqz,
+    adaptive_freqz, select_freq_range, calc_Hcomplex, fil_save, H_mag, H_abs_grid,
+    H_abs_polar, poly_roots, Roots2Poly, zpk2tf_inc)
+
+
+class TestSequenceFunctions(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(4)
+        self.x = rng.standard_normal((3, 11))
+        self.z = self.x + 1j * rng.standard_normal((3, 11))
+
+    def test_fast_fft(self):
+        """
+        Single- and double-sided FFTs of real and complex signals
+        """
+        for x in (self.x, self.z):
+            for N in (None, 10, 16):
+                X = np.fft.fft(x, N)
+                M = X.shape[-1] // 2 + 1
+                np.testing.assert_allclose(fast_fft(x, N), X)
+                np.testing.assert_allclose(fast_fft(x, N, sides='one'), X[:, :M])
+                np.testing.assert_allclose(fast_fft(x.T, N, axis=0), X.T)
+        self.assertEqual(fast_fft(self.x[0], fast_len=True).shape, (12,))
+
+    def test_rfft2fft(self):
+        """
+        Full spectrum from the real-valued FFT
+        """
+        for N in (10, 11):
+            R = np.fft.rfft(self.x, N)
+            np.testing.assert_allclose(rfft2fft(R, N), np.fft.fft(self.x, N))
+            np.testing.assert_allclose(rfft2fft(R.T, N, axis=0), np.fft.fft(self.x, N).T)
+
+    def test_single_sided(self):
+        """
+        Power and single-sideband spectrum from single- and double-sided spectra
+        """
+        for N in (10, 11):
+            X = np.fft.fft(self.x[0], N)
+            X1 = np.fft.rfft(self.x[0], N)
+            self.assertAlmostEqual(calc_fft_power(X1, N), np.sum(np.abs(X)**2))
+            self.assertAlmostEqual(calc_fft_power(X, N), np.sum(np.abs(X)**2))
+            np.testing.assert_allclose(calc_ssb_spectrum(X1, N), calc_ssb_spectrum(X))
+
+    def test_H_cache(self):
+        """
+        Frequency responses are cached by content and cleared by `fil_save()`
+        """
+        b, a = sig.ellip(4, 1, 40, 0.2)
+        fil_dict = {'ba': [b.copy(), a.copy()]}
+        W, H = calc_Hcomplex(fil_dict, 512, True)
+        np.testing.assert_allclose(H, sig.freqz(b, a, 512, whole=True)[1])
+        self.assertFalse(H.flags.writeable)
+        self.assertIs(calc_Hcomplex({'ba': [b, a]}, 512, True)[1], H)
+        self.assertIsNot(calc_Hcomplex(fil_dict, 512, False)[1], H)
+        self.assertIsNot(calc_Hcomplex(fil_dict, 512, True, fs=1)[1], H)
+
+        fil_dict['ba'][0] *= 2  # modified in place
+        np.testing.assert_allclose(calc_Hcomplex(fil_dict, 512, True)[1], 2 * H,
+                                   atol=1e-12)
+
+        fil_save(fil_dict, [b, a], 'ba', 'test', convert=False)
+        self.assertEqual(len(pyfda_lib._H_cache), 0)
+
+        for N in range(pyfda_lib.H_CACHE_SIZE + 1):  # least recently used is removed
+            calc_Hcomplex(fil_dict, 16 + N, True)
+        self.assertEqual(len(pyfda_lib._H_cache), pyfda_lib.H_CACHE_SIZE)
+        self.assertNotIn(16, [key[1] for key in pyfda_lib._H_cache])
+
+    def test_sos_freqz(self):
+        """
+        Frequency response of second-order sections equals scipy's result, it is
+        used by `calc_Hcomplex()` when sections are available
+        """
+        sos = sig.ellip(30, 0.1, 100, 0.05, output='sos')
+        sos_c = sos.astype(complex)
+        sos_c[:, :3] *= 1 + 0.1j
+        for s in (sos, sos_c):
+            for worN in (1, 2, 511, np.linspace(0, 3, 77)):
+                for whole in (False, True):
+                    w, h = sos_freqz(s, worN, whole=whole, fs=3)
+                    w_sci, h_sci = sig.sosfreqz(s, worN, whole=whole, fs=3)
+                    np.testing.assert_allclose(w, w_sci)
+                    np.testing.assert_allclose(h, h_sci, rtol=1e-9, atol=1e-12)
+
+        b, a = sig.sos2tf(sos)  # expanded polynomials are useless for this order
+        W, H = calc_Hcomplex({'ba': [b, a], 'sos': sos}, 1024, True)
+        np.testing.assert_allclose(H, sig.sosfreqz(sos, 1024, whole=True)[1],
+                                   rtol=1e-9, atol=1e-12)
+        self.assertIsNot(calc_Hcomplex({'ba': [b, a], 'sos': []}, 1024, True)[1], H)
+
+    def test_zoom_freqz(self):
+        """
+        Frequency response in a band calculated with the chirp-z transform
+        """
+        b = sig.firwin(401, 0.2, fs=1)
+        sos = sig.ellip(12, 0.1, 80, 0.1, output='sos')
+        for f_range in ((0.01, 0.19), (-0.3, 0.2), (0.3, 0.3)):
+            w, h = zoom_freqz(b, 1, 300, f_range, fs=1)
+            np.testing.assert_allclose(w, np.linspace(*f_range, 300))
+            np.testing.assert_allclose(h, sig.freqz(b, 1, w, fs=1)[1], atol=1e-12)
+            w, h = zoom_freqz(sos, worN=100, f_range=f_range, fs=1, sos=True)
+            np.testing.assert_allclose(h, sig.sosfreqz(sos, w, fs=1)[1], atol=1e-12)
+        b_s, a_s = sig.ellip(4, 1, 40, 0.2)
+        w, h = zoom_freqz(b_s, a_s, worN=1, f_range=(0.1, 0.2))
+        np.testing.assert_allclose(h, sig.freqz(b_s, a_s, [0.1])[1])
+
+        fil_dict = {'ba': [b, np.ones(1)], 'sos': []}
+        W, H = calc_Hcomplex(fil_dict, 100, True, fs=1, f_range=(0.1, 0.2))
+        self.assertEqual((W[0], W[-1]), (0.1, 0.2))
+        self.assertIsNot(calc_Hcomplex(fil_dict, 100, True, fs=1, f_range=(0.1, 0.3))[1],
+                         H)
+        # zoomed bands (e.g. while panning) don't evict full range responses
+        H_full = calc_Hcomplex(fil_dict, 100, True, fs=1)[1]
+        for f_2 in np.linspace(0.2, 0.4, pyfda_lib.H_CACHE_SIZE + 1):
+            calc_Hcomplex(fil_dict, 100, True, fs=1, f_range=(0.1, f_2))
+        self.assertIs(calc_Hcomplex(fil_dict, 100, True, fs=1)[1], H_full)
+        self.assertEqual(len(pyfda_lib._H_zoom_cache), pyfda_lib.H_ZOOM_CACHE_SIZE)
+
+    def test_adaptive_freqz(self):
+        """
+        Adaptively refined frequency grid finds the depth of notches and the
+        extrema of the magnitude response
+        """
+        b, a = sig.ellip(8, 0.5, 60, 0.2)
+        W_u, H_u = calc_Hcomplex({'ba': [b, a]}, 512, True)
+        W, H = calc_Hcomplex({'ba': [b, a]}, 512, True, tol=0.01)
+        self.assertTrue(np.all(np.diff(W) > 0))
+        self.assertLessEqual(len(W), 1024)
+        np.testing.assert_allclose(H, sig.freqz(b, a, W)[1])
+        H_dense = sig.freqz(b, a, 2**20, whole=True)[1]
+        dB = lambda H: 20 * np.log10(np.abs(H))
+        self.assertGreater(dB(H_u).min(), dB(H_dense).min() + 1)  # uniform grid misses notch
+        self.assertAlmostEqual(dB(H).min(), dB(H_dense).min(), delta=0.01)
+        self.assertAlmostEqual(dB(H).max(), dB(H_dense).max(), delta=0.01)
+        # knees of the transition band: linear interpolation in dB is more accurate
+        W_d = np.linspace(0, 2 * np.pi, 2**16, endpoint=False)
+        m_d = dB(sig.freqz(b, a, W_d)[1])
+        band = m_d > -40
+        err_u = np.abs(np.interp(W_d, W_u, dB(H_u)) - m_d)[band].max()
+        err = np.abs(np.interp(W_d, W, dB(H)) - m_d)[band].max()
+        self.assertLess(err, err_u / 10)
+
+        W, H = adaptive_freqz(lambda w: sig.freqz(b, a, w)[1], W_u, H_u, N_max=600)
+        self.assertEqual(len(W), 600)
+
+    def test_select_freq_range(self):
+        """
+        Selecting the displayed frequency range equals fftshift / slicing for
+        uniform grids
+        """
+        W = np.arange(8) * np.pi / 4
+        H = np.arange(8)
+        F, H_s = select_freq_range(W, H, 'sym', 8)
+        np.testing.assert_array_equal(F, np.arange(-4, 4))
+        np.testing.assert_array_equal(H_s, np.fft.fftshift(H))
+        F, H_s = select_freq_range(W, H, 'half', 8)
+        np.testing.assert_array_equal(H_s, H[:4])
+        F, H_s = select_freq_range(W, H, 'whole', 8)
+        np.testing.assert_array_equal(F, np.arange(8))
+
+    def test_H_abs_grid(self):
+        """
+        Magnitude on a grid in the z-plane is cached and equals the quotient of
+        the polynomials, on polar grids also for large radii and complex coefficients
+        """
+        b, a = sig.ellip(6, 1, 40, 0.2)
+        b_c = sig.firwin(301, 0.1) * np.exp(0.3j * np.arange(301))
+        x, y = np.meshgrid(np.linspace(-1.5, 1.5, 31), np.linspace(-1.5, 1.5, 29))
+        z = x + 1j * y
+        with np.errstate(divide='ignore', invalid='ignore'):
+            H = np.abs(np.polyval(b, z) / np.polyval(a, z))
+        H_grid = H_abs_grid(b, a, z)
+        np.testing.assert_allclose(H_grid, H, rtol=1e-9)
+        self.assertFalse(H_grid.flags.writeable)
+        self.assertIs(H_abs_grid(b.copy(), a, z), H_grid)
+        np.testing.assert_allclose(H_mag(b, a, z, 2, H_min=0.1), np.clip(H, 0.1, 2))
+        for _ in range(2):  # division by zero at a pole is reported, also when cached
+            with self.assertRaises(FloatingPointError):
+                H_mag([1, 1], [1, -0.5], [0.5, 1j], 2, div_by_0='raise')
+        self.assertEqual(H_mag([1, 1], [1, -0.5], [0.5, 1j], 2)[0], 2)
+
+        r = np.array([0, 0.3, 0.99, 1, 1.2, 2])
+        z = r[:, np.newaxis] * np.exp(2j * np.pi * np.arange(64) / 64)
+        for num, den in ((b, a), (b_c, [1, -0.5j])):
+            H = np.abs(np.polyval(num, z) / np.polyval(den, z))
+            np.testing.assert_allclose(H_abs_polar(num, den, r, 64), H, rtol=1e-8)
+        self.assertIs(H_abs_polar(b_c, [1, -0.5j], r, 64),
+                      H_abs_polar(b_c, [1, -0.5j], r, 64))
+
+
+    def test_lazy_convert(self):
+        """
+        Formats derived by `fil_save()` are converted on first access for a
+        `LazyDict` and are identical to the eagerly converted formats
+        """
+        b, a = sig.ellip(4, 1, 40, 0.2)
+        sos = sig.ellip(4, 1, 40, 0.2, output='sos')
+        zpk = list(sig.ellip(4, 1, 40, 0.2, output='zpk'))
+        for arg, frmt, derived in (([b, a], 'ba', ['zpk']), (sos, 'sos', ['zpk', 'ba']),
+                                   (zpk, 'zpk', ['ba'])):
+            fil_dict, fil_lazy = {}, LazyDict()
+            fil_save(fil_dict, arg, frmt, 'test')
+            fil_save(fil_lazy, arg, frmt, 'test')
+            for key in derived:
+                self.assertTrue(fil_lazy.is_lazy(key))
+            for key in ('ba', 'zpk', 'sos'):
+                for x, y in zip(fil_lazy[key], fil_dict[key]):
+                    np.testing.assert_array_equal(x, y)
+            self.assertFalse(any(fil_lazy.is_lazy(key) for key in derived))
+
+        fil_lazy.set_lazy('zpk', lambda d: 1 / 0)  # errors are raised on access
+        with self.assertRaises(ZeroDivisionError):
+            fil_lazy['zpk']
+        fil_save(fil_lazy, [b, a], 'ba', 'test')
+        self.assertEqual(dict(fil_lazy)['zpk'][2], fil_dict['zpk'][2])
+        fil_dict = {}
+        fil_save(fil_dict, [b, a], 'ba', 'test')
+        self.assertEqual(fil_lazy['zpk'][2], fil_dict['zpk'][2])
+
+        # readers in other threads wait for a conversion in progress
+        started = threading.Event()
+
+        def convert(d):
+            started.set()
+            time.sleep(0.2)
+            return 42
+
+        fil_lazy.set_lazy('x', convert)
+        worker = threading.Thread(target=lambda: fil_lazy['x'])
+        worker.start()
+        started.wait()
+        self.assertEqual(fil_lazy['x'], 42)
+        worker.join()
+
+    def test_H_incremental(self):
+        """
+        Responses after editing single coefficients, poles or zeros are updated
+        incrementally and equal the recalculated responses
+        """
+        calls = []
+        _calc_H = pyfda_lib._calc_H
+
+        def _calc_H_count(*args):
+            calls.append(args)
+            return _calc_H(*args)
+
+        pyfda_lib._calc_H = _calc_H_count
+        try:
+            b = sig.firwin(201, 0.2)
+            fil_dict = {}
+            fil_save(fil_dict, b, 'ba', 'test')
+            calc_Hcomplex(fil_dict, 1024, True, fs=2)
+            for k in (0, 100, 3):  # edit FIR coefficients
+                b = b.copy()
+                b[k] += 0.01
+                fil_save(fil_dict, b, 'ba', 'test')
+                W, H = calc_Hcomplex(fil_dict, 1024, True, fs=2)
+                np.testing.assert_allclose(H, sig.freqz(b, 1, 1024, whole=True)[1],
+                                           atol=1e-13)
+            b_s, a_s = sig.ellip(6, 1, 40, 0.2)
+            a_e = a_s + [0, 0, 0.01, 0, 0, 0, 0]
+            for ba in ([b_s, a_s], [b_s * 2, a_s], [b_s * 2, a_e]):
+                fil_save(fil_dict, ba, 'ba', 'test')
+                W, H = calc_Hcomplex(fil_dict, 512, False)
+                np.testing.assert_allclose(H, sig.freqz(*ba, W)[1], atol=1e-12)
+            self.assertEqual(len(calls), 3)  # initial responses and scaled b
+
+            z, p, k = sig.ellip(6, 1, 40, 0.2, output='zpk')
+            fil_save(fil_dict, [z, p, k], 'zpk', 'test')
+            calc_Hcomplex(fil_dict, 512, True)
+            for i in range(pyfda_lib.H_INC_MAX + 1):  # move poles, zeros, gain
+                z, p = z.copy(), p.copy()
+                z[i % 6] *= 1.01
+                p[i % 6] *= 0.99
+                k *= 1.1
+                fil_save(fil_dict, [z, p, k], 'zpk', 'test')
+                W, H = calc_Hcomplex(fil_dict, 512, True)
+                np.testing.assert_allclose(H, sig.freqz(*sig.zpk2tf(z, p, k), W)[1],
+                                           rtol=1e-9, atol=1e-12)
+            self.assertEqual(len(calls), 5)  # recalculated after H_INC_MAX updates
+
+            z[0] = np.exp(1j * W[10])  # zero on the grid can't be undone by division
+            fil_save(fil_dict, [z, p, k], 'zpk', 'test')
+            calc_Hcomplex(fil_dict, 512, True)
+            z[0] = 0.5
+            fil_save(fil_dict, [z, p, k], 'zpk', 'test')
+            W, H = calc_Hcomplex(fil_dict, 512, True)
+            np.testing.assert_allclose(H, sig.freqz(*sig.zpk2tf(z, p, k), W)[1],
+                                       rtol=1e-9, atol=1e-12)
+            self.assertEqual(len(calls), 6)
+        finally:
+            pyfda_lib._calc_H = _calc_H
+
+    def test_poly_roots_inc(self):
+        """
+        Polynomials updated incrementally after adding, removing and moving
+        roots have the same response on the unit circle as the product of the
+        linear factors (relative to its magnitude at each point unless below the
+        rounding error), also for high-Q poles. They are recalculated when the
+        error is too large.
+        """
+        x = np.exp(1j * np.linspace(0, 2 * np.pi, 500))
+
+        def resp_error(c, r):
+            P = np.prod(x[:, np.newaxis] - r, axis=1)
+            c_round = len(c) * np.finfo(float).eps * np.sum(np.abs(c))
+            return np.max(np.abs(np.polyval(c, x) - P) / (np.abs(P) + c_round / 1e-12))
+
+        z = poly_roots(sig.remez(31, [0, 0.1, 0.2, 0.5], [1, 0]))
+        z_r, u = z[z.imag == 0], z[z.imag > 0]
+        z = np.concatenate((z_r, u, u.conj()))
+        rng = np.random.default_rng(5)
+        polys = Roots2Poly(N_max=50)
+        np.testing.assert_array_equal(polys.poly(z), np.poly(z))
+        N_inc = []
+        for i in range(60):  # edit conjugate pairs of roots
+            r_n = rng.uniform(0.7, 1.3) * np.exp(1j * rng.uniform(0.1, 3))
+            if i % 3 == 0:
+                u[i % len(u)] = r_n  # move
+            elif i % 3 == 1:
+                u = np.insert(u, i % len(u), r_n)  # add
+            else:
+                u = np.delete(u, -i % len(u))  # remove
+            z = np.concatenate((z_r, u, u.conj()))
+            c = polys.poly(z)
+            self.assertTrue(np.isrealobj(c))
+            self.assertLess(resp_error(c, z), 1e-8)
+            N_inc.append(polys.N_inc)
+        self.assertLessEqual(max(N_inc), 50)
+        self.assertGreater(np.count_nonzero(N_inc), 50)
+        z = np.append(z, 0.5j)  # single complex root
+        self.assertLess(resp_error(polys.poly(z), z), 1e-8)
+
+        polys.err_max = 0  # error too large -> recalculate
+        c = polys.poly(z[1:])
+        self.assertEqual(polys.N_inc, 0)
+        np.testing.assert_array_equal(c, np.poly(z[1:]))
+
+        # move the high-Q poles of a narrow bandpass, |A| is tiny near the poles
+        p = sig.ellip(8, 0.1, 90, [0.3, 0.302], btype='bandpass', output='zpk')[1]
+        u = p[p.imag > 0]
+        polys = Roots2Poly()
+        polys.poly(p)
+        for i in range(40):
+            u[i % len(u)] *= np.exp(1e-4j)
+            p = np.concatenate((u, u.conj()))
+            c = polys.poly(p)
+            self.assertGreater(polys.N_inc, 0)
+            self.assertLess(resp_error(c, p), 1e-12)
+
+        z, p, k = sig.ellip(8, 1, 60, 0.2, output='zpk')
+        for x, y in zip(zpk2tf_inc(z, p, k), sig.zpk2tf(z, p, k)):
+            np.testing.assert_allclose(x, y)
+        p[:2] = 0.5, -0.1j
+        for x, y in zip(zpk2tf_inc(z, p, k), sig.zpk2tf(z, p, k)):
+            np.testing.assert_allclose(x, y, atol=1e-15)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+# run tests with python -m pyfda.tests.test_pyfda_lib
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of the pyFDA project hosted at https://github.com/chipmuenk/pyfda
+#
+# Copyright © pyFDA Project Contributors
+# Licensed under the terms of the MIT License
+# (see file LICENSE in root directory for details)
+
+"""
+Test suite for functions and classes in pyfda_sig_lib
+"""
+import unittest
+import numpy as np
+from numpy import pi
+import scipy.signal as sig
+
+from pyfda.libs.pyfda_sig_lib import Min_Max_Pyramid, Welch, STFT, group_delay
+
+
+class TestSequenceFunctions(unittest.TestCase):
+
+    def setUp(self):
+        self.y = np.random.default_rng(1).standard_normal(100003)
+        self.y[5000:5100] = np.nan
+
+    def test_min_max_pyramid(self):
+        """
+        Envelope columns contain min / max of the corresponding samples
+        """
+        pyr = Min_Max_Pyramid(self.y)
+        self.assertListEqual([lvl[0] for lvl in pyr.levels], [8, 64, 512])
+        for N_start, N_end, N_col in [(0, 100003, 1000), (1234, 56789, 333),
+                                      (4000, 6000, 100), (99990, 100003, 50)]:
+            n, y_min, y_max = pyr.envelope(N_start, N_end, N_col)
+            self.assertLessEqual(len(n), N_col)
+            self.assertLessEqual(n[0], N_start)
+            for i in range(len(n) - 1):
+                y_col = self.y[n[i]:n[i+1]]
+                np.testing.assert_equal(y_min[i], np.fmin.reduce(y_col))
+                np.testing.assert_equal(y_max[i], np.fmax.reduce(y_col))
+            # last column extends to the end of the last block (max. 512 samples)
+            self.assertGreaterEqual(y_max[-1], np.max(self.y[n[-1]:N_end]))
+            self.assertLessEqual(y_max[-1], np.max(self.y[n[-1]:N_end + 512]))
+
+    def test_min_max_pyramid_raw(self):
+        """
+        Samples are returned when there are less samples than columns
+        """
+        pyr = Min_Max_Pyramid(self.y)
+        n, y_min, y_max = pyr.envelope(10, 30, 100)
+        np.testing.assert_array_equal(n, np.arange(10, 30))
+        np.testing.assert_array_equal(y_min, self.y[10:30])
+        np.testing.assert_array_equal(y_max, self.y[10:30])
+        self.assertEqual(len(pyr.envelope(50, 50, 100)[0]), 0)
+
+    def test_welch(self):
+        """
+        Welch spectrum equals scipy's result and is independent of the frame size
+        """
+        x = np.random.default_rng(2).standard_normal(10000) + 0.5
+        win = sig.windows.hann(256, sym=False)
+        _, P = sig.welch(x[1000:9000], window=win, noverlap=100, detrend=False,
+                         return_onesided=False, scaling='spectrum')
+        for N_frame in (10000, 1000, 77):
+            welch = Welch(win, N_ovlp=100, N_start=1000, N_end=9000)
+            for N_first in range(0, 10000, N_frame):
+                welch.add(x[N_first:N_first + N_frame])
+            self.assertEqual(welch.N_avg, (8000 - 256) // 156 + 1)
+            np.testing.assert_allclose(welch.spectrum() / np.sum(win), np.sqrt(P))
+
+        welch.reset()
+        welch.add(x[:1100])
+        self.assertEqual(welch.N_avg, 0)
+        np.testing.assert_array_equal(welch.spectrum(), np.zeros(256))
+        with self.assertRaises(ValueError):
+            Welch(win, N_ovlp=256)
+
+        # complex signal with a tone at -0.3 fs: two-sided, asymmetric spectrum
+        x_c = x + np.exp(-2j * pi * 0.3 * np.arange(10000))
+        _, P = sig.welch(x_c[1000:9000], window=win, noverlap=100, detrend=False,
+                         return_onesided=False, scaling='spectrum')
+        welch = Welch(win, N_ovlp=100, N_start=1000, N_end=9000)
+        for N_first in range(0, 10000, 777):
+            welch.add(x_c[N_first:N_first + 777])
+        np.testing.assert_allclose(welch.spectrum() / np.sum(win), np.sqrt(P))
+        self.assertGreater(P[256 - 77], 100 * P[77])  # tone at bin -0.3 * 256
+
+    def test_stft(self):
+        """
+        Spectrogram calculated frame by frame equals scipy's result
+        """
+        x = np.random.default_rng(3).standard_normal(5000) + 0.5
+        win = sig.windows.hann(128, sym=False)
+        stft = STFT(win, N_ovlp=50)
+        for N_first in range(0, 5000, 333):
+            stft.add(x[N_first:N_first + 333])
+        for mode in ('psd', 'magnitude', 'angle', 'phase', 'complex'):
+            for scaling in ('density', 'spectrum'):
+                for onesided in (True, False):
+                    f, t, S = sig.spectrogram(
+                        x, 100, window=win, nperseg=128, noverlap=50, mode=mode,
+                        scaling=scaling, return_onesided=onesided)
+                    f_s, t_s, S_s = stft.spectrogram(100, mode=mode, scaling=scaling,
+                                                     onesided=onesided)
+                    np.testing.assert_allclose(f_s, f)
+                    np.testing.assert_allclose(t_s, t)
+                    if mode in {'angle', 'phase'}:  # ambiguous by 2 pi
+                        S, S_s = np.exp(1j * S), np.exp(1j * S_s)
+                    np.testing.assert_allclose(S_s, S, atol=1e-9, err_msg=mode)
+
+        # complex signals with a tone at -0.3 fs: two-sided, asymmetric spectrum,
+        # time referred to sample 0
+        x_c = x + np.exp(-2j * pi * 0.3 * np.arange(5000))
+        stft = STFT(win, N_ovlp=50, N_start=1000)
+        for N_first in range(0, 5000, 333):
+            stft.add(x_c[N_first:N_first + 333])
+        for mode in ('psd', 'complex'):
+            f, t, S = sig.spectrogram(x_c[1000:], 100, window=win, nperseg=128,
+                                      noverlap=50, mode=mode, return_onesided=False)
+            f_s, t_s, S_s = stft.spectrogram(100, mode=mode)
+            np.testing.assert_allclose(S_s, S, atol=1e-12, err_msg=mode)
+            np.testing.assert_allclose(t_s, t + 10)
+
+    def test_group_delay_sos(self):
+        """
+        Group delay of second-order sections is the sum of the group delays of the
+        sections
+        """
+        sos = sig.ellip(30, 0.1, 100, 0.05, output='sos')
+        w = np.arange(1, 32) * pi / 256  # pass band
+        tau_goal = np.sum([sig.group_delay((s[:3], s[3:]), w)[1] for s in sos], axis=0)
+        for alg in ('jos', 'scipy', 'shpak'):
+            _, tau_g = group_delay(sos, nfft=512, whole=True, sos=True, alg=alg,
+                                   verbose=False)
+            np.testing.assert_allclose(tau_g[1:32], tau_goal, rtol=1e-6, err_msg=alg)
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+# run tests with python -m pyfda.tests.test_pyfda_sig_lib
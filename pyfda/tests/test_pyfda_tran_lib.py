@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of the pyFDA project hosted at https://github.com/chipmuenk/pyfda
+#
+# Copyright © pyFDA Project Contributors
+# Licensed under the terms of the MIT License
+# (see file LICENSE in root directory for details)
+
+"""
+Test suite for the headless transient simulation in pyfda_tran_lib
+"""
+import unittest
+import numpy as np
+import scipy.signal as sig
+
+import pyfda.libs.pyfda_tran_lib as tran_lib
+from pyfda.libs.pyfda_sig_lib import Welch, STFT
+from pyfda.libs.pyfda_tran_lib import (
+    simulate, Tran_Sim, Stimulus, Stim_Base, STIMULI, register_stimulus)
+
+
+class TestSequenceFunctions(unittest.TestCase):
+
+    def setUp(self):
+        b, a = sig.ellip(4, 1, 40, 0.2)
+        self.fil_dict = {'ba': [b, a], 'sos': sig.tf2sos(b, a),
+                         'fxqc': {'QI': {'WI': 0, 'WF': 7, 'ovfl': 'sat',
+                                         'quant': 'round'}}}
+
+    def test_float(self):
+        """
+        Framewise simulation with sos and ba coefficients equals filtering the
+        whole stimulus at once
+        """
+        p = {'stim': 'sine', 'f1': 0.05, 'A1': 0.8, 'DC': 0.1}
+        x = 0.8 * np.sin(2 * np.pi * np.arange(1000) * 0.05) + 0.1
+        y_goal = sig.lfilter(*self.fil_dict['ba'], x)
+        res = simulate(self.fil_dict, p, N=1000, N_frame=300)
+        np.testing.assert_allclose(res['x'], x)
+        np.testing.assert_allclose(res['y'], y_goal, atol=1e-12)
+        self.assertEqual(res['title'], 'Sinusoidal Stimulus + DC')
+        self.assertIsNone(res['x_q'])
+
+        self.fil_dict['sos'] = []
+        res = simulate(self.fil_dict, p, N=1000, N_frame=128)
+        np.testing.assert_allclose(res['y'], y_goal, atol=1e-12)
+
+    def test_fixpoint(self):
+        """
+        Quantized stimulus is passed to the fixpoint filter function
+        """
+        frames = []
+
+        def fxfilter(x_q):
+            frames.append(len(x_q))
+            return 2 * x_q
+
+        res = simulate(self.fil_dict, {'stim': 'step', 'T1': 5, 'A1': 0.3}, N=100,
+                       N_frame=40, fx=fxfilter)
+        x_q = np.where(np.arange(100) >= 5, np.round(0.3 * 128) / 128, 0)
+        np.testing.assert_array_equal(res['x_q'], x_q)
+        np.testing.assert_array_equal(res['y'], 2 * x_q)
+        self.assertListEqual(frames, [40, 40, 20])
+
+    def test_cancel(self):
+        """
+        Simulation is stopped after the first frame when cancelled
+        """
+        N_calc = []
+        sim = Tran_Sim(self.fil_dict, {'stim': 'dirac'}, N=1000, N_frame=100)
+        self.assertFalse(sim.run(cancelled=lambda: True, progress=N_calc.append))
+        self.assertEqual(sim.N_first, 100)
+        self.assertTrue(sim.run(progress=N_calc.append))
+        self.assertListEqual(N_calc, list(range(100, 1001, 100)))
+
+    def test_memmap(self):
+        """
+        Results stored in memory mapped files are identical to results in RAM,
+        memory mapping is used automatically above `MEMMAP_THRESHOLD`
+        """
+        p = {'stim': 'sine', 'f1': 0.05, 'noise': 'gauss', 'seed': 1}
+        res = simulate(self.fil_dict, p, N=1000, N_frame=300)
+        res_mm = simulate(self.fil_dict, p, N=1000, N_frame=300, memmap=True)
+        self.assertIsInstance(res_mm['y'], np.memmap)
+        np.testing.assert_array_equal(res_mm['x'], res['x'])
+        np.testing.assert_array_equal(res_mm['y'], res['y'])
+
+        res_mm = simulate(self.fil_dict, {'stim': 'step'}, N=100, fx=lambda x: x,
+                          memmap=True)
+        self.assertIsInstance(res_mm['x_q'], np.memmap)
+
+        threshold = tran_lib.MEMMAP_THRESHOLD
+        try:
+            tran_lib.MEMMAP_THRESHOLD = 1000 * 24
+            self.assertFalse(Tran_Sim(self.fil_dict, p, N=1000).memmap)
+            self.assertTrue(Tran_Sim(self.fil_dict, p, N=1001).memmap)
+        finally:
+            tran_lib.MEMMAP_THRESHOLD = threshold
+
+    def test_welch(self):
+        """
+        Spectral estimators and spectrograms are fed frame by frame and reset
+        for each run
+        """
+        win = np.ones(64)
+        sim = Tran_Sim(self.fil_dict, {'stim': 'sine', 'f1': 0.1, 'noise': 'gauss',
+                                        'seed': 3}, N=1000, N_frame=70)
+        sim.welch = {'x': Welch(win, 32), 'y': Welch(win, 32, N_start=100)}
+        sim.stft = {'y': STFT(win, 16)}
+        sim.run()
+        sim.run()
+        for key, N_start in (('x', 0), ('y', 100)):
+            welch = Welch(win, 32, N_start=N_start)
+            welch.add(getattr(sim, key))
+            self.assertEqual(sim.welch[key].N_avg, welch.N_avg)
+            np.testing.assert_allclose(sim.welch[key].spectrum(), welch.spectrum())
+        stft = STFT(win, 16)
+        stft.add(sim.y)
+        np.testing.assert_allclose(sim.stft['y'].stft(), stft.stft())
+
+    def test_stimulus_frames(self):
+        """
+        All registered stimuli are independent of the frame size
+        """
+        p = {'A1': 0.7, 'A2': 0.3, 'f1': 0.013, 'f2': 0.051, 'phi1': 30, 'phi2': -45,
+             'T1': 17, 'T2': 40, 'TW1': 11, 'DC': 0.2}
+        for stim in STIMULI:
+            for bl in (False, True):
+                res = [simulate(self.fil_dict, dict(p, stim=stim, bl=bl), N=500,
+                                N_frame=N_frame)['x'] for N_frame in (500, 64, 7)]
+                np.testing.assert_allclose(res[1], res[0], atol=1e-9, err_msg=stim)
+                np.testing.assert_allclose(res[2], res[0], atol=1e-9, err_msg=stim)
+
+    def test_noise_frames(self):
+        """
+        Seeded noise is reproducible and independent of the frame size
+        """
+        for noise in ('gauss', 'uniform', 'prbs', 'mls', 'brownian'):
+            p = {'stim': 'none', 'noise': noise, 'noi': 0.5, 'seed': 42}
+            res = [simulate(self.fil_dict, p, N=1000, N_frame=N_frame)['x']
+                   for N_frame in (1000, 64, 7, 1000)]
+            for x in res[1:]:
+                np.testing.assert_array_equal(x, res[0], err_msg=noise)
+            # sequence doesn't repeat with the frames
+            self.assertFalse(np.array_equal(res[1][:64], res[1][64:128]), msg=noise)
+
+        x = simulate(self.fil_dict, {'stim': 'none', 'noise': 'mls', 'noi': 1},
+                     N=1023, N_frame=100)['x']
+        self.assertEqual(np.sum(x), 1)  # period 2**10 - 1 with one more 1 than 0s
+
+    def test_phase_precision(self):
+        """
+        Phase is precise for large sample indices
+        """
+        f, N_first = 0.0123456789, 10**9
+        stim = Stimulus({'stim': 'sine', 'f1': f})
+        stim.prepare(N_first + 100)
+        x = stim.fill(np.empty(100), N_first, 100)
+        f_num, f_den = f.as_integer_ratio()  # exact phase in cycles
+        x_goal = [np.sin(2 * np.pi * ((f_num * n) % f_den) / f_den)
+                  for n in range(N_first, N_first + 100)]
+        np.testing.assert_allclose(x, x_goal, rtol=0, atol=1e-14)
+
+    def test_register_stimulus(self):
+        """
+        Register a new stimulus class
+        """
+        class Stim_Ramp(Stim_Base):
+            title = 'Ramp'
+
+            def fill(self, out, N_first, N_frame):
+                out[:] = self.A1 * self._n(N_first, N_frame)
+
+        register_stimulus('ramp', Stim_Ramp)
+        try:
+            res = simulate(self.fil_dict, {'stim': 'ramp', 'A1': 2}, N=10, N_frame=3)
+            np.testing.assert_array_equal(res['x'], 2 * np.arange(10))
+            self.assertEqual(res['title'], 'Ramp')
+        finally:
+            del STIMULI['ramp']
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+# run tests with python -m pyfda.tests.test_pyfda_tran_lib
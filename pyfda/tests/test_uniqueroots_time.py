@@ -1,73 +1,120 @@
-#!/usr/bin/env python
-# -*- coding: iso-8859-15 -*-
-#===========================================================================
-# Speed comparison for unique_roots from scipy.signal against
-# new implementation 
+# -*- coding: utf-8 -*-
 #
-# (c) 2015 Christian Muenker
-#===========================================================================
-import numpy as np
-import numpy.random as rnd
+# This file is part of the pyFDA project hosted at https://github.com/chipmuenk/pyfda
+#
+# Copyright © pyFDA Project Contributors
+# Licensed under the terms of the MIT License
+# (see file LICENSE in root directory for details)
 
-import scipy.signal as sig
+"""
+Test suite comparing the clustering of complex roots in `unique_roots()` with
+the previous O(N^2) implementation. Running this module directly also
+benchmarks `unique_roots()` against the previous implementation and
+`scipy.signal.unique_roots()`:
 
+    python -m pyfda.tests.test_uniqueroots_time
+"""
 import time
-if __name__ == "__main__":
-    import sys, os
-    __cwd__ = os.path.dirname(os.path.abspath(__file__))
-    sys.path.append(os.path.join('..',os.path.dirname(__cwd__)))
-
-import pyfda.libs.pyfda_lib as dsp
-#import my_dsp_lib_v6a as dsp
-
-## scalar inputs - IndexError with scipy implementation
-#vals = 1 # real root
-#vals = 1j # imag. root
-#vals = 1j + 1  # complex root
-
-## multiple & single real roots 
-#vals = np.convolve(ones(13),ones(13)) # 12 double, one single real root
-#vals = np.convolve(ones(1000),ones(1000))
-#vals = [1,2,-1] # different unique real roots
-
-## multiple & single imag. roots on the unit circle
-vals =[1j, 1j]
-vals = rnd.randn(1000)
-vals = rnd.randn(100) + 1j * rnd.randn(100)
-#vals = ones(5) * 1j # root at j with multiplicity 5
-#vals = np.append(vals, ones(5))
-#vals = ones(5)
-#np.sort_complex()
-#vals = np.roots(np.convolve(ones(5),ones(5))) # 4 double complex roots
-#vals = np.roots(np.convolve(ones(500),ones(100))) # 100 double and 400 single complex roots,
-#vals = np.roots(np.convolve(ones(500),ones(500))) # 500 double complex roots
-
-#vals = np.roots(np.convolve(ones(5),ones(7))) # 4 double complex roots
-
-## tests with nans 
-#vals = list(ones(5) * 1j); vals.append(np.nan); vals.append(np.nan)
-#vals = []
-#print(vals)
-
-Navg = 1000
-rtype = 'min'
-print('============ dsp.unique_roots() ================================')
-t1 = time.process_time()
-
-for i in range(Navg):
-    roots, mult = dsp.unique_roots(vals, rtype = rtype, rdist='manhattan')
-t2 = time.process_time()
-T_dsp = (t2 - t1)/Navg
-print (mult)
-
-print('============ signal.unique_roots() =============================')
-t1 = time.process_time()
-for i in range(Navg):
-    roots, mult = sig.unique_roots(vals, rtype = rtype)
-t2 = time.process_time()
-T_sig = (t2 - t1)/Navg
-print (mult)
-
-print("T_dsp = ",T_dsp, " s")
-print("T_sig = ",T_sig, " s")
-print("T_dsp / T_sig = ", T_dsp / T_sig)
+import unittest
+import numpy as np
+import scipy.signal as sig
+
+from pyfda.libs.pyfda_lib import unique_roots
+
+
+def unique_roots_loop(p, tol=1e-3, rtype='min', rdist='euclidian'):
+    """
+    Reference: previous implementation of `unique_roots()` for complex roots,
+    comparing the first remaining root against all others in each pass
+    """
+    comproot = {'min': np.min, 'max': np.max, 'avg': np.mean,
+                'median': np.median}[rtype]
+    if rdist == 'manhattan':
+        def dist_roots(a, b):
+            return np.abs(a.real - b.real) + np.abs(a.imag - b.imag)
+    else:
+        def dist_roots(a, b):
+            return np.abs(a - b)
+    p = np.atleast_1d(p)
+    pout, mult = [], []
+    while len(p):
+        tolarr = np.less(dist_roots(p[0], p), tol)
+        mult.append(np.sum(tolarr))
+        pout.append(comproot(p[tolarr]))
+        p = p[~tolarr]
+    return np.array(pout), np.array(mult)
+
+
+def fir_roots(N=1000, seed=1):
+    """
+    About `N` roots like those of a long FIR filter: conjugate pairs on the unit
+    circle, reciprocal pairs inside and outside, double roots on the unit circle
+    (like the roots of `conv(ones(M), ones(M))`) and clusters of close roots
+    """
+    rng = np.random.default_rng(seed)
+    phi = rng.uniform(0.2, 1, N // 6) * np.pi
+    p_uc = np.exp(1j * np.concatenate((phi, -phi)))
+    z = rng.uniform(0.5, 0.9, N // 12) * np.exp(1j * rng.uniform(0, 0.2, N // 12) * np.pi)
+    p_rec = np.concatenate((z, z.conj(), 1 / z, 1 / z.conj()))
+    p_dbl = np.tile(np.exp(2j * np.pi * np.arange(1, N // 8) / (N // 8)), 2)
+    p = np.concatenate((p_uc, p_rec, p_dbl))
+    p = np.concatenate((p, p[:N // 10] + 2e-4 * rng.standard_normal(N // 10)))
+    return rng.permutation(p)
+
+
+class TestSequenceFunctions(unittest.TestCase):
+
+    def test_equal_loop(self):
+        """
+        Roots, multiplicities and their order are identical to the previous
+        implementation for all distances and root types
+        """
+        p = fir_roots(400)
+        rng = np.random.default_rng(2)
+        p_grid = (rng.integers(0, 20, 300) + 1j * rng.integers(0, 20, 300)) * 7e-4
+        for roots in (p, p_grid):
+            for rdist in ('euclidian', 'manhattan'):
+                for rtype in ('min', 'max', 'avg', 'median'):
+                    uniq, mult = unique_roots(roots, rtype=rtype, rdist=rdist)
+                    uniq_goal, mult_goal = unique_roots_loop(roots, rtype=rtype,
+                                                             rdist=rdist)
+                    np.testing.assert_array_equal(mult, mult_goal)
+                    np.testing.assert_allclose(uniq, uniq_goal, rtol=1e-14)
+        self.assertGreater(np.max(mult), 5)
+
+    def test_tolerance(self):
+        """
+        Roots at a distance of exactly `tol` are not combined
+        """
+        uniq, mult = unique_roots([0j, 0.5, 0.5j, 1, 0.1 + 0.2j], tol=0.5,
+                                  rdist='manhattan')
+        np.testing.assert_array_equal(uniq, [0, 0.5, 0.5j, 1])
+        np.testing.assert_array_equal(mult, [2, 1, 1, 1])
+        uniq, mult = unique_roots([1j, 1j, 1j], tol=0)
+        np.testing.assert_array_equal(mult, [1, 1, 1])
+
+
+def benchmark(N_list=(250, 1000, 4000, 16000), N_calls=3):
+    """
+    Print time per call of `unique_roots()`, the previous implementation and
+    `scipy.signal.unique_roots()` for `N` complex roots
+    """
+    for N in N_list:
+        p = fir_roots(N)
+        res = []
+        for fnc in (lambda: unique_roots(p, rtype='avg'),
+                    lambda: unique_roots_loop(p, rtype='avg'),
+                    lambda: sig.unique_roots(p, rtype='avg')):
+            t1 = time.perf_counter()
+            for _ in range(N_calls):
+                fnc()
+            res.append((time.perf_counter() - t1) / N_calls)
+        print(f"N = {len(p):5d}: unique_roots(): {res[0] * 1e3:8.2f} ms, "
+              f"previous: {res[1] * 1e3:8.2f} ms, scipy: {res[2] * 1e3:8.2f} ms")
+
+
+if __name__ == '__main__':
+    benchmark()
+    unittest.main()
+
+# run tests with python -m pyfda.tests.test_uniqueroots_time
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of the pyFDA project hosted at https://github.com/chipmuenk/pyfda
+#
+# Copyright © pyFDA Project Contributors
+# Licensed under the terms of the MIT License
+# (see file LICENSE in root directory for details)
+
+"""
+Test suite for the stem plots `stems()` and `Stem_Plot` in `mpl_widget`. Running
+this module directly also benchmarks redrawing stem plots against matplotlib's
+`stem()`:
+
+    python -m pyfda.tests.widgets.plot_widgets.test_mpl_widget_time
+"""
+import time
+import unittest
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from pyfda.plot_widgets.mpl_widget import stems, Stem_Plot
+
+
+class TestSequenceFunctions(unittest.TestCase):
+
+    def setUp(self):
+        self.fig = Figure()
+        FigureCanvasAgg(self.fig)
+        self.ax = self.fig.add_subplot(111)
+        self.x = np.arange(10)
+        self.y = np.sin(self.x)
+
+    def test_stems(self):
+        """
+        Stems from `bottom` to `y` and one marker line, legend handles
+        """
+        mkr_fmt = {'marker': 'o', 'color': 'red', 'ms': 5}
+        h, sp = stems(self.x, self.y, ax=self.ax, bottom=0.5, mkr_fmt=mkr_fmt,
+                      color='red')
+        self.assertEqual(len(h), 2)
+        self.assertIs(sp.stems, self.ax.collections[0])
+        seg = self.ax.collections[0].get_segments()
+        self.assertEqual(len(seg), 10)
+        np.testing.assert_array_equal(seg[3], [[3, 0.5], [3, self.y[3]]])
+        mkr = self.ax.lines[-1]
+        np.testing.assert_array_equal(mkr.get_ydata(), self.y)
+        self.assertLessEqual(self.ax.get_ylim()[0], self.y.min())
+
+        stems(self.x, self.y, ax=self.ax, mkr_fmt={'marker': ''}, color='blue')
+        self.assertEqual(len(self.ax.collections), 2)
+        self.assertEqual(len(self.ax.lines), 3)  # 2 x axhline + 1 marker line
+
+    def test_set_data(self):
+        """
+        Update data in place
+        """
+        sp = Stem_Plot(self.ax, self.x, self.y, mkr_fmt={'marker': 's'})
+        artists = self.ax.get_children()
+        sp.set_data(self.x[:5] + 1, 2 * self.y[:5])
+        self.assertListEqual(self.ax.get_children(), artists)
+        seg = sp.stems.get_segments()
+        self.assertEqual(len(seg), 5)
+        np.testing.assert_array_equal(seg[2], [[3, 0], [3, 2 * self.y[2]]])
+        np.testing.assert_array_equal(sp.markers.get_xdata(), self.x[:5] + 1)
+
+
+def benchmark(N_list=(1000, 10000, 100000), N_calls=5):
+    """
+    Print times for creating and drawing stem plots with `N` points using
+    matplotlib's `stem()`, `stems()` and updating `Stem_Plot` in place
+    """
+    fig = Figure()
+    canvas = FigureCanvasAgg(fig)
+    mkr_fmt = {'marker': 'o', 'color': 'red', 'alpha': 0.5, 'ms': 8}
+    fmt = {'color': 'red', 'linewidth': 2, 'alpha': 0.5}
+    for N in N_list:
+        x = np.arange(N)
+        y = np.random.default_rng(1).standard_normal(N)
+
+        t1 = time.perf_counter()
+        for _ in range(N_calls):
+            fig.clf()
+            ax = fig.add_subplot(111)
+            ml, sl, bl = ax.stem(x, y)
+            ml.set(**mkr_fmt)
+            sl.set(**fmt)
+            canvas.draw()
+        T_stem = (time.perf_counter() - t1) / N_calls
+
+        t1 = time.perf_counter()
+        for _ in range(N_calls):
+            fig.clf()
+            ax = fig.add_subplot(111)
+            stems(x, y, ax=ax, mkr_fmt=mkr_fmt, **fmt)
+            canvas.draw()
+        T_stems = (time.perf_counter() - t1) / N_calls
+
+        fig.clf()
+        ax = fig.add_subplot(111)
+        sp = Stem_Plot(ax, x, y, mkr_fmt=mkr_fmt, **fmt)
+        t1 = time.perf_counter()
+        for i in range(N_calls):
+            sp.set_data(x, np.roll(y, i))
+            canvas.draw()
+        T_update = (time.perf_counter() - t1) / N_calls
+
+        print(f"N = {N:6d}: ax.stem(): {T_stem * 1e3:8.1f} ms, stems(): "
+              f"{T_stems * 1e3:8.1f} ms, Stem_Plot.set_data(): {T_update * 1e3:8.1f} ms")
+
+
+if __name__ == '__main__':
+    benchmark()
+    unittest.main()
+
+# run tests with python -m pyfda.tests.widgets.plot_widgets.test_mpl_widget_time
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of the pyFDA project hosted at https://github.com/chipmuenk/pyfda
+#
+# Copyright © pyFDA Project Contributors
+# Licensed under the terms of the MIT License
+# (see file LICENSE in root directory for details)
+
+"""
+Test suite for cancelling and restarting the transient simulation of `Plot_Impz`
+and for the display options of the Welch spectral estimate
+"""
+import sys
+import time
+import types
+import unittest
+from unittest import mock
+
+from pyfda.libs.compat import QApplication
+from pyfda.libs.pyfda_qt_lib import qget_cmb_box, qset_cmb_box
+from pyfda.plot_widgets.plot_impz import Plot_Impz, Impz_Worker
+
+app = QApplication.instance() or QApplication(sys.argv)
+
+
+def wait_until_cancelled(worker):
+    """ Simulation frame loop that only stops when cancelling is requested """
+    while not worker.cancelled():
+        time.sleep(0.001)
+
+
+class TestSequenceFunctions(unittest.TestCase):
+
+    def setUp(self):
+        self.form = Plot_Impz()
+        # don't start simulations via autorun while processing events
+        self.form.ui.but_auto_run.setChecked(False)
+        self.finish_worker()  # initial simulation
+        self.form.sim = types.SimpleNamespace(error=False)
+        self.form.fx_sim = False
+
+    def start_worker(self):
+        """ Start a worker thread like `Plot_Impz.impz()` """
+        self.form.worker = Impz_Worker(wait_until_cancelled, parent=self.form)
+        self.form.worker.finished.connect(self.form._impz_done)
+        self.form.worker.start()
+
+    def finish_worker(self):
+        """ Process events until `_impz_done()` has been called """
+        t_end = time.perf_counter() + 5
+        while self.form.worker is not None and time.perf_counter() < t_end:
+            app.processEvents()
+            time.sleep(0.001)
+        self.assertIsNone(self.form.worker)
+
+    def test_autorun_restart(self):
+        """
+        Changed settings during the simulation cancel it and restart it
+        """
+        self.start_worker()
+        self.form.impz_init()  # e.g. triggered by autorun
+        with mock.patch.object(self.form, 'impz_init') as impz_init:
+            self.finish_worker()
+        impz_init.assert_called_once_with(None)
+
+    def test_run_cancels_restart(self):
+        """
+        Pressing "Run" during the simulation cancels it, also a restart requested
+        before by autorun
+        """
+        self.start_worker()
+        self.form.impz_init()  # e.g. triggered by autorun
+        self.form.ui.but_run.click()
+        self.assertTrue(self.form.worker.cancelled())
+        with mock.patch.object(self.form, 'impz_init') as impz_init:
+            self.finish_worker()
+        impz_init.assert_not_called()
+
+    def test_welch_magnitude_only(self):
+        """
+        Welch estimates have no phase: Phase and real / imaginary part can't be
+        selected in Welch mode
+        """
+        cmb = self.form.ui.cmb_freq_display
+        qset_cmb_box(cmb, 're_im', data=True)
+        self.form.ui.but_freq_welch.click()
+        self.assertEqual(qget_cmb_box(cmb), 'mag')
+        for data, enabled in (('mag', True), ('mag_phi', False), ('re_im', False)):
+            self.assertEqual(cmb.model().item(cmb.findData(data)).isEnabled(), enabled)
+
+        self.form.ui.but_freq_welch.click()
+        for data in ('mag_phi', 're_im'):
+            self.assertTrue(cmb.model().item(cmb.findData(data)).isEnabled())
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+# run tests with python -m pyfda.tests.widgets.plot_widgets.test_plot_impz